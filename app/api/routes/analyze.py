@@ -1,24 +1,68 @@
+import asyncio
+import hashlib
 import json
+import logging
 import os
 from typing import Final
 
-import pdfplumber
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
 
+from app.core.answers import schedule_precompute
 from app.core.config import settings
-from app.core.prompts import JOB_SUPPORT_ELIGIBILITY_PROMPT
+from app.core.deadline import RequestBudget, RequestCancelled, request_budget
+from app.core.doc_store import StoredDocument, doc_store
+from app.core.eligibility_batch import (
+    NDJSON_MEDIA_TYPE,
+    EligibilitySpec,
+    evaluate_pair,
+    plan_batch,
+    stream_batch,
+)
+from app.core.http_cache import (
+    ANALYSIS_CACHE_CONTROL,
+    conditional,
+    json_body_response,
+)
+from app.core.json_repair import ReaskFn, validate_llm_json
+from app.core.llm import get_client, is_configured
+from app.core.memory import estimate_extraction_cost, extraction_limiter
+from app.core.metrics import metrics
+from app.core.page_source import (
+    FIELD_KEYWORDS,
+    PageSource,
+    locate_in_pages,
+    pages_within_budget,
+    select_pages,
+)
+from app.core.pdf_extract import (
+    extract_pdf_page_range,
+    extract_pdf_pages_at,
+    pdf_page_hashes,
+    text_page_hash,
+)
+from app.core.profiling import tag_profile
+from app.core.prompts import FIELD_REPAIR_PROMPT, JOB_SUPPORT_ELIGIBILITY_PROMPT
+from app.core.revisions import diff_deadlines, diff_fields, merge_evidence
+from app.core.sectioned_analysis import analyze_in_sections
+from app.core.serialization import dumps, model_response
+from app.core.text_normalize import NormalizedText, normalize_pages
+from app.core.usage import usage_quota
 from app.models.schemas import (
     DocAnalysisResult,
+    PageCoverage,
+    EligibilityBatchRequest,
     EligibilityResult,
     EligibilityUserProfile,
+    JobSupportEligibilityBatchRequest,
     JobSupportUserProfile,
     JobSupportEligibilityResult,
     ErrorResponse,
+    RevisionInfo,
 )
-from openai import OpenAI
 
 
-client = OpenAI(api_key=settings.OPEN_AI_KEY)
+logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT: Final[str] = """
 당신은 한국어 공공 문서(공고문, 안내문 등)를 분석해서 사용자에게 꼭 필요한 핵심 정보만 구조화해서 제공하는 AI 비서입니다.
@@ -26,6 +70,7 @@ SYSTEM_PROMPT: Final[str] = """
 아래 요구사항을 반드시 지키세요.
 
 1. 입력으로 공공 문서의 전체 텍스트가 주어집니다.
+   - 표는 한 줄에 한 행씩, 셀을 " | " 로 구분해 제공됩니다. 보통 첫 행이 머리글입니다.
 2. 문서를 읽고 다음 정보를 JSON으로만 출력해야 합니다. 설명 문장이나 다른 텍스트는 절대 추가하지 마세요.
 3. 출력 JSON 스키마는 다음 `DocAnalysisResult`와 정확히 같아야 합니다.
 
@@ -89,6 +134,339 @@ SYSTEM_PROMPT: Final[str] = """
 router = APIRouter()
 
 
+def _field_reasker(model: str, budget: RequestBudget) -> ReaskFn:
+    """
+    로컬 복구로 고치지 못한 필드만 다시 물어보는 재질의 콜백을 만듭니다.
+
+    문서 전체를 다시 분석하지 않고, 잘못된 필드 경로/값/상위 객체만 전송합니다.
+    """
+
+    async def reask(invalid_fields: list[dict]) -> dict:
+        response = await budget.run(
+            get_client().chat.completions.create(
+                model=model,
+                response_format={"type": "json_object"},
+                temperature=0,
+                max_tokens=500,
+                timeout=budget.remaining(),
+                messages=[
+                    {"role": "system", "content": FIELD_REPAIR_PROMPT},
+                    {
+                        "role": "user",
+                        "content": dumps(invalid_fields),
+                    },
+                ],
+            ),
+            stage="llm_reask",
+        )
+        content = response.choices[0].message.content
+        if not content:
+            return {}
+        fixes = json.loads(content).get("fixes", {})
+        return fixes if isinstance(fixes, dict) else {}
+
+    return reask
+
+
+_PARTIAL_DOCUMENT_NOTE: Final[str] = (
+    "\n\n(참고: 전체 {total}쪽 중 앞 {analyzed}쪽만 포함되어 있습니다. "
+    "여기서 확인할 수 없는 정보는 추측하지 말고 uncertainty 에 적으세요.)"
+)
+
+_FOLLOWUP_USER_PROMPT: Final[str] = """아래는 문서 앞쪽 페이지만 보고 만든 분석 결과입니다.
+uncertainty 항목을 뒤쪽 페이지 발췌로 보완해, 위 스키마에 맞는 전체 JSON만 다시 출력하세요.
+발췌로 확인된 항목은 uncertainty 에서 빼고 evidence 에 근거 문장을 추가하세요.
+
+기존 분석 결과:
+{result}
+
+뒤쪽 페이지 발췌:
+{excerpts}"""
+
+# 진행 중인 불확실 항목 보완 태스크 (GC 방지 및 종료 시 취소용)
+_followup_tasks: set[asyncio.Task] = set()
+
+
+def _format_excerpts(pages: list[tuple[int, str]]) -> str:
+    return "\n\n".join(f"[{page_no}쪽]\n{text}" for page_no, text in pages)
+
+
+async def _resolve_uncertainty(doc_id: str) -> None:
+    """분석하지 않은 페이지 중 uncertainty 항목과 관련된 페이지로 분석 결과를 보완합니다."""
+    stored = doc_store.get(doc_id)
+    if stored is None or stored.source is None or not stored.result.uncertainty:
+        return
+    source, previous = stored.source, stored.result
+    budget = RequestBudget(None, settings.REQUEST_TIMEOUT_SECONDS)
+    try:
+        remaining = await source.load_remaining(budget)
+        query = " ".join(
+            f"{FIELD_KEYWORDS.get(item.field, item.field)} {item.reason}"
+            for item in previous.uncertainty
+        )
+        selected = select_pages(remaining, query, settings.PROGRESSIVE_TOKEN_BUDGET)
+        if not selected:
+            return
+
+        response = await budget.run(
+            get_client().chat.completions.create(
+                model="gpt-4.1-mini",
+                response_format={"type": "json_object"},
+                temperature=0.2,
+                timeout=budget.remaining(),
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {
+                        "role": "user",
+                        "content": _FOLLOWUP_USER_PROMPT.format(
+                            result=dumps(previous.model_dump(exclude={"coverage"})),
+                            excerpts=_format_excerpts(selected),
+                        ),
+                    },
+                ],
+            ),
+            stage="llm_followup",
+        )
+        content = response.choices[0].message.content
+        if not content:
+            return
+        result = await validate_llm_json(
+            DocAnalysisResult,
+            content,
+            reask=_field_reasker("gpt-4.1-mini", budget),
+        )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        metrics.incr("progressive.followup_failed")
+        logger.warning("uncertainty follow-up failed (%s): %s", doc_id, e)
+        return
+
+    for evidence in result.evidence:
+        page = locate_in_pages(evidence.text, selected)
+        if page is not None:
+            evidence.page = page
+    result.id = doc_id
+    result.coverage = previous.coverage.model_copy(
+        update={"extra_pages": [page_no for page_no, _ in selected]}
+    )
+    # 사전 생성 답변 등 문서별 상태를 잃지 않도록 새로 저장하지 않고 결과만 바꿉니다.
+    if not doc_store.update_result(stored, result):
+        return
+    metrics.incr("progressive.followup_resolved")
+
+
+def _schedule_uncertainty_followup(doc_id: str) -> None:
+    if not settings.PROGRESSIVE_RESOLVE_UNCERTAINTY:
+        return
+    stored = doc_store.get(doc_id)
+    if stored is None or stored.source is None or not stored.result.uncertainty:
+        return
+    task = asyncio.create_task(_resolve_uncertainty(doc_id))
+    _followup_tasks.add(task)
+    task.add_done_callback(_followup_tasks.discard)
+
+
+async def cancel_uncertainty_followups() -> None:
+    """앱 종료 시 진행 중인 불확실 항목 보완 태스크를 취소합니다."""
+    for task in list(_followup_tasks):
+        task.cancel()
+    await asyncio.gather(*_followup_tasks, return_exceptions=True)
+
+
+def _document_id(raw_bytes: bytes) -> str:
+    """업로드 파일 내용으로 문서 ID를 만듭니다. (같은 파일이면 같은 ID)"""
+    return "doc-" + hashlib.sha256(raw_bytes).hexdigest()[:16]
+
+
+def _attach_evidence_pages(result: DocAnalysisResult, normalized: NormalizedText) -> None:
+    """
+    근거 문장을 정규화 텍스트에서 찾아 페이지 오프셋 맵으로 실제 페이지 번호를 채웁니다.
+
+    찾지 못한 근거는 LLM이 적은 페이지 값을 그대로 둡니다.
+    """
+    for evidence in result.evidence:
+        page = normalized.locate_page(evidence.text)
+        if page is not None:
+            evidence.page = page
+
+
+_REVISION_USER_PROMPT: Final[str] = """아래는 이전 판 공고문의 분석 결과와, 정정공고에서 바뀐 페이지입니다.
+바뀐 내용을 반영해 위 스키마에 맞는 전체 JSON만 다시 출력하세요.
+바뀐 페이지와 관계없는 항목은 이전 분석 결과를 그대로 유지하고, 바뀐 내용의 근거 문장은 evidence 에 추가하세요.
+
+파일 이름: {filename}
+
+이전 분석 결과:
+{result}
+
+바뀐 페이지:
+{pages}"""
+
+
+def _same_notice(previous: StoredDocument, hashes: list[str], first_page: str) -> bool:
+    """첫 페이지가 같거나, 새 첫 페이지에 이전 판의 제목이 그대로 있으면 같은 공고로 봅니다."""
+    if previous.page_hashes and hashes and previous.page_hashes[0] == hashes[0]:
+        return True
+    title = previous.result.extracted.title
+    if not title:
+        return False
+    compact = "".join(title.split())
+    return len(compact) >= 4 and compact in "".join(first_page.split())
+
+
+async def _analyze_revision(
+    filename: str,
+    raw_bytes: bytes,
+    ext: str,
+    doc_id: str,
+    owner: str,
+    budget: RequestBudget,
+) -> StoredDocument | None:
+    """
+    같은 클라이언트가 이미 분석한 문서와 페이지 대부분이 같은 정정공고면
+    바뀐 페이지만 추출/전송해 이전 결과에 병합합니다.
+
+    이전 판을 찾지 못했거나 증분 분석이 실패하면 None (전체 분석으로 진행).
+    """
+    if not doc_store.has_page_hashes():
+        return None
+    if ext == ".pdf":
+        async with extraction_limiter.reserve(
+            estimate_extraction_cost(len(raw_bytes)), budget
+        ):
+            hashes = await budget.run_in_thread(
+                pdf_page_hashes, raw_bytes, stage="revision_hash"
+            )
+        texts: dict[int, str] = {}
+    else:
+        try:
+            all_pages = raw_bytes.decode("utf-8").split("\f")
+        except UnicodeDecodeError:
+            return None
+        hashes = [text_page_hash(page) for page in all_pages]
+        texts = dict(enumerate(all_pages))
+
+    base = doc_store.find_revision_base(
+        hashes, settings.REVISION_MIN_SHARED_RATIO, owner=owner, exclude=doc_id
+    )
+    if base is None:
+        return None
+    previous = base.stored
+
+    changed = [index for index, page_hash in enumerate(hashes) if page_hash not in base.shared]
+    if ext == ".pdf" and changed:
+        async with extraction_limiter.reserve(
+            estimate_extraction_cost(len(raw_bytes)), budget
+        ):
+            texts = await budget.run_in_thread(
+                extract_pdf_pages_at,
+                raw_bytes,
+                changed,
+                tables=settings.PDF_TABLE_EXTRACTION,
+                stage="revision_extract",
+            )
+    raw_pages = [
+        texts[index] if index in texts and page_hash not in base.shared
+        else previous.raw_pages[base.shared[page_hash]]
+        for index, page_hash in enumerate(hashes)
+    ]
+    # 공유 페이지(안내문 등)만 같은 다른 문서를 정정공고로 오인하지 않도록 첫 페이지/제목도 확인
+    if not _same_notice(previous, hashes, raw_pages[0] if raw_pages else ""):
+        metrics.incr("revision.rejected")
+        return None
+    normalized = normalize_pages(raw_pages)
+    new_hashes = set(hashes)
+    removed = [
+        index for index, page_hash in enumerate(previous.page_hashes) if page_hash not in new_hashes
+    ]
+
+    if not changed and not removed:
+        # 페이지 순서만 바뀌었거나 같은 내용을 다시 저장한 파일
+        result = previous.result.model_copy(deep=True)
+    else:
+        if not is_configured():
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.",
+            )
+        page_sections = [(f"변경 후 {index + 1}", raw_pages[index]) for index in changed]
+        page_sections += [
+            (f"삭제/변경 전 {index + 1}", previous.raw_pages[index]) for index in removed
+        ]
+        try:
+            response = await budget.run(
+                get_client().chat.completions.create(
+                    model="gpt-4.1-mini",
+                    response_format={"type": "json_object"},
+                    temperature=0.2,
+                    timeout=budget.remaining(),
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {
+                            "role": "user",
+                            "content": _REVISION_USER_PROMPT.format(
+                                filename=filename,
+                                result=dumps(
+                                    previous.result.model_dump(exclude={"coverage", "revision"})
+                                ),
+                                pages=_format_excerpts(page_sections),
+                            ),
+                        },
+                    ],
+                ),
+                stage="llm_revision",
+            )
+            content = response.choices[0].message.content
+            if not content:
+                raise ValueError("LLM 응답이 비어 있습니다.")
+            result = await validate_llm_json(
+                DocAnalysisResult,
+                content,
+                reask=_field_reasker("gpt-4.1-mini", budget),
+            )
+        except RequestCancelled:
+            raise
+        except Exception as e:
+            metrics.incr("revision.failed")
+            logger.warning("incremental re-analysis failed (%s): %s", doc_id, e)
+            return None
+
+        changed_pages = {index + 1 for index in changed}
+        result.evidence = merge_evidence(previous.result, result, normalized, changed_pages)
+
+    result.id = doc_id
+    result.coverage = PageCoverage(
+        analyzed_pages=len(raw_pages), total_pages=len(raw_pages), complete=True
+    )
+    result.revision = RevisionInfo(
+        previous_id=previous.result.id,
+        changed_pages=[index + 1 for index in changed],
+        removed_pages=[index + 1 for index in removed],
+        reused_pages=len(hashes) - len(changed),
+        field_changes=diff_fields(previous.result, result),
+        deadline_changes=diff_deadlines(previous.result, result),
+    )
+    stored = doc_store.put(
+        result,
+        pages=normalized.page_texts(),
+        page_hashes=hashes,
+        raw_pages=raw_pages,
+        owner=owner,
+    )
+    metrics.incr("revision.incremental")
+    metrics.incr("revision.reused_pages", len(hashes) - len(changed))
+    logger.info(
+        "incremental re-analysis %s: base %s, %d/%d pages changed, %d removed",
+        filename,
+        previous.result.id,
+        len(changed),
+        len(hashes),
+        len(removed),
+    )
+    return stored
+
+
 ELIGIBILITY_SYSTEM_PROMPT: Final[str] = """
 당신은 한국 공공 임대/분양 주택 공고를 기반으로,
 사용자가 입력한 간단한 조건(거주지, 가구 구성, 소득 수준, 특별 자격 등)에 따라
@@ -132,17 +510,44 @@ EligibilityUserProfile의 income_level 필드는 다음 중 하나입니다.
 - 제도/점수 체계가 확실하지 않으면 대략적인 설명과 함께 "likely" 또는 "unknown"을 사용하세요.
 """
 
+_HOUSING_ELIGIBILITY = EligibilitySpec(
+    model="gpt-4.1-mini",
+    system_prompt=ELIGIBILITY_SYSTEM_PROMPT,
+    profile_model=EligibilityUserProfile,
+    result_model=EligibilityResult,
+    doc_label="공고 분석 결과",
+    completion_kwargs={"response_format": {"type": "json_object"}},
+)
+
+_JOB_SUPPORT_ELIGIBILITY = EligibilitySpec(
+    model="gpt-4o-mini",
+    system_prompt=JOB_SUPPORT_ELIGIBILITY_PROMPT,
+    profile_model=JobSupportUserProfile,
+    result_model=JobSupportEligibilityResult,
+    doc_label="지원금 공고 분석 결과",
+    completion_kwargs={"max_tokens": 1000},
+)
+
 
 @router.post(
     "/analyze",
     response_model=DocAnalysisResult,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
 )
-async def analyze_document(file: UploadFile = File(...)):
+async def analyze_document(
+    file: UploadFile = File(...),
+    budget: RequestBudget = Depends(request_budget),
+    client_id: str = Depends(usage_quota),
+):
     """
     문서를 업로드하고 AI로 분석합니다.
 
     - **file**: 업로드할 문서 파일 (multipart/form-data)
+    - **X-Request-Timeout** 헤더: 처리 시간 예산(초), 초과하거나 연결이 끊기면 처리 중단
     """
     # 간단한 파일 타입/크기 검증 (필요 시 config의 설정을 사용할 수 있음)
     if not file.filename:
@@ -157,69 +562,178 @@ async def analyze_document(file: UploadFile = File(...)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="빈 파일입니다.",
         )
+    # LLM이 만든 임의 ID 대신 파일 내용 해시로 ID를 부여해 재조회/캐시 키로 사용
+    doc_id = _document_id(raw_bytes)
+    tag_profile(doc=doc_id)
 
     # 파일 확장자에 따라 텍스트 추출 방식 분기
     _, ext = os.path.splitext(file.filename.lower())
 
-    if ext == ".pdf":
-        # PDF 파일: pdfplumber로 텍스트 추출
+    # 이전에 분석한 공고의 정정공고면 바뀐 페이지만 다시 분석
+    if settings.INCREMENTAL_REANALYSIS:
         try:
-            # UploadFile은 스포일되었으므로 bytes 기반으로 처리
-            # pdfplumber는 파일 경로나 파일 객체를 기대하므로 BytesIO 사용
-            import io
+            revised = await _analyze_revision(
+                file.filename, raw_bytes, ext, doc_id, client_id, budget
+            )
+        except (HTTPException, RequestCancelled):
+            raise
+        except Exception as e:
+            # 페이지 해시를 계산하지 못한 파일은 전체 분석에서 오류를 보고
+            logger.info("revision lookup skipped (%s): %s", file.filename, e)
+            revised = None
+        if revised is not None:
+            schedule_precompute(revised.result.id)
+            return json_body_response(revised.body, revised.etag, ANALYSIS_CACHE_CONTROL)
+
+    # 점진적 추출이면 앞 페이지부터 토큰 예산까지만 분석에 사용
+    token_budget = (
+        settings.PROGRESSIVE_TOKEN_BUDGET if settings.PROGRESSIVE_EXTRACTION else None
+    )
+    source: PageSource | None = None
 
-            with pdfplumber.open(io.BytesIO(raw_bytes)) as pdf:
-                pages_text = [page.extract_text() or "" for page in pdf.pages]
-            text = "\n\n".join(pages_text).strip()
+    if ext == ".pdf":
+        # PDF 파일: pdfplumber로 텍스트 추출 (표는 구분자 행으로 따로 추출)
+        try:
+            # 동시 추출은 개수가 아니라 예상 메모리 비용 합으로 제한
+            async with extraction_limiter.reserve(
+                estimate_extraction_cost(len(raw_bytes)), budget
+            ):
+                batch = await budget.run_in_thread(
+                    extract_pdf_page_range,
+                    raw_bytes,
+                    token_budget=token_budget,
+                    tables=settings.PDF_TABLE_EXTRACTION,
+                    stage="extract",
+                )
+        except RequestCancelled:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"PDF 파일을 읽는 중 오류가 발생했습니다: {e}",
             ) from e
 
-        if not text:
+        pages_text, total_pages = batch.pages, batch.total_pages
+        page_hashes = batch.hashes
+        if not batch.complete:
+            # 나머지 페이지는 채팅/불확실 항목 보완에 필요할 때 추출
+            source = PageSource(
+                pages=list(pages_text),
+                total_pages=total_pages,
+                analyzed_pages=len(pages_text),
+                raw_bytes=raw_bytes,
+                tables=settings.PDF_TABLE_EXTRACTION,
+            )
+
+        normalized = normalize_pages(pages_text)
+        if not normalized.text:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="PDF에서 추출할 수 있는 텍스트가 없습니다.",
             )
     else:
-        # 기본: UTF-8 텍스트 파일로 처리
+        # 기본: UTF-8 텍스트 파일로 처리 (폼피드 문자가 있으면 페이지 구분으로 사용)
         try:
-            text = raw_bytes.decode("utf-8")
+            all_pages = raw_bytes.decode("utf-8").split("\f")
         except UnicodeDecodeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="현재는 UTF-8 인코딩 텍스트(.txt) 또는 PDF 파일만 지원합니다.",
             )
+        total_pages = len(all_pages)
+        analyzed = (
+            pages_within_budget(all_pages, token_budget)
+            if token_budget is not None
+            else total_pages
+        )
+        pages_text = all_pages[:analyzed]
+        page_hashes = [text_page_hash(page) for page in pages_text]
+        if analyzed < total_pages:
+            source = PageSource(
+                pages=all_pages, total_pages=total_pages, analyzed_pages=analyzed
+            )
+        normalized = normalize_pages(pages_text)
+
+    # 원본 바이트는 더 이상 필요 없음 (남은 페이지가 있으면 source 가 보관)
+    del raw_bytes
+
+    # 반복 머리글/꼬리글/고지문 제거로 줄어든 입력 토큰 기록
+    logger.info(
+        "text normalization %s: %d -> %d tokens (-%.1f%%)",
+        file.filename,
+        normalized.original_tokens,
+        normalized.normalized_tokens,
+        normalized.reduction_ratio * 100,
+    )
+    text = normalized.text
+    coverage = PageCoverage(
+        analyzed_pages=len(pages_text),
+        total_pages=total_pages,
+        complete=source is None,
+    )
+    if not coverage.complete:
+        logger.info(
+            "progressive extraction %s: analyzing pages 1-%d of %d",
+            file.filename,
+            coverage.analyzed_pages,
+            coverage.total_pages,
+        )
+        # 뒤쪽 페이지가 빠졌다는 사실을 알려 확인하지 못한 정보는 uncertainty 로 남기게 함
+        text += _PARTIAL_DOCUMENT_NOTE.format(
+            analyzed=coverage.analyzed_pages, total=coverage.total_pages
+        )
 
-    if not settings.OPEN_AI_KEY:
+    if not is_configured():
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.",
         )
 
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"다음 공공 문서를 분석해서 위 스키마에 맞는 JSON만 출력하세요.\n\n파일 이름: {file.filename}\n\n문서 내용:\n{text}",
+        },
+    ]
     try:
-        # OpenAI LLM 호출
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            response_format={"type": "json_object"},
-            temperature=0.2,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": f"다음 공공 문서를 분석해서 위 스키마에 맞는 JSON만 출력하세요.\n\n파일 이름: {file.filename}\n\n문서 내용:\n{text}",
-                },
-            ],
-        )
+        if settings.ANALYZE_FANOUT:
+            # 섹션별 작은 호출을 동시에 보내 출력 생성 시간을 줄임 (문서 메시지는 캐시 접두사로 공유)
+            result = await analyze_in_sections(
+                messages,
+                "gpt-4.1-mini",
+                budget,
+                reask=_field_reasker("gpt-4.1-mini", budget),
+                cache_key=doc_id,
+                response_format={"type": "json_object"},
+                temperature=0.2,
+            )
+        else:
+            # OpenAI LLM 호출 (연결 끊김/시간 초과 시 취소)
+            response = await budget.run(
+                get_client().chat.completions.create(
+                    model="gpt-4.1-mini",
+                    response_format={"type": "json_object"},
+                    temperature=0.2,
+                    timeout=budget.remaining(),
+                    messages=messages,
+                ),
+                stage="llm",
+            )
 
-        content = response.choices[0].message.content
-        if not content:
-            raise ValueError("LLM 응답이 비어 있습니다.")
+            content = response.choices[0].message.content
+            if not content:
+                raise ValueError("LLM 응답이 비어 있습니다.")
 
-        data = json.loads(content)
-    except HTTPException:
-        # 위에서 이미 적절한 상태코드로 raise 한 경우
+            # JSON 복구 → 로컬 보정 → 잘못된 필드만 재질의 순으로 검증
+            result = await validate_llm_json(
+                DocAnalysisResult,
+                content,
+                reask=_field_reasker("gpt-4.1-mini", budget),
+            )
+        _attach_evidence_pages(result, normalized)
+    except (HTTPException, RequestCancelled):
+        # 위에서 이미 적절한 상태코드로 raise 한 경우 / 요청 취소
         raise
     except Exception as e:
         # LLM 호출/파싱 중 에러
@@ -228,17 +742,72 @@ async def analyze_document(file: UploadFile = File(...)):
             detail=f"문서 분석 중 오류가 발생했습니다: {e}",
         ) from e
 
-    # Pydantic 스키마로 검증 후 반환
-    return DocAnalysisResult(**data)
+    result.id = doc_id
+    result.coverage = coverage
+    # 전체 페이지를 분석했으면 정정공고 증분 재분석용 페이지 해시/원문도 보관
+    stored = doc_store.put(
+        result,
+        source=source,
+        pages=normalized.page_texts(),
+        page_hashes=page_hashes if coverage.complete else None,
+        raw_pages=list(pages_text) if coverage.complete else None,
+        owner=client_id,
+    )
+    # 추천 질문 답변을 백그라운드에서 미리 생성 (설정으로 켠 경우)
+    schedule_precompute(result.id)
+    # 분석하지 않은 페이지가 있고 불확실 항목이 남았으면 백그라운드에서 보완
+    _schedule_uncertainty_followup(result.id)
+    return json_body_response(stored.body, stored.etag, ANALYSIS_CACHE_CONTROL)
+
+
+def _stored_analysis_etag(doc_id: str) -> str | None:
+    stored = doc_store.get(doc_id)
+    return stored.etag if stored is not None else None
+
+
+@router.get(
+    "/analyze/{doc_id}",
+    response_model=DocAnalysisResult,
+    responses={304: {"description": "Not Modified"}, 404: {"model": ErrorResponse}},
+    summary="분석 결과 재조회",
+    description="""
+    이전에 분석한 문서의 결과를 다시 조회합니다.
+
+    - ETag/If-None-Match 조건부 요청 지원 (변경이 없으면 304)
+    """,
+)
+async def get_analysis(
+    doc_id: str,
+    etag: str | None = Depends(
+        conditional(_stored_analysis_etag, ANALYSIS_CACHE_CONTROL)
+    ),
+):
+    """
+    저장된 문서 분석 결과 조회
+    """
+    stored = doc_store.get(doc_id)
+    if stored is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="분석 결과를 찾을 수 없습니다.",
+        )
+    return json_body_response(stored.body, stored.etag, ANALYSIS_CACHE_CONTROL)
 
 
 @router.post(
     "/analyze/eligibility",
     response_model=EligibilityResult,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(usage_quota)],
 )
 async def analyze_eligibility(
-    profile: EligibilityUserProfile, doc: DocAnalysisResult
+    profile: EligibilityUserProfile,
+    doc: DocAnalysisResult,
+    budget: RequestBudget = Depends(request_budget),
 ):
     """
     사용자의 조건을 입력받아 해당 공고에 대한 신청 가능성을 평가합니다.
@@ -246,55 +815,40 @@ async def analyze_eligibility(
     - **profile**: 사용자의 간단한 조건 정보
     - **doc**: 앞 단계에서 생성된 문서 분석 결과
     """
-    if not settings.OPEN_AI_KEY:
+    if not is_configured():
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.",
         )
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            response_format={"type": "json_object"},
-            temperature=0.2,
-            messages=[
-                {
-                    "role": "system",
-                    "content": ELIGIBILITY_SYSTEM_PROMPT,
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        "다음 공고 분석 결과(DocAnalysisResult)와 "
-                        "사용자 조건(EligibilityUserProfile)을 참고하여, "
-                        "위에서 설명한 EligibilityResult JSON만 출력하세요.\n\n"
-                        f"[공고 분석 결과]\n"
-                        f"{json.dumps(doc.model_dump(), ensure_ascii=False)}\n\n"
-                        f"[사용자 조건]\n"
-                        f"{json.dumps(profile.model_dump(), ensure_ascii=False)}"
-                    ),
-                },
-            ],
+        result = await evaluate_pair(
+            _HOUSING_ELIGIBILITY,
+            doc,
+            profile,
+            budget,
+            reask=_field_reasker(_HOUSING_ELIGIBILITY.model, budget),
         )
-
-        content = response.choices[0].message.content
-        if not content:
-            raise ValueError("LLM 응답이 비어 있습니다.")
-
-        data = json.loads(content)
+    except RequestCancelled:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"신청 가능성 분석 중 오류가 발생했습니다: {e}",
         ) from e
 
-    return EligibilityResult(**data)
+    return model_response(result)
 
 
 @router.post(
     "/analyze/job-support-eligibility",
     response_model=JobSupportEligibilityResult,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(usage_quota)],
     summary="취업지원금 신청 자격 평가",
     description="""
     취업지원금 공고 분석 결과와 사용자 정보를 기반으로 신청 자격을 평가합니다.
@@ -307,51 +861,128 @@ async def analyze_eligibility(
 async def check_job_support_eligibility(
     doc: DocAnalysisResult,
     profile: JobSupportUserProfile,
+    budget: RequestBudget = Depends(request_budget),
 ):
     """
     취업지원금 신청 자격 평가
     """
-    if not settings.OPEN_AI_KEY:
+    if not is_configured():
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.",
         )
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.2,
-            max_tokens=1000,
-            messages=[
-                {
-                    "role": "system",
-                    "content": JOB_SUPPORT_ELIGIBILITY_PROMPT,
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        "다음 지원금 공고 분석 결과(DocAnalysisResult)와 "
-                        "사용자 조건(JobSupportUserProfile)을 참고하여, "
-                        "위에서 설명한 JobSupportEligibilityResult JSON만 출력하세요.\n\n"
-                        f"[공고 분석 결과]\n"
-                        f"{json.dumps(doc.model_dump(), ensure_ascii=False)}\n\n"
-                        f"[사용자 조건]\n"
-                        f"{json.dumps(profile.model_dump(), ensure_ascii=False)}"
-                    ),
-                },
-            ],
+        result = await evaluate_pair(
+            _JOB_SUPPORT_ELIGIBILITY,
+            doc,
+            profile,
+            budget,
+            reask=_field_reasker(_JOB_SUPPORT_ELIGIBILITY.model, budget),
         )
-
-        content = response.choices[0].message.content
-        if not content:
-            raise ValueError("LLM 응답이 비어 있습니다.")
-
-        data = json.loads(content)
+    except RequestCancelled:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"취업지원금 자격 평가 중 오류가 발생했습니다: {e}",
         ) from e
 
-    return JobSupportEligibilityResult(**data)
+    return model_response(result)
+
+
+def _batch_response(
+    spec: EligibilitySpec,
+    request: EligibilityBatchRequest | JobSupportEligibilityBatchRequest,
+    budget: RequestBudget,
+    client_id: str,
+) -> StreamingResponse:
+    """배치 요청을 검증하고 조합별 결과를 NDJSON 으로 스트리밍합니다."""
+    if not is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.",
+        )
 
+    if request.pairs is None:
+        positions = [
+            (doc_index, profile_index)
+            for doc_index in range(len(request.documents))
+            for profile_index in range(len(request.profiles))
+        ]
+    else:
+        positions = request.pairs
+        for doc_index, profile_index in positions:
+            if not (0 <= doc_index < len(request.documents)
+                    and 0 <= profile_index < len(request.profiles)):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"잘못된 조합 인덱스입니다: [{doc_index}, {profile_index}]",
+                )
+    if len(positions) > settings.ELIGIBILITY_BATCH_MAX_PAIRS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"한 번에 최대 {settings.ELIGIBILITY_BATCH_MAX_PAIRS}개 조합까지 평가할 수 있습니다.",
+        )
+
+    plan = plan_batch(request.documents, request.profiles, positions)
+    return StreamingResponse(
+        stream_batch(
+            spec,
+            plan,
+            budget,
+            reask=_field_reasker(spec.model, budget),
+            client_id=client_id,
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+_BATCH_DESCRIPTION: Final[str] = """
+    공고 목록(documents) × 신청자 조건 목록(profiles)을 한 번에 평가합니다.
+
+    - pairs: 평가할 (documents 인덱스, profiles 인덱스) 목록. 없으면 모든 조합
+    - 내용이 같은 공고/조건 조합은 한 번만 평가하고, 공고(또는 조건)를 공유하는 조합 여러 개를
+      한 번의 LLM 호출에 묶어 평가합니다.
+    - 응답은 NDJSON 스트림입니다. 끝나는 순서대로 조합마다
+      `{"doc_index": 0, "profile_index": 1, "result": {...}}` (실패 시 `"error"`) 한 줄을 보내고,
+      마지막에 `{"done": true, "pairs": ..., "evaluated": ..., "completions": ..., "failed": ...}` 요약 줄을 보냅니다.
+    """
+
+
+@router.post(
+    "/analyze/eligibility/batch",
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}},
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    summary="신청 가능성 배치 평가",
+    description=_BATCH_DESCRIPTION,
+)
+async def analyze_eligibility_batch(
+    request: EligibilityBatchRequest,
+    budget: RequestBudget = Depends(request_budget),
+    client_id: str = Depends(usage_quota),
+):
+    return _batch_response(_HOUSING_ELIGIBILITY, request, budget, client_id)
+
+
+@router.post(
+    "/analyze/job-support-eligibility/batch",
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}},
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    summary="취업지원금 자격 배치 평가",
+    description=_BATCH_DESCRIPTION,
+)
+async def check_job_support_eligibility_batch(
+    request: JobSupportEligibilityBatchRequest,
+    budget: RequestBudget = Depends(request_budget),
+    client_id: str = Depends(usage_quota),
+):
+    return _batch_response(_JOB_SUPPORT_ELIGIBILITY, request, budget, client_id)
@@ -1,11 +1,30 @@
 """
 대화형 질의응답 API
 """
-from fastapi import APIRouter, HTTPException, status
-from openai import OpenAI
+from functools import lru_cache
 
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.answer_cache import answer_cache, context_key, is_context_free
+from app.core.answers import (
+    first_turn_question,
+    generate_answer,
+    lookup_precomputed,
+    retrieve_excerpts,
+)
 from app.core.config import settings
-from app.core.prompts import get_chat_prompt, get_suggested_questions
+from app.core.deadline import RequestBudget, RequestCancelled, request_budget
+from app.core.http_cache import (
+    SUGGESTIONS_CACHE_CONTROL,
+    conditional,
+    json_body_response,
+    make_etag,
+)
+from app.core.llm import is_configured
+from app.core.profiling import tag_profile
+from app.core.prompts import get_suggested_questions
+from app.core.serialization import model_response, to_json_bytes
+from app.core.usage import usage_quota
 from app.models.schemas import (
     AnswerSource,
     ChatRequest,
@@ -14,16 +33,18 @@ from app.models.schemas import (
     ErrorResponse,
 )
 
-
-client = OpenAI(api_key=settings.OPEN_AI_KEY)
-
 router = APIRouter()
 
 
 @router.post(
     "/chat",
     response_model=ChatResponse,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(usage_quota)],
     summary="문서에 대한 대화형 질의응답",
     description="""
     분석된 문서에 대해 자연어로 질문하고 답변을 받습니다.
@@ -33,7 +54,10 @@ router = APIRouter()
     - 추천 질문도 함께 반환
     """,
 )
-async def chat_with_document(request: ChatRequest):
+async def chat_with_document(
+    request: ChatRequest,
+    budget: RequestBudget = Depends(request_budget),
+):
     """
     문서에 대한 대화형 질의응답
     
@@ -46,37 +70,40 @@ async def chat_with_document(request: ChatRequest):
     Raises:
         HTTPException: OpenAI API 키가 없거나 응답 생성 중 오류 발생
     """
-    if not settings.OPEN_AI_KEY:
+    if not is_configured():
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.",
         )
     
-    # 대화 히스토리가 너무 길면 최근 10개만 유지 (토큰 절약)
-    recent_messages = request.messages[-10:] if len(request.messages) > 10 else request.messages
-    
-    # 시스템 프롬프트 생성 (문서 컨텍스트 포함)
-    system_prompt = get_chat_prompt(request.doc_context.model_dump())
-    
+    tag_profile(doc=request.doc_id)
+
     try:
-        # OpenAI Chat API 호출
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # 빠르고 저렴한 모델
-            temperature=0.3,  # 일관된 답변을 위해 낮게 설정
-            max_tokens=500,  # 답변 길이 제한
-            messages=[
-                {"role": "system", "content": system_prompt},
-                *[
-                    {"role": msg.role, "content": msg.content}
-                    for msg in recent_messages
-                ],
-            ],
-        )
-        
-        answer = response.choices[0].message.content
-        
-        if not answer:
-            raise ValueError("AI 응답이 비어 있습니다.")
+        # 첫 질문이 미리 생성해 둔 추천 질문 답변과 일치하면 바로 응답
+        answer = None
+        question = first_turn_question(request.messages)
+        if question is not None:
+            answer = lookup_precomputed(request.doc_id, request.doc_context, question)
+
+        # 첫 질문/문맥 없는 질문은 같은 문서의 유사 질문 답변을 재사용
+        use_cache = settings.ANSWER_CACHE_ENABLED and is_context_free(request.messages)
+        if use_cache:
+            cache_key = context_key(request.doc_id, request.doc_context)
+            if answer is None:
+                answer = answer_cache.get(cache_key, request.messages[-1].content)
+
+        excerpts: list[tuple[int, str]] = []
+        if answer is None:
+            # 분석하지 않은 뒤쪽 페이지에 관련 내용이 있으면 원문 발췌를 함께 전달
+            excerpts = await retrieve_excerpts(
+                request.doc_id, request.messages[-1].content, budget
+            )
+            # OpenAI Chat API 호출
+            answer = await generate_answer(
+                request.doc_context, request.messages, budget, excerpts
+            )
+            if use_cache:
+                answer_cache.put(cache_key, request.messages[-1].content, answer)
         
         # 문서 유형에 맞는 추천 질문 생성
         doc_type = request.doc_context.extracted.docType
@@ -89,7 +116,9 @@ async def chat_with_document(request: ChatRequest):
 
         # 간단한 근거 선택 로직:
         # - 분석 결과의 evidence 항목 중에서 최근 사용자 질문과 가장 관련 있어 보이는 것 상위 3개 선택
-        sources: list[AnswerSource] = []
+        sources: list[AnswerSource] = [
+            AnswerSource(text=text[:200], page=page_no) for page_no, text in excerpts
+        ]
         evidences = request.doc_context.evidence or []
 
         if evidences:
@@ -111,7 +140,7 @@ async def chat_with_document(request: ChatRequest):
                 reverse=True,
             )
 
-            for ev in sorted_evidences[:3]:
+            for ev in sorted_evidences[: max(0, 3 - len(sources))]:
                 # analyze 단계에서 설정된 page 정보를 그대로 사용
                 # (없으면 None으로 두고, 프론트에서 '페이지 정보 없음' 상태로 처리)
                 sources.append(
@@ -122,13 +151,17 @@ async def chat_with_document(request: ChatRequest):
                     )
                 )
 
-        return ChatResponse(
-            message=answer,
-            suggestions=suggestions,
-            confidence=0.9,  # 추후 실제 신뢰도 계산 로직 추가 가능
-            sources=sources,
+        return model_response(
+            ChatResponse(
+                message=answer,
+                suggestions=suggestions,
+                confidence=0.9,  # 추후 실제 신뢰도 계산 로직 추가 가능
+                sources=sources,
+            )
         )
         
+    except RequestCancelled:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -136,13 +169,33 @@ async def chat_with_document(request: ChatRequest):
         ) from e
 
 
+@lru_cache(maxsize=256)
+def _suggestions_body(doc_type: str, limit: int) -> tuple[bytes, str]:
+    """추천 질문 응답 본문과 ETag (정적 데이터이므로 한 번만 직렬화)"""
+    questions = [
+        SuggestedQuestion(text=q["text"], category=q["category"])
+        for q in get_suggested_questions(doc_type, limit)
+    ]
+    body = to_json_bytes(questions)
+    return body, make_etag(body)
+
+
+def _suggestions_etag(doc_type: str, limit: int = 5) -> str:
+    return _suggestions_body(doc_type, limit)[1]
+
+
 @router.get(
     "/chat/suggestions/{doc_type}",
     response_model=list[SuggestedQuestion],
+    responses={304: {"description": "Not Modified"}},
     summary="문서 유형별 추천 질문 조회",
     description="특정 문서 유형에 대한 추천 질문 목록을 반환합니다.",
 )
-async def get_suggestions_by_type(doc_type: str, limit: int = 5):
+async def get_suggestions_by_type(
+    doc_type: str,
+    limit: int = 5,
+    etag: str = Depends(conditional(_suggestions_etag, SUGGESTIONS_CACHE_CONTROL)),
+):
     """
     특정 문서 유형에 대한 추천 질문 목록을 반환
     
@@ -153,9 +206,6 @@ async def get_suggestions_by_type(doc_type: str, limit: int = 5):
     Returns:
         추천 질문 목록
     """
-    questions = get_suggested_questions(doc_type, limit)
-    return [
-        SuggestedQuestion(text=q["text"], category=q["category"])
-        for q in questions
-    ]
+    body, etag = _suggestions_body(doc_type, limit)
+    return json_body_response(body, etag, SUGGESTIONS_CACHE_CONTROL)
 
@@ -0,0 +1,135 @@
+"""
+클라이언트별 LLM 토큰 사용량 조회 API
+"""
+import asyncio
+import hmac
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+
+from app.core.config import settings
+from app.core.serialization import FastJSONResponse, model_response
+from app.core.usage import UsageTotals, client_identity, usage_ledger
+from app.models.schemas import ErrorResponse, UsageBreakdown, UsageReport
+
+router = APIRouter()
+
+ADMIN_TOKEN_HEADER = "x-usage-token"
+
+# 조회 가능한 최대 기간 (분)
+_MAX_WINDOW_MINUTES = 60 * 24 * 31
+
+
+def _require_admin(request: Request) -> None:
+    token = settings.USAGE_ADMIN_TOKEN
+    if not token:
+        # 토큰을 설정하지 않았으면 다른 클라이언트 ID/IP 가 노출되지 않도록 전체 조회를 막음
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="사용량 조회 관리자 토큰(USAGE_ADMIN_TOKEN)이 설정되어 있지 않습니다.",
+        )
+    header = request.headers.get(ADMIN_TOKEN_HEADER, "")
+    if not hmac.compare_digest(header.encode(), token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="사용량 조회 권한이 없습니다.",
+        )
+
+
+def _since(minutes: int) -> float:
+    # 분 단위로 저장하므로 시작 시각도 분 경계로 맞춤
+    return (time.time() // 60 - minutes + 1) * 60
+
+
+def _build_report(
+    client_id: str, since: float, totals: dict[tuple[str, str, str, str], UsageTotals]
+) -> UsageReport:
+    breakdown = [
+        UsageBreakdown(
+            label=label or None,
+            route=route,
+            model=model,
+            calls=t.calls,
+            prompt_tokens=t.prompt_tokens,
+            completion_tokens=t.completion_tokens,
+            total_tokens=t.total_tokens,
+            avg_latency_ms=round(t.latency_ms / t.calls, 1) if t.calls else 0.0,
+        )
+        for (cid, label, route, model), t in totals.items()
+        if cid == client_id
+    ]
+    breakdown.sort(key=lambda item: -item.total_tokens)
+    limit = usage_ledger.limit_for(client_id)
+    return UsageReport(
+        client_id=client_id,
+        since=datetime.fromtimestamp(since, tz=timezone.utc),
+        calls=sum(item.calls for item in breakdown),
+        total_tokens=sum(item.total_tokens for item in breakdown),
+        tokens_last_minute=usage_ledger.tokens_last_minute(client_id),
+        tokens_per_minute_limit=limit or None,
+        breakdown=breakdown,
+    )
+
+
+async def _client_report(client_id: str, minutes: int) -> UsageReport:
+    since = _since(minutes)
+    totals = await asyncio.to_thread(usage_ledger.totals_since, since, client_id)
+    return _build_report(client_id, since, totals)
+
+
+@router.get(
+    "/usage/me",
+    response_model=UsageReport,
+    summary="내 LLM 사용량 조회",
+    description="""
+    요청한 클라이언트(`X-Client-Key` 로 인증된 클라이언트, 없으면 접속 IP)의 토큰 사용량과 분당 할당량을 반환합니다.
+    `X-Client-Id` 라벨별로 나눠 보여 줍니다.
+
+    - minutes: 집계 기간 (분, 기본 60)
+    """,
+)
+async def get_my_usage(
+    request: Request,
+    minutes: int = Query(60, ge=1, le=_MAX_WINDOW_MINUTES),
+):
+    return model_response(await _client_report(client_identity(request), minutes))
+
+
+@router.get(
+    "/usage/clients",
+    response_model=list[UsageReport],
+    responses={403: {"model": ErrorResponse}},
+    summary="전체 클라이언트 사용량 조회",
+    description="""
+    기간 내 LLM 을 호출한 모든 클라이언트의 사용량을 토큰 많은 순으로 반환합니다.
+
+    `USAGE_ADMIN_TOKEN` 과 같은 값을 `X-Usage-Token` 헤더로 보내야 합니다. (설정하지 않았으면 403)
+    """,
+)
+async def list_client_usage(
+    request: Request,
+    minutes: int = Query(60, ge=1, le=_MAX_WINDOW_MINUTES),
+):
+    _require_admin(request)
+    since = _since(minutes)
+    totals = await asyncio.to_thread(usage_ledger.totals_since, since)
+    client_ids = dict.fromkeys(cid for cid, _, _, _ in totals)
+    reports = [_build_report(cid, since, totals) for cid in client_ids]
+    reports.sort(key=lambda report: -report.total_tokens)
+    return FastJSONResponse(reports)
+
+
+@router.get(
+    "/usage/clients/{client_id}",
+    response_model=UsageReport,
+    responses={403: {"model": ErrorResponse}},
+    summary="클라이언트 사용량 조회",
+)
+async def get_client_usage(
+    client_id: str,
+    request: Request,
+    minutes: int = Query(60, ge=1, le=_MAX_WINDOW_MINUTES),
+):
+    _require_admin(request)
+    return model_response(await _client_report(client_id, minutes))
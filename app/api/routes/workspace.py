@@ -0,0 +1,209 @@
+"""
+워크스페이스 API (여러 문서 비교 질의응답)
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.answers import generate_workspace_answer
+from app.core.config import settings
+from app.core.deadline import RequestBudget, RequestCancelled, request_budget
+from app.core.doc_store import doc_store
+from app.core.llm import is_configured
+from app.core.serialization import model_response
+from app.core.usage import usage_quota
+from app.core.workspace import Workspace, WorkspaceFull, workspace_store
+from app.models.schemas import (
+    AnswerSource,
+    ChatResponse,
+    ErrorResponse,
+    WorkspaceAddDocumentRequest,
+    WorkspaceChatRequest,
+    WorkspaceCreateRequest,
+    WorkspaceDocument,
+    WorkspaceInfo,
+)
+
+router = APIRouter()
+
+
+def _get_workspace(workspace_id: str) -> Workspace:
+    workspace = workspace_store.get(workspace_id)
+    if workspace is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="워크스페이스를 찾을 수 없습니다.",
+        )
+    return workspace
+
+
+def _workspace_info(workspace: Workspace) -> WorkspaceInfo:
+    with workspace.lock:
+        documents = [
+            WorkspaceDocument(
+                doc_id=doc_id,
+                title=result.extracted.title,
+                docType=result.extracted.docType,
+                passages=workspace.index.passage_count(doc_id),
+            )
+            for doc_id, result in workspace.documents.items()
+        ]
+    return WorkspaceInfo(id=workspace.id, documents=documents)
+
+
+async def _add_document(
+    workspace: Workspace, doc_id: str, budget: RequestBudget
+) -> None:
+    """분석 결과 저장소의 문서를 워크스페이스 색인에 추가합니다."""
+    stored = doc_store.get(doc_id)
+    if stored is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"분석 결과를 찾을 수 없습니다: {doc_id}",
+        )
+    # 빠른 거절용 사전 확인 (동시 추가에 대한 최종 확인은 `workspace.add` 가 잠금 안에서 다시 함)
+    if (
+        doc_id not in workspace.documents
+        and len(workspace.documents) >= settings.WORKSPACE_MAX_DOCUMENTS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"워크스페이스에는 문서를 최대 {settings.WORKSPACE_MAX_DOCUMENTS}개까지 추가할 수 있습니다.",
+        )
+
+    pages = [(page_no, text) for page_no, text in enumerate(stored.pages, 1) if text]
+    if stored.source is not None:
+        # 점진적 추출로 분석하지 않은 페이지도 문서 간 검색 대상에 포함
+        pages += await stored.source.load_remaining(budget)
+    try:
+        workspace.add(stored.result, pages)
+    except WorkspaceFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+    workspace_store.trim(keep=workspace.id)
+
+
+@router.post(
+    "/workspaces",
+    response_model=WorkspaceInfo,
+    status_code=status.HTTP_201_CREATED,
+    responses={404: {"model": ErrorResponse}},
+    summary="워크스페이스 생성",
+    description="""
+    여러 분석 결과를 함께 비교하기 위한 워크스페이스를 만듭니다.
+
+    - doc_ids: `/api/analyze` 결과의 id 목록 (선택, 나중에 추가 가능)
+    """,
+)
+async def create_workspace(
+    request: WorkspaceCreateRequest,
+    budget: RequestBudget = Depends(request_budget),
+):
+    workspace = workspace_store.create()
+    try:
+        for doc_id in dict.fromkeys(request.doc_ids):
+            await _add_document(workspace, doc_id, budget)
+    except (HTTPException, RequestCancelled):
+        workspace_store.delete(workspace.id)
+        raise
+    return model_response(_workspace_info(workspace), status.HTTP_201_CREATED)
+
+
+@router.get(
+    "/workspaces/{workspace_id}",
+    response_model=WorkspaceInfo,
+    responses={404: {"model": ErrorResponse}},
+    summary="워크스페이스 조회",
+)
+async def get_workspace(workspace_id: str):
+    return model_response(_workspace_info(_get_workspace(workspace_id)))
+
+
+@router.post(
+    "/workspaces/{workspace_id}/documents",
+    response_model=WorkspaceInfo,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+    summary="워크스페이스에 문서 추가",
+)
+async def add_workspace_document(
+    workspace_id: str,
+    request: WorkspaceAddDocumentRequest,
+    budget: RequestBudget = Depends(request_budget),
+):
+    workspace = _get_workspace(workspace_id)
+    await _add_document(workspace, request.doc_id, budget)
+    return model_response(_workspace_info(workspace))
+
+
+@router.delete(
+    "/workspaces/{workspace_id}/documents/{doc_id}",
+    response_model=WorkspaceInfo,
+    responses={404: {"model": ErrorResponse}},
+    summary="워크스페이스에서 문서 제거",
+)
+async def remove_workspace_document(workspace_id: str, doc_id: str):
+    workspace = _get_workspace(workspace_id)
+    if not workspace.remove(doc_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="워크스페이스에 없는 문서입니다.",
+        )
+    return model_response(_workspace_info(workspace))
+
+
+@router.post(
+    "/workspaces/{workspace_id}/chat",
+    response_model=ChatResponse,
+    responses={
+        400: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(usage_quota)],
+    summary="여러 문서에 대한 대화형 질의응답",
+    description="""
+    워크스페이스의 문서들을 함께 보고 답변합니다. ("이 중 어디에 신청할 수 있나요?" 등)
+
+    - 문서마다 질문과 관련된 문단만 검색해 프롬프트에 넣으므로 문서가 늘어도 프롬프트 크기가 일정합니다.
+    - sources 의 doc_id 로 근거가 나온 문서를 구분합니다.
+    """,
+)
+async def chat_with_workspace(
+    workspace_id: str,
+    request: WorkspaceChatRequest,
+    budget: RequestBudget = Depends(request_budget),
+):
+    workspace = _get_workspace(workspace_id)
+    if not workspace.documents:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="워크스페이스에 문서가 없습니다.",
+        )
+    if not is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.",
+        )
+
+    try:
+        answer, passages = await generate_workspace_answer(
+            workspace, request.messages, budget
+        )
+    except RequestCancelled:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"채팅 응답 생성 중 오류가 발생했습니다: {str(e)}",
+        ) from e
+
+    return model_response(
+        ChatResponse(
+            message=answer,
+            confidence=0.9,
+            sources=[
+                AnswerSource(text=passage.text[:200], page=passage.page, doc_id=passage.doc_id)
+                for passage in passages
+            ],
+        )
+    )
@@ -0,0 +1,242 @@
+"""
+문서별 유사 질문 답변 캐시
+
+같은 공고문에 대해 "언제까지 내요?", "언제까지 내야 돼?" 처럼 표현만 조금 다른 질문이 많습니다.
+질문을 정규화(공백, 조사, 종결어미 제거)한 뒤 문자 n-gram 유사도 인덱스로 비슷한 질문을 찾아
+이전 답변을 재사용합니다. 숫자나 부정 표현이 다르면 답이 달라지므로 이 둘은 정확히 같아야 하고,
+앞 대화에 따라 답이 달라질 수 있으므로 대화의 첫 사용자 질문에만 적용합니다.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.schemas import ChatMessage, DocAnalysisResult
+
+_NGRAM = 2
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+# 단어 끝 조사 (긴 것부터 확인)
+_PARTICLES = sorted(
+    [
+        "에서는", "에서", "에게", "까지", "부터", "으로", "로는", "에는",
+        "은", "는", "이", "가", "을", "를", "에", "의", "도", "만", "와", "과", "랑",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# 문장 끝 종결어미/보조용언 (긴 것부터 확인)
+_ENDINGS = sorted(
+    [
+        "해야하나요", "해야되나요", "해야돼요", "해야해요", "해야돼", "해야해", "하나요",
+        "야하나요", "야되나요", "야돼요", "야해요", "야돼", "야해",
+        "인가요", "나요", "까요", "가요", "세요", "어요", "아요", "에요", "예요",
+        "해요", "돼요", "되나요", "인지", "니까", "는지",
+        "요", "죠", "니", "냐", "지", "돼", "해", "하", "다", "까",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# 유사도와 관계없이 정확히 같아야 하는 숫자 표현 ("3인 가구" vs "4인 가구", "두 명" vs "세 명")
+_NUMERAL_RE = re.compile(
+    r"\d[\d,]*(?:\.\d+)?"
+    r"|(?:한|두|세|네|다섯|여섯|일곱|여덟|아홉|열)(?=\s*(?:명|개|살|번|가구|사람|달|해|장|곳))"
+)
+
+# 부정 표현 ("내야 돼?" vs "안 내도 돼?"). '않'/'아니'는 '안'과 같은 부정으로 봅니다.
+_NEGATION_RE = re.compile(r"없|못|않|아니|(?<!\w)안(?!\w)|(?<!\w)안(?=돼|되|해|하|내|줘|받)")
+
+
+def normalize_question(question: str) -> str:
+    """공백/문장부호/조사/종결어미를 제거해 비교용 질문 키를 만듭니다."""
+    tokens = _PUNCT_RE.sub(" ", question.lower()).split()
+    if not tokens:
+        return ""
+
+    stripped = []
+    for token in tokens[:-1]:
+        for particle in _PARTICLES:
+            if token.endswith(particle) and len(token) > len(particle) + 1:
+                token = token[: -len(particle)]
+                break
+        stripped.append(token)
+    stripped.append(tokens[-1])
+
+    text = "".join(stripped)
+    changed = True
+    while changed and len(text) > 2:
+        changed = False
+        for ending in _ENDINGS:
+            if text.endswith(ending) and len(text) - len(ending) >= 2:
+                text = text[: -len(ending)]
+                changed = True
+                break
+    return text
+
+
+def question_guard(question: str) -> str:
+    """
+    질문의 숫자 토큰과 부정 표현 묶음. 이 값이 다른 질문끼리는 유사도가 높아도 같은 질문으로 보지 않습니다.
+    """
+    text = question.lower()
+    numerals = [m.group().replace(",", "") for m in _NUMERAL_RE.finditer(text)]
+    negations = {
+        "안" if m.group() in ("않", "아니") else m.group()
+        for m in _NEGATION_RE.finditer(text)
+    }
+    return ",".join(numerals) + "|" + "".join(sorted(negations))
+
+
+def _ngrams(text: str) -> set[str]:
+    if len(text) < _NGRAM:
+        return {text}
+    return {text[i:i + _NGRAM] for i in range(len(text) - _NGRAM + 1)}
+
+
+def is_context_free(messages: list[ChatMessage]) -> bool:
+    """
+    마지막 메시지가 대화의 첫 사용자 질문이면 True
+
+    앞 대화가 있으면 "그 서류는요?" 처럼 지시어가 없어도 답이 앞 턴에 따라 달라지므로 캐시하지 않습니다.
+    """
+    if not messages or messages[-1].role != "user":
+        return False
+    return sum(1 for message in messages if message.role == "user") == 1
+
+
+def context_key(doc_id: str, doc_context: DocAnalysisResult) -> str:
+    """문서 ID + 문서 컨텍스트 해시 (같은 doc_id 라도 컨텍스트가 다르면 다른 캐시)"""
+    digest = hashlib.sha1(doc_context.model_dump_json().encode("utf-8")).hexdigest()
+    return f"{doc_id}:{digest[:16]}"
+
+
+@dataclass
+class _Entry:
+    key: str
+    guard: str
+    grams: set[str]
+    answer: str
+    expires_at: float
+
+
+@dataclass
+class _DocIndex:
+    """문서 하나의 질문 n-gram 역색인"""
+
+    entries: OrderedDict[str, _Entry] = field(default_factory=OrderedDict)
+    postings: dict[str, set[str]] = field(default_factory=dict)
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            keys = self.postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[gram]
+
+    def add(self, entry: _Entry, max_entries: int) -> None:
+        self.remove(entry.key)
+        self.entries[entry.key] = entry
+        for gram in entry.grams:
+            self.postings.setdefault(gram, set()).add(entry.key)
+        while len(self.entries) > max_entries:
+            self.remove(next(iter(self.entries)))
+
+    def best_match(
+        self, grams: set[str], guard: str, threshold: float, now: float
+    ) -> _Entry | None:
+        # 숫자/부정 표현이 같고 공유 n-gram 이 있는 후보만 Dice 계수로 비교
+        candidates: set[str] = set()
+        for gram in grams:
+            candidates |= self.postings.get(gram, set())
+
+        best, best_score = None, threshold
+        for key in candidates:
+            entry = self.entries[key]
+            if entry.expires_at <= now or entry.guard != guard:
+                continue
+            score = 2 * len(grams & entry.grams) / (len(grams) + len(entry.grams))
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+
+class AnswerCache:
+    """문서별 유사 질문 답변 캐시 (TTL / 문서 수 / 문서당 항목 수 제한)"""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_docs: int,
+        max_entries_per_doc: int,
+        similarity: float,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_docs = max_docs
+        self.max_entries_per_doc = max_entries_per_doc
+        self.similarity = similarity
+        self._docs: OrderedDict[str, _DocIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, doc_key: str, question: str) -> str | None:
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        guard = question_guard(question)
+        now = time.monotonic()
+        with self._lock:
+            index = self._docs.get(doc_key)
+            entry = None
+            if index is not None:
+                self._docs.move_to_end(doc_key)
+                entry = index.entries.get(f"{guard}:{normalized}")
+                if entry is None or entry.expires_at <= now:
+                    entry = index.best_match(
+                        _ngrams(normalized), guard, self.similarity, now
+                    )
+        metrics.incr("answer_cache.hit" if entry is not None else "answer_cache.miss")
+        return entry.answer if entry is not None else None
+
+    def put(self, doc_key: str, question: str, answer: str) -> None:
+        normalized = normalize_question(question)
+        if not normalized:
+            return
+        guard = question_guard(question)
+        entry = _Entry(
+            key=f"{guard}:{normalized}",
+            guard=guard,
+            grams=_ngrams(normalized),
+            answer=answer,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            index = self._docs.get(doc_key)
+            if index is None:
+                index = self._docs[doc_key] = _DocIndex()
+            self._docs.move_to_end(doc_key)
+            index.add(entry, self.max_entries_per_doc)
+            while len(self._docs) > self.max_docs:
+                self._docs.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        hits = metrics.get("answer_cache.hit")
+        total = hits + metrics.get("answer_cache.miss")
+        return hits / total if total else 0.0
+
+
+answer_cache = AnswerCache(
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    max_docs=settings.ANSWER_CACHE_MAX_DOCS,
+    max_entries_per_doc=settings.ANSWER_CACHE_MAX_ENTRIES_PER_DOC,
+    similarity=settings.ANSWER_CACHE_SIMILARITY,
+)
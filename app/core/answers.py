@@ -0,0 +1,207 @@
+"""
+문서/워크스페이스 기반 답변 생성 및 추천 질문 답변 사전 생성
+
+사용자는 대부분 `get_suggested_questions` 가 돌려주는 추천 질문을 그대로 누릅니다.
+`/api/analyze` 가 끝나면 상위 추천 질문의 답변을 백그라운드에서 낮은 우선순위로 미리 만들어
+문서와 함께 저장해 두고, `/api/chat` 의 첫 질문이 일치하면 바로 응답합니다.
+"""
+import asyncio
+import logging
+
+from app.core.answer_cache import answer_cache, context_key
+from app.core.config import settings
+from app.core.deadline import RequestBudget
+from app.core.doc_store import doc_store
+from app.core.llm import get_client, is_configured
+from app.core.metrics import metrics
+from app.core.page_source import keywords, select_pages
+from app.core.prompts import (
+    get_chat_prompt,
+    get_suggested_questions,
+    get_workspace_chat_prompt,
+)
+from app.core.workspace import Passage, Workspace
+from app.models.schemas import ChatMessage, DocAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+CHAT_MODEL = "gpt-4o-mini"  # 빠르고 저렴한 모델
+
+# 대화 히스토리가 너무 길면 최근 N개만 유지 (토큰 절약)
+_MAX_HISTORY_MESSAGES = 10
+
+# 진행 중인 사전 생성 태스크 (GC 방지 및 종료 시 취소용)
+_precompute_tasks: set[asyncio.Task] = set()
+_precompute_semaphore: asyncio.Semaphore | None = None
+
+
+def first_turn_question(messages: list[ChatMessage]) -> str | None:
+    """대화의 첫 사용자 질문이면 질문 텍스트를, 아니면 None 을 반환합니다."""
+    if len(messages) != 1 or messages[0].role != "user":
+        return None
+    return messages[0].content
+
+
+async def retrieve_excerpts(
+    doc_id: str, question: str, budget: RequestBudget
+) -> list[tuple[int, str]]:
+    """
+    점진적 추출로 분석하지 않은 페이지가 남은 문서에서, 질문 키워드가 분석한 페이지에
+    없을 때만 나머지 페이지를 추출해 관련 페이지 발췌를 반환합니다.
+    """
+    stored = doc_store.get(doc_id)
+    if stored is None or stored.source is None:
+        return []
+    terms = keywords(question)
+    if not terms or stored.source.mentions(terms):
+        return []
+    remaining = await stored.source.load_remaining(budget)
+    excerpts = select_pages(remaining, question, settings.PROGRESSIVE_EXCERPT_TOKENS)
+    if excerpts:
+        metrics.incr("progressive.chat_excerpts")
+    return excerpts
+
+
+async def generate_answer(
+    doc_context: DocAnalysisResult,
+    messages: list[ChatMessage],
+    budget: RequestBudget,
+    excerpts: list[tuple[int, str]] | None = None,
+) -> str:
+    """문서 컨텍스트와 대화 히스토리로 답변을 생성합니다."""
+    # 시스템 프롬프트 생성 (문서 컨텍스트 + 필요 시 원문 발췌 포함)
+    system_prompt = get_chat_prompt(doc_context.model_dump(), excerpts)
+    return await _complete_chat(system_prompt, messages, budget)
+
+
+async def generate_workspace_answer(
+    workspace: Workspace,
+    messages: list[ChatMessage],
+    budget: RequestBudget,
+) -> tuple[str, list[Passage]]:
+    """
+    워크스페이스의 문서 목록과, 질문과 관련된 문서별 발췌만으로 답변을 생성합니다.
+
+    Returns:
+        (답변, 프롬프트에 넣은 발췌 목록)
+    """
+    # 후속 질문("그럼 두 번째는?")도 찾을 수 있도록 최근 사용자 질문 두 개로 검색
+    user_questions = [msg.content for msg in messages if msg.role == "user"]
+    query = " ".join(user_questions[-2:])
+    passages = workspace.retrieve(
+        query,
+        token_budget=settings.WORKSPACE_CONTEXT_TOKENS,
+        per_document=settings.WORKSPACE_PASSAGES_PER_DOCUMENT,
+    )
+
+    doc_numbers = {doc_id: i for i, doc_id in enumerate(workspace.documents, 1)}
+    system_prompt = get_workspace_chat_prompt(
+        [result.model_dump() for result in workspace.documents.values()],
+        [(doc_numbers[p.doc_id], p.page, p.text) for p in passages],
+    )
+    answer = await _complete_chat(system_prompt, messages, budget)
+    return answer, passages
+
+
+async def _complete_chat(
+    system_prompt: str,
+    messages: list[ChatMessage],
+    budget: RequestBudget,
+) -> str:
+    recent_messages = messages[-_MAX_HISTORY_MESSAGES:]
+
+    response = await budget.run(
+        get_client().chat.completions.create(
+            model=CHAT_MODEL,
+            temperature=0.3,  # 일관된 답변을 위해 낮게 설정
+            timeout=budget.remaining(),
+            max_tokens=500,  # 답변 길이 제한
+            messages=[
+                {"role": "system", "content": system_prompt},
+                *[
+                    {"role": msg.role, "content": msg.content}
+                    for msg in recent_messages
+                ],
+            ],
+        ),
+        stage="llm",
+    )
+
+    answer = response.choices[0].message.content
+    if not answer:
+        raise ValueError("AI 응답이 비어 있습니다.")
+    return answer
+
+
+def lookup_precomputed(
+    doc_id: str, doc_context: DocAnalysisResult, question: str
+) -> str | None:
+    """
+    미리 생성해 둔 추천 질문 답변을 찾습니다.
+
+    답변을 만들 때 쓴 분석 결과와 요청의 `doc_context` 가 같을 때만 돌려줍니다.
+    (같은 doc_id 라도 다른 컨텍스트로 묻는 요청에 다른 내용의 답을 주지 않도록)
+    """
+    stored = doc_store.get(doc_id)
+    if stored is None:
+        return None
+    answer = stored.answers.get((context_key(doc_id, doc_context), question.strip()))
+    if answer is not None:
+        metrics.incr("precompute.served")
+    return answer
+
+
+async def _precompute_answers(doc_id: str) -> None:
+    global _precompute_semaphore
+    if _precompute_semaphore is None:
+        _precompute_semaphore = asyncio.Semaphore(settings.PRECOMPUTE_MAX_CONCURRENCY)
+
+    stored = doc_store.get(doc_id)
+    if stored is None:
+        return
+    questions = get_suggested_questions(
+        stored.result.extracted.docType, limit=settings.PRECOMPUTE_QUESTION_COUNT
+    )
+    for question in questions:
+        text = question["text"]
+        # 불확실 항목 보완으로 결과가 바뀌면 그 결과로 다시 생성
+        result = stored.result
+        key = context_key(doc_id, result)
+        if (key, text) in stored.answers:
+            continue
+        # 동시 실행 수를 제한해 사용자 요청보다 낮은 우선순위로 처리
+        async with _precompute_semaphore:
+            budget = RequestBudget(None, settings.REQUEST_TIMEOUT_SECONDS)
+            try:
+                answer = await generate_answer(
+                    result,
+                    [ChatMessage(role="user", content=text)],
+                    budget,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.incr("precompute.failed")
+                logger.warning("suggested answer precompute failed (%s): %s", doc_id, e)
+                return
+        stored.answers[(key, text)] = answer
+        # 표현만 다른 질문도 재사용할 수 있도록 유사 질문 캐시에도 등록
+        if settings.ANSWER_CACHE_ENABLED:
+            answer_cache.put(key, text, answer)
+        metrics.incr("precompute.generated")
+
+
+def schedule_precompute(doc_id: str) -> None:
+    """추천 질문 답변 사전 생성을 백그라운드로 예약합니다. (설정으로 켠 경우에만)"""
+    if not settings.PRECOMPUTE_SUGGESTED_ANSWERS or not is_configured():
+        return
+    task = asyncio.create_task(_precompute_answers(doc_id))
+    _precompute_tasks.add(task)
+    task.add_done_callback(_precompute_tasks.discard)
+
+
+async def cancel_precompute() -> None:
+    """앱 종료 시 진행 중인 사전 생성 태스크를 취소합니다."""
+    for task in list(_precompute_tasks):
+        task.cancel()
+    await asyncio.gather(*_precompute_tasks, return_exceptions=True)
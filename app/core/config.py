@@ -9,6 +9,9 @@ class Settings(BaseSettings):
 
     # OpenAI 설정
     OPEN_AI_KEY: str | None = None
+
+    # 시작 시 백그라운드 워밍업 (pdfplumber import, OpenAI 연결 미리 열기)
+    WARMUP_ON_STARTUP: bool = True
     
     # CORS 설정 (필요 시 .env 에서 덮어쓰기)
     CORS_ORIGINS: list[str] = [
@@ -20,6 +23,119 @@ class Settings(BaseSettings):
     # 파일 업로드 설정
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: list[str] = [".pdf", ".txt"]
+
+    # 요청 처리 시간 예산 (초). X-Request-Timeout 헤더로 최대값 이내에서 조정 가능
+    REQUEST_TIMEOUT_SECONDS: float = 90.0
+    REQUEST_TIMEOUT_MAX_SECONDS: float = 180.0
+
+    # 분석 결과 저장소 (메모리 LRU) 최대 문서 수
+    DOC_STORE_MAX_ITEMS: int = 500
+    # 분석 결과 저장소 최대 크기 (MB, 보관 중인 원본 PDF 와 페이지 텍스트 포함)
+    DOC_STORE_MAX_MB: int = 512
+
+    # 분석 완료 후 추천 질문 답변 사전 생성 (토큰을 추가로 사용하므로 기본 비활성)
+    PRECOMPUTE_SUGGESTED_ANSWERS: bool = False
+    PRECOMPUTE_QUESTION_COUNT: int = 3
+    PRECOMPUTE_MAX_CONCURRENCY: int = 1
+
+    # 문서별 유사 질문 답변 캐시
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    ANSWER_CACHE_MAX_DOCS: int = 1000
+    ANSWER_CACHE_MAX_ENTRIES_PER_DOC: int = 50
+    # 정규화한 질문의 문자 bigram Dice 유사도 기준 (0~1)
+    ANSWER_CACHE_SIMILARITY: float = 0.8
+
+    # 요청 단위 프로파일링 (기본 비활성)
+    # X-Profile 헤더가 토큰과 일치하거나, 샘플링 비율(0~1)에 걸린 요청만 프로파일링
+    PROFILING_TOKEN: str | None = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_DIR: str = "profiles"
+    # "collapsed" (flamegraph.pl / speedscope 호환 .folded) 또는 "speedscope" (JSON)
+    PROFILING_FORMAT: str = "collapsed"
+
+    # LLM 호출 기록/재생 ("off" | "record" | "replay")
+    # replay 는 기록된 응답만 사용하므로 OpenAI 키/네트워크 없이 동작
+    LLM_CASSETTE_MODE: str = "off"
+    LLM_CASSETTE_DIR: str = "cassettes"
+    # replay 시 기록된 지연 시간만큼 기다렸다가 응답
+    LLM_CASSETTE_REPLAY_LATENCY: bool = False
+
+    # 자격 판정 배치 평가 (공고 × 신청자 조건)
+    # 최대 조합 수: 묶음 5개 × 동시 4개, 호출당 약 10초면 기본 예산 90초에 약 180개 (최대 예산 180초에 약 360개)
+    ELIGIBILITY_BATCH_MAX_PAIRS: int = 200
+    # 한 번의 LLM 호출에 묶는 최대 조합 수와 묶음 프롬프트의 추정 토큰 상한
+    ELIGIBILITY_BATCH_PACK_SIZE: int = 5
+    ELIGIBILITY_BATCH_PACK_TOKENS: int = 6000
+    ELIGIBILITY_BATCH_CONCURRENCY: int = 4
+
+    # 클라이언트별 LLM 토큰 사용량 기록과 분당 토큰 할당량 (X-Client-Key 로 인증된 클라이언트, 없으면 접속 IP 기준)
+    USAGE_TRACKING: bool = True
+    # 서버가 발급한 클라이언트 키 → 클라이언트 이름. JSON 으로 지정: {"<비밀 키>": "partner-a"}
+    USAGE_CLIENT_KEYS: dict[str, str] = {}
+    # 사용량을 누적 저장할 SQLite 파일 (빈 값이면 메모리에만 집계)
+    USAGE_DB_PATH: str = "data/usage.sqlite3"
+    USAGE_FLUSH_INTERVAL_SECONDS: float = 30.0
+    # 분당 토큰 할당량 (0 이면 제한 없음). 클라이언트별 값은 JSON 으로 지정: {"partner-a": 200000}
+    USAGE_DEFAULT_TPM: int = 0
+    USAGE_CLIENT_TPM: dict[str, int] = {}
+    # 전체 클라이언트 사용량 조회(GET /api/usage/clients)에 필요한 X-Usage-Token (없으면 조회 불가)
+    USAGE_ADMIN_TOKEN: str | None = None
+
+    # LLM 호출 헤징: 최근 응답 시간 분위수를 넘기면 같은 요청을 한 번 더 보내고 먼저 끝난 응답 사용
+    HEDGE_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 0.95
+    # (라우트, 모델)별 최근 표본 수 / 헤지를 시작하는 최소 표본 수 / 최소 대기 시간
+    HEDGE_WINDOW: int = 200
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_MIN_DELAY_MS: float = 500.0
+    # 헤지 예산: 호출마다 비율만큼 적립, 헤지마다 1 사용 (최대 적립량 BURST)
+    HEDGE_BUDGET_RATIO: float = 0.05
+    HEDGE_BUDGET_BURST: float = 5.0
+    # 두 번째 요청에 쓸 모델 (없으면 같은 모델)
+    HEDGE_FALLBACK_MODEL: str | None = None
+
+    # PDF 추출 설정
+    # True 면 표를 "셀 | 셀" 행으로 따로 추출 (False 면 기존 평탄화 텍스트)
+    PDF_TABLE_EXTRACTION: bool = True
+
+    # PDF 동시 추출 메모리 예산: 예상 비용(기본 + 원본 크기 × 배수)의 합이 예산을 넘으면 대기
+    PDF_EXTRACT_MEMORY_BUDGET_MB: int = 1024
+    PDF_EXTRACT_MEMORY_FACTOR: float = 8.0
+    PDF_EXTRACT_BASE_COST_MB: float = 32.0
+
+    # 요청별 최대 RSS 기록 (GET /metrics 의 memory.* 분포)
+    MEMORY_TRACKING: bool = True
+    MEMORY_SAMPLE_INTERVAL_MS: float = 20.0
+    # 시작 대비 이만큼 이상 늘어난 요청은 로그로 남김
+    MEMORY_LOG_GROWTH_MB: float = 100.0
+
+    # 워크스페이스 (여러 문서 비교 질의응답)
+    WORKSPACE_MAX_ITEMS: int = 200
+    WORKSPACE_MAX_DOCUMENTS: int = 20
+    # 워크스페이스 하나 / 전체 워크스페이스의 검색 색인 최대 크기 (MB, 문단 텍스트 기준)
+    WORKSPACE_MAX_MB: int = 32
+    WORKSPACE_STORE_MAX_MB: int = 256
+    # 질문마다 프롬프트에 넣는 관련 문단의 토큰 예산 / 문서당 최대 문단 수
+    WORKSPACE_CONTEXT_TOKENS: int = 2500
+    WORKSPACE_PASSAGES_PER_DOCUMENT: int = 2
+
+    # 점진적 추출: 앞 페이지부터 토큰 예산까지만 분석에 사용하고 나머지는 필요할 때 추출
+    PROGRESSIVE_EXTRACTION: bool = False
+    PROGRESSIVE_TOKEN_BUDGET: int = 6000
+    # 채팅 질문이 분석하지 않은 페이지에 있을 때 프롬프트에 덧붙일 발췌 토큰 예산
+    PROGRESSIVE_EXCERPT_TOKENS: int = 1500
+    # 분석 후 uncertainty 항목이 있으면 나머지 페이지로 백그라운드 보완
+    PROGRESSIVE_RESOLVE_UNCERTAINTY: bool = True
+
+    # 정정공고 증분 재분석: 같은 클라이언트의 이전 분석과 공유하는 페이지 비율이 이 값 이상이고
+    # 첫 페이지나 제목이 같으면 바뀐 페이지만 다시 분석
+    INCREMENTAL_REANALYSIS: bool = False
+    REVISION_MIN_SHARED_RATIO: float = 0.8
+
+    # 분할 병렬 분석: 문서 분석을 섹션별 작은 호출로 나눠 동시에 보냄 (응답 시간 ↓, 총 토큰 ↑)
+    ANALYZE_FANOUT: bool = False
     
     class Config:
         env_file = ".env"
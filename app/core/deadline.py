@@ -0,0 +1,134 @@
+"""
+요청별 처리 시간 예산(deadline)과 클라이언트 연결 끊김 감지
+
+사용자가 분석 도중 탭을 닫거나 요청 시간이 초과되면, 진행 중인 PDF 파싱과
+LLM 호출을 중단해 아무도 읽지 않을 응답에 토큰과 워커 시간을 쓰지 않도록 합니다.
+
+- 예산: `X-Request-Timeout` 헤더(초) 또는 설정값 `REQUEST_TIMEOUT_SECONDS`
+- LLM 호출: `budget.run()` 으로 감싸면 연결 끊김/시간 초과 시 태스크를 취소
+- 스레드 작업(PDF 파싱): `budget.check` 를 페이지마다 호출해 중단 여부 확인
+"""
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+TIMEOUT_HEADER = "x-request-timeout"
+
+# 연결 끊김 확인 주기 (초)
+_DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class RequestCancelled(Exception):
+    """클라이언트 연결 끊김 또는 처리 시간 초과로 요청 처리를 중단함"""
+
+    def __init__(self, reason: str, stage: str):
+        super().__init__(f"request cancelled ({reason}) during {stage}")
+        self.reason = reason  # "disconnect" | "deadline"
+        self.stage = stage
+
+
+class RequestBudget:
+    """요청 하나의 남은 처리 시간과 취소 상태"""
+
+    def __init__(self, request: Request | None, timeout: float):
+        self._request = request
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self._cancelled = threading.Event()
+        self._reason = "deadline"
+
+    @property
+    def route(self) -> str:
+        """지표 이름용 라우트 템플릿 (경로 파라미터로 지표 이름이 늘어나지 않도록)"""
+        if self._request is None:
+            return "-"
+        route = self._request.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def _cancel(self, reason: str, stage: str) -> RequestCancelled:
+        if not self._cancelled.is_set():
+            self._reason = reason
+            self._cancelled.set()
+            metrics.incr(f"cancelled.{reason}")
+            metrics.incr(f"cancelled.{reason}.{self.route}.{stage}")
+        return RequestCancelled(self._reason, stage)
+
+    def check(self, stage: str = "extract") -> None:
+        """
+        스레드 작업 중간에 호출해 취소/시간 초과면 `RequestCancelled` 를 발생시킵니다.
+        """
+        if self._cancelled.is_set():
+            raise RequestCancelled(self._reason, stage)
+        if self.expired:
+            raise self._cancel("deadline", stage)
+
+    async def _client_gone(self) -> bool:
+        return self._request is not None and await self._request.is_disconnected()
+
+    async def run(self, awaitable: Awaitable[T], stage: str) -> T:
+        """
+        코루틴을 실행하면서 연결 끊김/시간 초과를 감시하고, 발생하면 취소합니다.
+        """
+        self.check(stage)
+        task = asyncio.ensure_future(awaitable)
+        try:
+            while True:
+                timeout = min(_DISCONNECT_POLL_INTERVAL, self.remaining())
+                done, _ = await asyncio.wait({task}, timeout=timeout)
+                if done:
+                    return task.result()
+                if self.expired:
+                    raise self._cancel("deadline", stage)
+                if await self._client_gone():
+                    raise self._cancel("disconnect", stage)
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def run_in_thread(
+        self, fn: Callable[..., T], *args: Any, stage: str, **kwargs: Any
+    ) -> T:
+        """
+        동기 함수를 스레드에서 실행합니다.
+
+        스레드는 강제로 멈출 수 없으므로, `fn` 은 `check` 를 받아 중간중간 호출해야
+        취소 후 바로 작업을 멈춥니다.
+        """
+        return await self.run(
+            asyncio.to_thread(fn, *args, check=self.check, **kwargs), stage
+        )
+
+
+def request_budget(request: Request) -> RequestBudget:
+    """
+    요청 처리 시간 예산 의존성
+
+    `X-Request-Timeout` 헤더(초)가 있으면 `REQUEST_TIMEOUT_MAX_SECONDS` 이내에서 사용하고,
+    없거나 잘못된 값(숫자가 아님, nan/inf, 0 이하)이면 `REQUEST_TIMEOUT_SECONDS` 를 사용합니다.
+    """
+    timeout = settings.REQUEST_TIMEOUT_SECONDS
+    header = request.headers.get(TIMEOUT_HEADER)
+    if header:
+        try:
+            value = float(header)
+        except ValueError:
+            value = None
+        if value is not None and math.isfinite(value) and value > 0:
+            timeout = min(value, settings.REQUEST_TIMEOUT_MAX_SECONDS)
+    return RequestBudget(request, max(timeout, 0.1))
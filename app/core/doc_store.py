@@ -0,0 +1,203 @@
+"""
+분석 결과 저장소
+
+`/api/analyze` 결과를 문서 ID 로 보관해 재조회(ETag/304), 후속 기능에서 재사용합니다.
+프로세스 메모리 안의 LRU 저장소이며, 최대 개수나 최대 바이트(원본 PDF, 페이지 텍스트 포함)를
+넘으면 오래 쓰이지 않은 문서부터 버립니다.
+
+전체 페이지를 분석한 문서는 페이지별 내용 해시와 추출 텍스트도 보관해, 일부 페이지만 바뀐
+정정공고가 올라오면 `find_revision_base` 로 이전 판을 찾아 바뀐 페이지만 다시 분석합니다.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.core.metrics import metrics
+from app.core.page_source import PageSource, text_nbytes
+from app.core.serialization import to_json_bytes
+from app.models.schemas import DocAnalysisResult
+
+
+@dataclass
+class StoredDocument:
+    """저장된 분석 결과와 직렬화된 본문/ETag"""
+
+    result: DocAnalysisResult
+    body: bytes
+    etag: str
+    created_at: float = field(default_factory=time.time)
+    # 미리 생성한 추천 질문 답변 ((생성에 쓴 문서 컨텍스트 키, 질문 텍스트) → 답변)
+    answers: dict[tuple[str, str], str] = field(default_factory=dict)
+    # 분석에 보내지 않은 나머지 페이지 원본 (점진적 추출, 전체를 분석했으면 None)
+    source: PageSource | None = None
+    # 분석에 사용한 페이지별 정규화 텍스트 (워크스페이스 검색 색인용)
+    pages: list[str] = field(default_factory=list)
+    # 전체 페이지의 내용 해시와 정규화 전 추출 텍스트 (정정공고 증분 재분석용, 일부만 분석했으면 빈 목록)
+    page_hashes: list[str] = field(default_factory=list)
+    raw_pages: list[str] = field(default_factory=list)
+    # 분석을 요청한 클라이언트 ID (정정공고 비교는 같은 클라이언트의 문서끼리만)
+    owner: str | None = None
+
+    @property
+    def nbytes(self) -> int:
+        """본문, 페이지 텍스트, 남은 원본 PDF 를 합친 대략적인 메모리 크기"""
+        size = len(self.body)
+        size += text_nbytes(self.pages) + text_nbytes(self.raw_pages)
+        size += text_nbytes(self.answers.values())
+        if self.source is not None:
+            size += self.source.nbytes
+        return size
+
+
+@dataclass
+class RevisionBase:
+    """새 업로드와 페이지를 가장 많이 공유하는 이전 분석"""
+
+    stored: StoredDocument
+    # 공유 페이지 해시 → 이전 판의 0-based 페이지 인덱스
+    shared: dict[str, int]
+
+
+class DocumentStore:
+    """문서 ID → 분석 결과 LRU 저장소 (스레드 안전)"""
+
+    def __init__(self, max_items: int, max_bytes: int | None = None):
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._items: OrderedDict[str, StoredDocument] = OrderedDict()
+        # 페이지 해시 → 그 페이지를 가진 문서 ID
+        self._page_index: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        result: DocAnalysisResult,
+        source: PageSource | None = None,
+        pages: list[str] | None = None,
+        page_hashes: list[str] | None = None,
+        raw_pages: list[str] | None = None,
+        owner: str | None = None,
+    ) -> StoredDocument:
+        body = to_json_bytes(result)
+        stored = StoredDocument(
+            result=result,
+            body=body,
+            etag=make_etag(body),
+            source=source,
+            pages=pages or [],
+            page_hashes=page_hashes or [],
+            raw_pages=raw_pages or [],
+            owner=owner,
+        )
+        with self._lock:
+            previous = self._items.pop(result.id, None)
+            if previous is not None:
+                self._unindex(result.id, previous)
+            self._items[result.id] = stored
+            for page_hash in stored.page_hashes:
+                self._page_index.setdefault(page_hash, set()).add(result.id)
+            self._evict()
+        return stored
+
+    def _evict(self) -> None:
+        """개수/바이트 제한을 넘는 동안 오래된 문서부터 버립니다. (방금 넣은 문서는 남김)"""
+        # 점진적 추출로 원본을 버리거나 답변이 쌓이면 크기가 바뀌므로 매번 다시 셉니다.
+        total = (
+            sum(stored.nbytes for stored in self._items.values())
+            if self._max_bytes is not None
+            else 0
+        )
+        while len(self._items) > 1 and (
+            len(self._items) > self._max_items
+            or (self._max_bytes is not None and total > self._max_bytes)
+        ):
+            doc_id, evicted = self._items.popitem(last=False)
+            self._unindex(doc_id, evicted)
+            total -= evicted.nbytes
+            metrics.incr("doc_store.evicted")
+
+    def update_result(self, stored: StoredDocument, result: DocAnalysisResult) -> bool:
+        """
+        저장된 문서의 분석 결과만 제자리에서 바꿉니다.
+
+        사전 생성 답변, 원본 페이지, 소유자 등 문서별 상태는 그대로 두며, 그 사이 같은 ID 로
+        다시 저장됐거나 밀려났으면 바꾸지 않고 False 를 반환합니다.
+        """
+        body = to_json_bytes(result)
+        etag = make_etag(body)
+        with self._lock:
+            if self._items.get(result.id) is not stored:
+                return False
+            stored.result, stored.body, stored.etag = result, body, etag
+        return True
+
+    def _unindex(self, doc_id: str, stored: StoredDocument) -> None:
+        for page_hash in stored.page_hashes:
+            doc_ids = self._page_index.get(page_hash)
+            if doc_ids is not None:
+                doc_ids.discard(doc_id)
+                if not doc_ids:
+                    del self._page_index[page_hash]
+
+    def has_page_hashes(self) -> bool:
+        """정정공고 비교 대상(페이지 해시를 보관한 문서)이 있는지"""
+        with self._lock:
+            return bool(self._page_index)
+
+    def find_revision_base(
+        self,
+        page_hashes: list[str],
+        min_shared_ratio: float,
+        owner: str,
+        exclude: str | None = None,
+    ) -> RevisionBase | None:
+        """
+        같은 클라이언트(`owner`)의 이전 분석 중 새 문서와 공유하는 페이지 비율이
+        `min_shared_ratio` 이상이면서 가장 많이 공유하는 것.
+
+        비율은 두 판 중 페이지가 많은 쪽 기준입니다. 다른 클라이언트의 문서는 비교하지 않습니다.
+        """
+        with self._lock:
+            counts: dict[str, int] = {}
+            for page_hash in set(page_hashes):
+                for doc_id in self._page_index.get(page_hash, ()):
+                    if doc_id != exclude and self._items[doc_id].owner == owner:
+                        counts[doc_id] = counts.get(doc_id, 0) + 1
+            if not counts:
+                return None
+            doc_id = max(counts, key=counts.__getitem__)
+            stored = self._items[doc_id]
+            pages = max(len(page_hashes), len(stored.page_hashes))
+            if counts[doc_id] / pages < min_shared_ratio:
+                return None
+            self._items.move_to_end(doc_id)
+        wanted = set(page_hashes)
+        shared: dict[str, int] = {}
+        for index, page_hash in enumerate(stored.page_hashes):
+            if page_hash in wanted:
+                shared.setdefault(page_hash, index)
+        return RevisionBase(stored=stored, shared=shared)
+
+    def get(self, doc_id: str) -> StoredDocument | None:
+        with self._lock:
+            stored = self._items.get(doc_id)
+            if stored is not None:
+                self._items.move_to_end(doc_id)
+            return stored
+
+    def nbytes(self) -> int:
+        """저장된 문서 전체의 대략적인 메모리 크기"""
+        with self._lock:
+            return sum(stored.nbytes for stored in self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+doc_store = DocumentStore(
+    settings.DOC_STORE_MAX_ITEMS,
+    max_bytes=settings.DOC_STORE_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,391 @@
+"""
+자격 판정 배치 평가 (공고 여러 개 × 신청자 조건 여러 개)
+
+상담 화면은 신청자 한 명을 열려 있는 모든 공고에, 정책 팀은 가상 신청자 수천 명을 공고 하나에
+평가합니다. 조합마다 HTTP 요청과 LLM 호출을 따로 보내는 대신,
+
+1. 내용이 같은 공고/조건은 하나로 합쳐 같은 조합을 한 번만 평가하고 (중복 제거)
+2. 공고(또는 조건)를 공유하는 조합 여러 개를 한 번의 호출에 묶어 공유 컨텍스트를 한 번만 보내며 (packing)
+3. 묶음들은 동시에 실행해 끝나는 순서대로 조합별 결과를 NDJSON 한 줄씩 내보냅니다.
+
+묶음 응답에서 빠졌거나 스키마에 맞지 않는 조합은 단건 평가로 다시 시도합니다.
+배치 하나가 할당량을 한 번에 넘기지 않도록 호출마다 클라이언트의 분당 토큰 할당량을 다시 확인합니다.
+"""
+import asyncio
+import hashlib
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Final
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.deadline import RequestBudget, RequestCancelled
+from app.core.json_repair import ReaskFn, loads_lenient, validate_llm_json
+from app.core.llm import get_client
+from app.core.metrics import metrics
+from app.core.serialization import dumps, to_json_bytes
+from app.core.text_normalize import estimate_tokens
+from app.core.usage import QuotaExceeded, usage_ledger
+from app.models.schemas import DocAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE: Final[str] = "application/x-ndjson"
+
+_PACKED_USER_PROMPT: Final[str] = """다음 {doc_label}(DocAnalysisResult)와 사용자 조건({profile_name}) 목록에서
+[평가할 조합]마다 위에서 설명한 {result_name} 를 각각 독립적으로 평가하세요.
+조합끼리 결과를 비교하거나 섞지 마세요.
+
+반드시 아래 형태의 JSON만 출력하세요. results 에는 모든 조합이 하나씩 있어야 합니다.
+{{"results": [{{"pair": "조합 ID", ...{result_name} 필드}}]}}
+
+{documents}
+
+{profiles}
+
+[평가할 조합]
+{pairs}"""
+
+
+@dataclass
+class EligibilitySpec:
+    """자격 판정 종류별 LLM 호출 설정 (단건/배치 공용)"""
+
+    model: str
+    system_prompt: str
+    profile_model: type[BaseModel]
+    result_model: type[BaseModel]
+    # 사용자 프롬프트에서 공고를 부르는 이름
+    doc_label: str
+    # 단건 호출의 추가 인자 (response_format, max_tokens 등)
+    completion_kwargs: dict[str, Any] = field(default_factory=dict)
+
+    def single_user_prompt(self, doc: DocAnalysisResult, profile: BaseModel) -> str:
+        return (
+            f"다음 {self.doc_label}(DocAnalysisResult)와 "
+            f"사용자 조건({self.profile_model.__name__})을 참고하여, "
+            f"위에서 설명한 {self.result_model.__name__} JSON만 출력하세요.\n\n"
+            f"[공고 분석 결과]\n"
+            f"{doc.model_dump_json()}\n\n"
+            f"[사용자 조건]\n"
+            f"{profile.model_dump_json()}"
+        )
+
+
+async def evaluate_pair(
+    spec: EligibilitySpec,
+    doc: DocAnalysisResult,
+    profile: BaseModel,
+    budget: RequestBudget,
+    reask: ReaskFn | None = None,
+) -> BaseModel:
+    """공고 하나 × 조건 하나를 평가합니다. (단건 엔드포인트와 배치의 단건 재시도 공용)"""
+    response = await budget.run(
+        get_client().chat.completions.create(
+            model=spec.model,
+            temperature=0.2,
+            timeout=budget.remaining(),
+            messages=[
+                {"role": "system", "content": spec.system_prompt},
+                {"role": "user", "content": spec.single_user_prompt(doc, profile)},
+            ],
+            **spec.completion_kwargs,
+        ),
+        stage="llm",
+    )
+    content = response.choices[0].message.content
+    if not content:
+        raise ValueError("LLM 응답이 비어 있습니다.")
+    return await validate_llm_json(spec.result_model, content, reask=reask)
+
+
+@dataclass
+class _Entry:
+    """중복 제거한 공고 또는 조건 하나"""
+
+    label: str
+    model: BaseModel
+    json: str
+    tokens: int
+
+
+@dataclass
+class BatchPair:
+    """중복 제거한 평가 조합 하나와, 같은 조합에 해당하는 원래 (공고, 조건) 인덱스 목록"""
+
+    id: str
+    doc: _Entry
+    profile: _Entry
+    positions: list[tuple[int, int]] = field(default_factory=list)
+
+
+@dataclass
+class BatchPlan:
+    pairs: list[BatchPair]
+    requested: int
+    # 공유 컨텍스트 기준 ("doc" 이면 공고 하나에 조건 여러 개를 묶음)
+    group_by: str
+
+
+def plan_batch(
+    documents: list[DocAnalysisResult],
+    profiles: list[BaseModel],
+    positions: list[tuple[int, int]],
+) -> BatchPlan:
+    """요청한 (공고 인덱스, 조건 인덱스) 목록을 내용 기준으로 중복 제거합니다."""
+
+    def dedupe(models: list[BaseModel], prefix: str) -> list[_Entry]:
+        by_key: dict[str, _Entry] = {}
+        entries = []
+        for model in models:
+            body = model.model_dump_json()
+            key = hashlib.sha256(body.encode("utf-8")).hexdigest()
+            entry = by_key.get(key)
+            if entry is None:
+                entry = _Entry(f"{prefix}{len(by_key) + 1}", model, body, estimate_tokens(body))
+                by_key[key] = entry
+            entries.append(entry)
+        return entries
+
+    docs = dedupe(documents, "D")
+    profs = dedupe(profiles, "P")
+    pairs: dict[tuple[str, str], BatchPair] = {}
+    for doc_index, profile_index in positions:
+        doc, profile = docs[doc_index], profs[profile_index]
+        pair = pairs.get((doc.label, profile.label))
+        if pair is None:
+            pair = BatchPair(f"C{len(pairs) + 1}", doc, profile)
+            pairs[(doc.label, profile.label)] = pair
+        pair.positions.append((doc_index, profile_index))
+
+    unique_docs = len({id(entry) for entry in docs})
+    unique_profiles = len({id(entry) for entry in profs})
+    return BatchPlan(
+        pairs=list(pairs.values()),
+        requested=len(positions),
+        group_by="doc" if unique_docs <= unique_profiles else "profile",
+    )
+
+
+def pack_pairs(plan: BatchPlan, max_pairs: int, token_budget: int) -> list[list[BatchPair]]:
+    """
+    공유하는 쪽(공고 또는 조건)이 같은 조합끼리 최대 `max_pairs` 개, 프롬프트 추정 토큰
+    `token_budget` 이내로 묶습니다. (공유 컨텍스트 하나가 예산보다 크면 단건)
+    """
+    groups: dict[str, list[BatchPair]] = {}
+    for pair in plan.pairs:
+        shared = pair.doc if plan.group_by == "doc" else pair.profile
+        groups.setdefault(shared.label, []).append(pair)
+
+    packs: list[list[BatchPair]] = []
+    for pairs in groups.values():
+        current: list[BatchPair] = []
+        used = 0
+        for pair in pairs:
+            shared, varying = (
+                (pair.doc, pair.profile) if plan.group_by == "doc" else (pair.profile, pair.doc)
+            )
+            cost = varying.tokens + (0 if current else shared.tokens)
+            if current and (len(current) >= max_pairs or used + cost > token_budget):
+                packs.append(current)
+                current, used = [], 0
+                cost = varying.tokens + shared.tokens
+            current.append(pair)
+            used += cost
+        if current:
+            packs.append(current)
+    return packs
+
+
+def _packed_prompt(spec: EligibilitySpec, pack: list[BatchPair]) -> str:
+    docs = {pair.doc.label: pair.doc for pair in pack}
+    profiles = {pair.profile.label: pair.profile for pair in pack}
+    return _PACKED_USER_PROMPT.format(
+        doc_label=spec.doc_label,
+        profile_name=spec.profile_model.__name__,
+        result_name=spec.result_model.__name__,
+        documents="\n\n".join(
+            f"[공고 분석 결과 {label}]\n{entry.json}" for label, entry in docs.items()
+        ),
+        profiles="\n\n".join(
+            f"[사용자 조건 {label}]\n{entry.json}" for label, entry in profiles.items()
+        ),
+        pairs="\n".join(
+            f"- {pair.id}: {pair.doc.label} × {pair.profile.label}" for pair in pack
+        ),
+    )
+
+
+async def _evaluate_pack(
+    spec: EligibilitySpec,
+    pack: list[BatchPair],
+    budget: RequestBudget,
+    reask: ReaskFn | None,
+) -> dict[str, BaseModel]:
+    """묶음을 한 번에 평가하고 조합 ID → 결과를 반환합니다. (검증에 실패한 조합은 빠짐)"""
+    max_tokens = spec.completion_kwargs.get("max_tokens")
+    response = await budget.run(
+        get_client().chat.completions.create(
+            model=spec.model,
+            response_format={"type": "json_object"},
+            temperature=0.2,
+            timeout=budget.remaining(),
+            messages=[
+                {"role": "system", "content": spec.system_prompt},
+                {"role": "user", "content": _packed_prompt(spec, pack)},
+            ],
+            **({"max_tokens": max_tokens * len(pack)} if max_tokens else {}),
+        ),
+        stage="llm_batch",
+    )
+    content = response.choices[0].message.content
+    if not content:
+        return {}
+    try:
+        items = loads_lenient(content).get("results", [])
+    except (ValueError, AttributeError):
+        return {}
+
+    wanted = {pair.id for pair in pack}
+    results: dict[str, BaseModel] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        pair_id = item.pop("pair", None)
+        if pair_id not in wanted or pair_id in results:
+            continue
+        try:
+            results[pair_id] = await validate_llm_json(
+                spec.result_model, dumps(item), reask=reask
+            )
+        except RequestCancelled:
+            raise
+        except Exception:
+            continue
+    return results
+
+
+def _line(position: tuple[int, int], **payload: Any) -> bytes:
+    doc_index, profile_index = position
+    return to_json_bytes(
+        {"doc_index": doc_index, "profile_index": profile_index, **payload}
+    ) + b"\n"
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, QuotaExceeded):
+        return f"분당 토큰 사용량 한도({error.limit:,} 토큰)를 초과해 평가하지 않았습니다."
+    return f"자격 평가 중 오류가 발생했습니다: {error}"
+
+
+async def stream_batch(
+    spec: EligibilitySpec,
+    plan: BatchPlan,
+    budget: RequestBudget,
+    reask: ReaskFn | None = None,
+    client_id: str | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    묶음들을 동시에 평가하며 끝나는 순서대로 요청한 (공고, 조건) 조합마다 NDJSON 한 줄을 내보냅니다.
+
+    `client_id` 를 주면 LLM 호출 직전마다 할당량을 확인하고, 넘었으면 그 묶음의 조합은 호출하지 않고
+    오류 줄로 보냅니다.
+
+    마지막 줄은 요약입니다: {"done": true, "pairs": 요청 조합 수, "evaluated": 중복 제거 후 조합 수,
+    "completions": LLM 호출 수, "failed": 실패한 조합 수}
+    """
+    packs = pack_pairs(
+        plan,
+        max_pairs=max(1, settings.ELIGIBILITY_BATCH_PACK_SIZE),
+        token_budget=settings.ELIGIBILITY_BATCH_PACK_TOKENS,
+    )
+    semaphore = asyncio.Semaphore(max(1, settings.ELIGIBILITY_BATCH_CONCURRENCY))
+    completions = 0
+
+    def check_quota() -> None:
+        if client_id is not None and settings.USAGE_TRACKING:
+            usage_ledger.check_quota(client_id)
+
+    async def run_single(pair: BatchPair) -> tuple[BatchPair, BaseModel | Exception]:
+        nonlocal completions
+        async with semaphore:
+            try:
+                check_quota()
+            except QuotaExceeded as e:
+                return pair, e
+            completions += 1
+            try:
+                return pair, await evaluate_pair(
+                    spec, pair.doc.model, pair.profile.model, budget, reask
+                )
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                return pair, e
+
+    async def run_pack(pack: list[BatchPair]) -> list[tuple[BatchPair, BaseModel | Exception]]:
+        nonlocal completions
+        if len(pack) == 1:
+            return [await run_single(pack[0])]
+        async with semaphore:
+            try:
+                check_quota()
+            except QuotaExceeded as e:
+                return [(pair, e) for pair in pack]
+            completions += 1
+            try:
+                results = await _evaluate_pack(spec, pack, budget, reask)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                logger.warning("packed eligibility evaluation failed: %s", e)
+                results = {}
+        metrics.incr("eligibility_batch.packed_pairs", len(results))
+        missing = [pair for pair in pack if pair.id not in results]
+        if missing:
+            # 묶음 응답에서 빠진 조합은 단건으로 다시 평가
+            metrics.incr("eligibility_batch.unpacked_pairs", len(missing))
+        done = [(pair, results[pair.id]) for pair in pack if pair.id in results]
+        done += await asyncio.gather(*(run_single(pair) for pair in missing))
+        return done
+
+    metrics.incr("eligibility_batch.requested_pairs", plan.requested)
+    metrics.incr("eligibility_batch.deduplicated_pairs", plan.requested - len(plan.pairs))
+    tasks = [asyncio.ensure_future(run_pack(pack)) for pack in packs]
+    reported: set[str] = set()
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for pair, outcome in await next_done:
+                reported.add(pair.id)
+                for position in pair.positions:
+                    if isinstance(outcome, Exception):
+                        failed += 1
+                        yield _line(position, error=_error_message(outcome))
+                    else:
+                        yield _line(position, result=outcome)
+    except RequestCancelled as e:
+        if e.reason == "disconnect":
+            return
+        # 응답 헤더는 이미 보냈으므로 남은 조합은 오류 줄로 알리고 요약 줄로 끝냅니다.
+        for pair in plan.pairs:
+            if pair.id in reported:
+                continue
+            for position in pair.positions:
+                failed += 1
+                yield _line(position, error="요청 처리 시간이 초과되었습니다.")
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    yield to_json_bytes({
+        "done": True,
+        "pairs": plan.requested,
+        "evaluated": len(plan.pairs),
+        "completions": completions,
+        "failed": failed,
+    }) + b"\n"
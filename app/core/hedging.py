@@ -0,0 +1,177 @@
+"""
+LLM 호출 헤징 (hedged request)
+
+`/api/chat`, `/api/analyze` 의 p99 지연은 평소 응답이 아니라 가끔 매우 느린 OpenAI 응답 하나가 결정합니다.
+호출이 최근 응답 시간의 분위수(`HEDGE_PERCENTILE`, 라우트 + 모델별)를 넘기도록 끝나지 않으면
+같은 요청을 한 번 더(`HEDGE_FALLBACK_MODEL` 이 있으면 그 모델로) 보내고, 먼저 끝난 응답을 쓰고 나머지는 취소합니다.
+
+- 헤지 예산: 호출마다 `HEDGE_BUDGET_RATIO` 만큼 적립되는 토큰 버킷에서만 헤지하므로,
+  업스트림 전체가 느려져도 추가 호출 비율이 예산을 넘지 않습니다.
+- 응답을 스트리밍하지 않으므로 "첫 토큰"이 아니라 전체 응답 시간을 기준으로 합니다.
+- 사용량 기록 래퍼 바깥에 씌우므로 두 번째 요청과 취소된 요청의 토큰도 클라이언트 사용량에 잡힙니다.
+- 헤지를 끈 상태에서도 호출자가 기다린 시간 분포(`llm.latency_ms.<라우트>`)를 기록하므로,
+  켜기 전후의 p99 를 `GET /metrics` 로 비교할 수 있습니다. 오프라인 비교는 `benchmarks/bench_endpoints.py --hedge`.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.usage import current_client
+
+
+class LatencyTracker:
+    """(라우트, 모델)별 최근 응답 시간 표본"""
+
+    def __init__(self) -> None:
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, latency_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or samples.maxlen != settings.HEDGE_WINDOW:
+                samples = self._samples[key] = deque(samples or (), maxlen=settings.HEDGE_WINDOW)
+            samples.append(latency_ms)
+
+    def percentile(self, key: str, q: float) -> float | None:
+        """표본이 `HEDGE_MIN_SAMPLES` 개 미만이면 None"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or len(samples) < settings.HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class HedgeBudget:
+    """호출마다 `ratio` 만큼 적립되고 헤지마다 1 씩 쓰는 토큰 버킷"""
+
+    def __init__(self) -> None:
+        self._credits = 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._credits = min(
+                self._credits + settings.HEDGE_BUDGET_RATIO, settings.HEDGE_BUDGET_BURST
+            )
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._credits < 1.0:
+                return False
+            self._credits -= 1.0
+            return True
+
+
+latency_tracker = LatencyTracker()
+hedge_budget = HedgeBudget()
+
+
+def hedge_delay_ms(key: str) -> float | None:
+    """두 번째 요청을 보내기까지 기다릴 시간 (ms). 헤지하지 않으면 None."""
+    if not settings.HEDGE_ENABLED:
+        return None
+    threshold = latency_tracker.percentile(key, settings.HEDGE_PERCENTILE)
+    if threshold is None:
+        return None
+    return max(threshold, settings.HEDGE_MIN_DELAY_MS)
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+class _HedgedCompletions:
+    def __init__(self, inner: Any):
+        self._inner = inner
+
+    async def create(self, **kwargs: Any) -> Any:
+        _, route = current_client()
+        key = f"{route}:{kwargs['model']}"
+        hedge_budget.deposit()
+        delay_ms = hedge_delay_ms(key)
+
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._inner.create(**kwargs))
+        secondary: asyncio.Task | None = None
+        try:
+            if delay_ms is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay_ms / 1000)
+                if not done:
+                    if hedge_budget.try_spend():
+                        secondary = asyncio.ensure_future(
+                            self._inner.create(**self._hedge_kwargs(kwargs))
+                        )
+                        metrics.incr("hedge.fired")
+                    else:
+                        metrics.incr("hedge.skipped_budget")
+
+            if secondary is None:
+                response = await primary
+                winner = primary
+            else:
+                winner, response = await self._first_success(primary, secondary)
+        finally:
+            for task in (primary, secondary):
+                if task is not None and not task.done():
+                    await _cancel(task)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        # 첫 요청이 취소됐으면 실제 지연은 알 수 없으므로 취소 시점까지의 시간(하한)을 기록
+        latency_tracker.observe(key, elapsed_ms)
+        metrics.observe(f"llm.latency_ms.{route}", round(elapsed_ms, 1))
+        if secondary is not None:
+            metrics.incr("hedge.won" if winner is secondary else "hedge.primary_won")
+            metrics.observe(f"hedge.delay_ms.{route}", round(delay_ms, 1))
+        return response
+
+    @staticmethod
+    def _hedge_kwargs(kwargs: dict[str, Any]) -> dict[str, Any]:
+        if settings.HEDGE_FALLBACK_MODEL:
+            return {**kwargs, "model": settings.HEDGE_FALLBACK_MODEL}
+        return kwargs
+
+    @staticmethod
+    async def _first_success(
+        primary: asyncio.Task, secondary: asyncio.Task
+    ) -> tuple[asyncio.Task, Any]:
+        """먼저 성공한 요청과 응답. 하나가 실패하면 다른 하나를 기다리고, 둘 다 실패하면 첫 요청의 오류."""
+        pending = {primary, secondary}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in (primary, secondary):
+                if task in done and not task.cancelled() and task.exception() is None:
+                    return task, task.result()
+        raise primary.exception()
+
+
+class HedgingClient:
+    """`chat.completions.create` 를 헤징하는 래퍼"""
+
+    def __init__(self, inner: Any):
+        self.inner = inner
+        self.chat = type("Chat", (), {"completions": _HedgedCompletions(inner.chat.completions)})()
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+_wrapped: HedgingClient | None = None
+_wrapped_lock = threading.Lock()
+
+
+def hedge_client(inner: Any) -> HedgingClient:
+    """클라이언트를 헤징 래퍼로 감쌉니다. (같은 클라이언트면 재사용)"""
+    global _wrapped
+    with _wrapped_lock:
+        if _wrapped is None or _wrapped.inner is not inner:
+            _wrapped = HedgingClient(inner)
+        return _wrapped
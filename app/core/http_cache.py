@@ -0,0 +1,71 @@
+"""
+HTTP 조건부 요청 (ETag / 304) 처리
+
+- 응답 본문 해시로 strong ETag 생성
+- 라우트별 Cache-Control 정책
+- `If-None-Match` 가 일치하면 핸들러를 실행하지 않고 304 반환
+"""
+import hashlib
+from typing import Callable
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+# 문서 유형별 추천 질문: 정적 데이터이므로 브라우저/CDN 모두 캐시
+SUGGESTIONS_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+
+# 분석 결과: 사용자별 데이터이므로 브라우저에만 저장하고 매번 ETag 로 재검증
+ANALYSIS_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    """응답 본문 내용 해시로 strong ETag 를 만듭니다."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """`If-None-Match` 헤더 값(여러 개/와일드카드/약한 ETag 포함)이 etag 와 일치하는지 확인"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match 는 약한 비교를 사용합니다. (RFC 9110 13.1.2)
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def cache_headers(etag: str, cache_control: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def conditional(
+    etag_dependency: Callable[..., str | None], cache_control: str
+) -> Callable[..., str | None]:
+    """
+    조건부 요청 의존성을 만듭니다.
+
+    `etag_dependency` 는 핸들러와 같은 경로/쿼리 파라미터를 받아 현재 ETag 를 계산합니다.
+    (본문을 만들지 않고 캐시된 해시만 조회하도록 가볍게 작성합니다.)
+    ETag 가 `If-None-Match` 와 일치하면 핸들러 실행 전에 304 를 반환하고,
+    그렇지 않으면 ETag 를 핸들러에 넘겨 응답 헤더에 쓰게 합니다.
+    """
+
+    def dependency(
+        request: Request, etag: str | None = Depends(etag_dependency)
+    ) -> str | None:
+        if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=cache_headers(etag, cache_control),
+            )
+        return etag
+
+    return dependency
+
+
+def json_body_response(body: bytes, etag: str, cache_control: str) -> Response:
+    """이미 직렬화된 JSON 본문을 ETag/Cache-Control 헤더와 함께 응답합니다."""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=cache_headers(etag, cache_control),
+    )
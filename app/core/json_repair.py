@@ -0,0 +1,486 @@
+"""
+LLM JSON 응답 로컬 복구 및 부분 재검증
+
+LLM 응답이 잘렸거나(JSON 미완성) 스키마와 조금 어긋난 경우(enum 오타, 범위 밖 신뢰도 등)
+전체 요청을 실패시키는 대신 로컬에서 먼저 고쳐 봅니다.
+로컬 복구로도 해결되지 않는 필드만 `reask` 콜백으로 좁게 다시 물어봅니다.
+"""
+import difflib
+import json
+import re
+from typing import Any, Awaitable, Callable, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.serialization import validate_json
+
+M = TypeVar("M", bound=BaseModel)
+
+# 잘못된 필드 목록을 받아 {"경로": 수정값} 을 돌려주는 재질의 콜백
+ReaskFn = Callable[[list[dict[str, Any]]], Awaitable[dict[str, Any]]]
+
+# 로컬 보정 반복 횟수 (보정 후 새로 드러나는 오류까지 처리)
+_MAX_LOCAL_PASSES = 3
+
+# 자주 나오는 enum 변형 → 정식 값
+_LITERAL_ALIASES: dict[str, str] = {
+    "payment": "pay",
+    "납부": "pay",
+    "application": "apply",
+    "신청": "apply",
+    "confirm": "check",
+    "확인": "check",
+    "없음": "none",
+    "type1": "type_1",
+    "type_i": "type_1",
+    "i유형": "type_1",
+    "type2": "type_2",
+    "type_ii": "type_2",
+    "ii유형": "type_2",
+    "not_eligible": "ineligible",
+    "부적격": "ineligible",
+}
+
+# 만 단위로 끊어 읽는 큰 단위와, 그 안의 작은 단위 ("1억 2천만" = 1억 + 2천×만)
+_LARGE_UNITS: dict[str, int] = {"조": 10**12, "억": 10**8, "만": 10**4}
+_SMALL_UNITS: dict[str, int] = {"천": 1_000, "백": 100, "십": 10}
+
+# 숫자 뒤에 붙어도 값의 의미가 바뀌지 않는 단위 (이 외의 글자가 있으면 숫자로 보지 않음)
+_NUMBER_SUFFIX_RE = re.compile(r"(?:원|명|세|인|점|개|가구|호)$")
+_PLAIN_NUMBER_RE = re.compile(r"-?\d{1,3}(?:,\d{3})+(?:\.\d+)?|-?\d+(?:\.\d+)?")
+_KOREAN_NUMBER_TOKEN_RE = re.compile(r"(\d+(?:\.\d+)?)?(조|억|만|천|백|십)|(\d+(?:\.\d+)?)")
+
+
+# ------------------------------------------------------------
+# 1단계: 문자열 수준 JSON 복구
+# ------------------------------------------------------------
+
+def _extract_json_body(text: str) -> str:
+    """코드펜스/앞뒤 설명을 제거하고 첫 '{' 또는 '[' 부터의 본문만 남깁니다."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```[a-zA-Z]*\s*", "", text)
+        text = re.sub(r"\s*```\s*$", "", text)
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    start = min(starts)
+    closer = "}" if text[start] == "{" else "]"
+    end = text.rfind(closer)
+    # 닫는 괄호 뒤에 붙은 설명 문장은 버리되, 잘린 응답은 그대로 둡니다.
+    if end > start and not any(c in '{}[]",:' for c in text[end + 1:]):
+        return text[start:end + 1]
+    return text[start:]
+
+
+def _clean_tokens(text: str) -> str:
+    """
+    문자열 밖의 주석, 트레일링 콤마, 파이썬 리터럴(True/False/None)을 정리합니다.
+    """
+    out: list[str] = []
+    i = 0
+    n = len(text)
+    in_str = False
+    while i < n:
+        ch = text[i]
+        if in_str:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 2
+                continue
+            if ch == '"':
+                in_str = False
+            i += 1
+            continue
+
+        if ch == '"':
+            in_str = True
+            out.append(ch)
+            i += 1
+        elif text.startswith("//", i):
+            nl = text.find("\n", i)
+            i = n if nl < 0 else nl
+        elif ch in "}]":
+            # 직전 유효 문자가 ','이면 제거
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+            out.append(ch)
+            i += 1
+        else:
+            for py, js in (("True", "true"), ("False", "false"), ("None", "null")):
+                if text.startswith(py, i) and not (i > 0 and text[i - 1].isalnum()):
+                    end = i + len(py)
+                    if end >= n or not text[end].isalnum():
+                        out.append(js)
+                        i = end
+                        break
+            else:
+                out.append(ch)
+                i += 1
+    return "".join(out)
+
+
+def _close_truncated(text: str) -> str | None:
+    """
+    잘린 JSON을 닫아 파싱 가능한 형태로 만듭니다.
+
+    끝까지 읽은 상태에서 열린 문자열/괄호를 닫아 보고,
+    실패하면 마지막으로 완결된 항목(콤마 또는 여는 괄호 직후)까지 잘라 다시 닫습니다.
+    """
+    stack: list[str] = []
+    cut_points: list[tuple[int, tuple[str, ...]]] = []
+    in_str = False
+    escape = False
+    for i, ch in enumerate(text):
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cut_points.append((i + 1, tuple(stack)))
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            cut_points.append((i, tuple(stack)))
+
+    candidates = []
+    tail = text
+    if in_str:
+        tail += '"'
+    candidates.append(tail + "".join(reversed(stack)))
+    for pos, open_stack in reversed(cut_points[-20:]):
+        candidates.append(text[:pos] + "".join(reversed(open_stack)))
+
+    for candidate in candidates:
+        try:
+            json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        return candidate
+    return None
+
+
+def loads_lenient(content: str) -> Any:
+    """
+    LLM 응답 문자열을 JSON으로 파싱합니다.
+
+    `json.loads` 가 실패하면 코드펜스 제거, 트레일링 콤마/주석 정리,
+    잘린 문자열·괄호 닫기를 차례로 시도합니다.
+
+    Raises:
+        ValueError: 로컬 복구로도 JSON을 만들 수 없는 경우
+    """
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+
+    body = _clean_tokens(_extract_json_body(content))
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError:
+        pass
+
+    closed = _close_truncated(body)
+    if closed is None:
+        raise ValueError("LLM 응답을 JSON으로 복구할 수 없습니다.")
+    return json.loads(closed)
+
+
+# ------------------------------------------------------------
+# 2단계: 스키마 오류 기반 값 보정
+# ------------------------------------------------------------
+
+def _get_path(data: Any, loc: tuple) -> Any:
+    for key in loc:
+        data = data[key]
+    return data
+
+
+def _set_path(data: Any, loc: tuple, value: Any) -> None:
+    target = _get_path(data, loc[:-1])
+    target[loc[-1]] = value
+
+
+def _format_loc(loc: tuple) -> str:
+    return ".".join(str(part) for part in loc)
+
+
+def _parse_loc(path: str) -> tuple:
+    return tuple(int(part) if part.isdigit() else part for part in path.split("."))
+
+
+def _coerce_literal(value: Any, expected: str) -> Any:
+    choices = re.findall(r"'((?:[^'\\]|\\.)*)'", expected)
+    if not choices or not isinstance(value, str):
+        return None
+    key = re.sub(r"[\s\-]+", "_", value.strip().lower())
+    if key in choices:
+        return key
+    alias = _LITERAL_ALIASES.get(key)
+    if alias in choices:
+        return alias
+    close = difflib.get_close_matches(key, choices, n=1, cutoff=0.6)
+    if close:
+        return close[0]
+    # 가까운 값이 없으면 "unknown" 등으로 덮지 않고 재질의 단계로 넘깁니다.
+    return None
+
+
+def _parse_korean_number(text: str) -> float | None:
+    """
+    '1억2천만', '3억5천', '2천5백만' 같은 한글 단위 숫자를 읽습니다.
+
+    큰 단위(조/억/만)는 내림차순으로만, 단위 없는 숫자는 맨 끝에만 올 수 있습니다.
+    억/조 뒤에 큰 단위 없이 끝나는 천/백/십 묶음은 관용대로 바로 아래 큰 단위가 생략된 것으로
+    읽고('3억5천' = 3억 5천만), 단위 없는 숫자로 끝나면('1억 5000') 뜻이 모호하므로 None 입니다.
+    """
+    total = 0.0
+    group = 0.0  # 아직 큰 단위를 만나지 않은 만 미만 부분
+    group_bare = False  # group 에 단위 없는 숫자가 들어 있는지
+    last_large = None
+    pos = 0
+    while pos < len(text):
+        match = _KOREAN_NUMBER_TOKEN_RE.match(text, pos)
+        if match is None:
+            return None
+        pos = match.end()
+        number, unit, bare = match.groups()
+        if bare is not None:
+            if pos != len(text):
+                return None
+            group += float(bare)
+            group_bare = True
+        elif unit in _SMALL_UNITS:
+            group += float(number or 1) * _SMALL_UNITS[unit]
+        else:
+            multiplier = _LARGE_UNITS[unit]
+            if last_large is not None and multiplier >= last_large:
+                return None
+            if number is not None:
+                group += float(number)
+            if not group:
+                return None
+            total += group * multiplier
+            group = 0.0
+            last_large = multiplier
+    if group and last_large is not None and last_large > _LARGE_UNITS["만"]:
+        if group_bare:
+            return None
+        # '3억5천' → 5천 뒤에 만이 생략됨 (조 뒤면 억이 생략됨)
+        group *= last_large // _LARGE_UNITS["만"]
+    return total + group
+
+
+def _parse_number(value: Any) -> float | None:
+    """
+    '500만원', '1,200,000원', '1억 2천만원', '95%' 같은 문자열 전체를 숫자 하나로 읽습니다.
+
+    날짜나 설명 등 숫자가 아닌 글자가 섞였거나 숫자가 여러 개면 추측하지 않고 None 을 돌려
+    재질의 단계로 넘깁니다.
+    """
+    if not isinstance(value, str):
+        return None
+    text = value.strip().lstrip("₩")
+    percent = text.endswith("%")
+    if percent:
+        text = text[:-1]
+    else:
+        text = _NUMBER_SUFFIX_RE.sub("", text)
+    text = "".join(text.split())
+    if not text:
+        return None
+    if _PLAIN_NUMBER_RE.fullmatch(text):
+        number = float(text.replace(",", ""))
+    elif percent:
+        return None
+    else:
+        negative = text.startswith("-")
+        # 단위 앞 숫자의 천 단위 구분 쉼표만 허용 ("1,200만")
+        number = _parse_korean_number(
+            re.sub(r"(?<=\d),(?=\d{3})", "", text.lstrip("-"))
+        )
+        if number is None:
+            return None
+        if negative:
+            number = -number
+    return number / 100 if percent else number
+
+
+def _coerce_value(error: dict[str, Any]) -> tuple[bool, Any]:
+    """
+    Pydantic 오류 하나에 대한 로컬 보정값을 계산합니다.
+
+    Returns:
+        (보정 가능 여부, 보정값)
+    """
+    kind = error["type"]
+    value = error.get("input")
+    ctx = error.get("ctx") or {}
+
+    if kind == "literal_error":
+        coerced = _coerce_literal(value, str(ctx.get("expected", "")))
+        return coerced is not None, coerced
+
+    if kind in ("less_than_equal", "less_than", "greater_than_equal", "greater_than"):
+        if not isinstance(value, (int, float)):
+            return False, None
+        if "le" in ctx or "lt" in ctx:
+            upper = ctx.get("le", ctx.get("lt"))
+            # 0~1 범위 필드에 백분율(예: 95)로 들어온 경우
+            if upper == 1 and 1 < value <= 100:
+                return True, value / 100
+            return True, upper
+        return True, ctx.get("ge", ctx.get("gt"))
+
+    if kind in ("int_parsing", "float_parsing", "int_type", "float_type"):
+        number = _parse_number(value)
+        if number is None:
+            # 숫자 하나로 읽을 수 없으면 추측하지 않고 재질의 단계로 넘깁니다.
+            return False, None
+        if kind.startswith("int"):
+            number = int(round(number))
+        return True, number
+
+    if kind == "int_from_float":
+        return True, int(round(value))
+
+    if kind in ("bool_parsing", "bool_type") and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("예", "네", "yes", "y", "true", "o"):
+            return True, True
+        if lowered in ("아니오", "아니요", "no", "n", "false", "x"):
+            return True, False
+        return False, None
+
+    if kind == "string_type" and isinstance(value, (int, float)):
+        return True, str(value)
+
+    if kind == "list_type" and isinstance(value, (str, dict)):
+        return True, [value]
+
+    return False, None
+
+
+def _drop_truncated_items(data: Any, errors: list[dict[str, Any]]) -> bool:
+    """
+    잘린 응답을 닫으면서 생긴 '필수 필드가 빠진 마지막 리스트 항목'을 제거합니다.
+    """
+    targets = set()
+    for error in errors:
+        loc = error["loc"]
+        if error["type"] != "missing" or len(loc) < 2 or not isinstance(loc[-2], int):
+            continue
+        try:
+            items = _get_path(data, loc[:-2])
+        except (KeyError, IndexError, TypeError):
+            continue
+        if isinstance(items, list) and loc[-2] == len(items) - 1:
+            targets.add(loc[:-1])
+    for loc in targets:
+        del _get_path(data, loc[:-1])[loc[-1]]
+    return bool(targets)
+
+
+def _apply_local_fixes(data: Any, errors: list[dict[str, Any]]) -> bool:
+    if _drop_truncated_items(data, errors):
+        return True
+    changed = False
+    for error in errors:
+        ok, value = _coerce_value(error)
+        if not ok or not error["loc"]:
+            continue
+        try:
+            _set_path(data, error["loc"], value)
+        except (KeyError, IndexError, TypeError):
+            continue
+        changed = True
+    return changed
+
+
+def describe_errors(data: Any, errors: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """재질의 프롬프트에 넣을 수 있도록 잘못된 필드와 그 주변 값만 추립니다."""
+    described = []
+    for error in errors:
+        loc = error["loc"]
+        try:
+            context = _get_path(data, loc[:-1]) if loc else None
+        except (KeyError, IndexError, TypeError):
+            context = None
+        described.append(
+            {
+                "path": _format_loc(loc),
+                "message": error["msg"],
+                "value": None if error["type"] == "missing" else error.get("input"),
+                "context": context,
+            }
+        )
+    return described
+
+
+async def validate_llm_json(
+    model_cls: type[M],
+    content: str,
+    reask: ReaskFn | None = None,
+) -> M:
+    """
+    LLM 응답 문자열을 복구/보정한 뒤 `model_cls` 로 검증합니다.
+
+    1. `loads_lenient` 로 JSON 복구
+    2. 검증 오류를 보고 enum 근사값, 범위 clamp, 숫자 파싱 등 로컬 보정
+    3. 그래도 남는 오류가 있고 `reask` 가 주어지면 해당 필드만 재질의해 병합
+
+    Raises:
+        ValueError: JSON 복구 실패
+        ValidationError: 보정/재질의 후에도 스키마를 만족하지 않는 경우
+    """
+    # 정상 응답은 dict 를 거치지 않고 원본 문자열에서 바로 검증합니다.
+    try:
+        return validate_json(model_cls, content)
+    except ValidationError:
+        pass
+
+    data = loads_lenient(content)
+
+    for _ in range(_MAX_LOCAL_PASSES):
+        try:
+            return model_cls.model_validate(data)
+        except ValidationError as e:
+            errors = e.errors()
+            if not _apply_local_fixes(data, errors):
+                break
+
+    try:
+        return model_cls.model_validate(data)
+    except ValidationError as e:
+        if reask is None or not isinstance(data, dict):
+            raise
+        errors = e.errors()
+
+    fixes = await reask(describe_errors(data, errors))
+    for path, value in fixes.items():
+        try:
+            _set_path(data, _parse_loc(path), value)
+        except (KeyError, IndexError, TypeError):
+            continue
+
+    try:
+        return model_cls.model_validate(data)
+    except ValidationError as e:
+        # 재질의 결과도 한 번 더 로컬 보정을 거칩니다.
+        if not _apply_local_fixes(data, e.errors()):
+            raise
+    return model_cls.model_validate(data)
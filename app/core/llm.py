@@ -0,0 +1,95 @@
+"""
+OpenAI 클라이언트 관리
+
+`openai` 패키지는 import 비용이 크므로 모듈 import 시점이 아니라
+시작 후 워밍업(`WARMUP_ON_STARTUP`)이나 첫 LLM 호출에서 한 번만 클라이언트를 만들고 모든 라우트가 공유합니다.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.core.startup import startup_profiler
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# 워밍업 요청에 사용할 모델 (토큰을 쓰지 않는 모델 조회 API 사용)
+_WARMUP_MODEL = "gpt-4o-mini"
+
+_client: AsyncOpenAI | None = None
+# 워밍업 스레드와 첫 요청이 동시에 클라이언트를 만들지 않도록 보호
+_client_lock = threading.Lock()
+
+
+def init_client() -> AsyncOpenAI | None:
+    """공유 OpenAI 클라이언트를 만듭니다. 키가 없으면 None."""
+    global _client
+    if _client is not None or not settings.OPEN_AI_KEY:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            openai = startup_profiler.import_module("openai")
+            with startup_profiler.phase("init openai client"):
+                _client = openai.AsyncOpenAI(api_key=settings.OPEN_AI_KEY)
+    return _client
+
+
+def is_configured() -> bool:
+    """LLM 호출이 가능한지 (키가 있거나, 기록된 응답을 재생하는 모드)"""
+    return bool(settings.OPEN_AI_KEY) or settings.LLM_CASSETTE_MODE == "replay"
+
+
+def get_client() -> AsyncOpenAI:
+    """
+    공유 OpenAI 클라이언트를 반환합니다.
+
+    워밍업 전이거나 워밍업을 끈 경우, lifespan 밖(스크립트 등)에서 호출되면 그 자리에서 만듭니다.
+    `LLM_CASSETTE_MODE` 가 record/replay 면 기록/재생 래퍼로 감싸고, `USAGE_TRACKING` 이 켜져 있으면
+    클라이언트별 토큰 사용량 기록 래퍼를, 마지막으로 헤징 래퍼를 씌웁니다.
+    (헤징이 보낸 두 번째 요청과 취소된 요청도 사용량/할당량에 잡히도록 사용량 기록이 헤징 안쪽에 있음)
+    """
+    client = init_client()
+    if settings.LLM_CASSETTE_MODE != "off":
+        from app.core.llm_cassette import wrap_client
+
+        client = wrap_client(client)
+    if client is None:
+        raise RuntimeError("OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.")
+    if settings.USAGE_TRACKING:
+        from app.core.usage import track_usage
+
+        client = track_usage(client)
+    from app.core.hedging import hedge_client
+
+    return hedge_client(client)
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def warm_up_connection() -> None:
+    """
+    업스트림 연결(DNS/TLS)을 미리 열어 둡니다.
+
+    토큰을 소비하지 않는 모델 조회 API를 호출해 HTTP 커넥션 풀에 연결을 남깁니다.
+    """
+    client = init_client()
+    if client is None or settings.LLM_CASSETTE_MODE == "replay":
+        return
+    with startup_profiler.phase("connect openai"):
+        try:
+            await client.with_options(timeout=5.0, max_retries=0).models.retrieve(
+                _WARMUP_MODEL
+            )
+        except Exception as e:
+            logger.warning("OpenAI warm-up request failed: %s", e)
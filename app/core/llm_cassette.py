@@ -0,0 +1,195 @@
+"""
+LLM 호출 기록/재생 (cassette)
+
+실제 요청 흐름을 OpenAI 비용 없이 다시 돌리고, 네트워크 편차 없이 두 빌드의 로컬 CPU 비용을
+비교하기 위한 계층입니다. `chat.completions.create` 호출을 감싸며, 모델 + messages 해시를 키로
+요청/응답/토큰 사용량/지연 시간을 `LLM_CASSETTE_DIR` 에 저장합니다.
+
+- `LLM_CASSETTE_MODE=record`: 실제로 호출하고 결과를 기록
+- `LLM_CASSETTE_MODE=replay`: 기록된 응답을 반환 (OpenAI 키/네트워크 불필요)
+  `LLM_CASSETTE_REPLAY_LATENCY=true` 면 기록된 지연 시간만큼 기다렸다가 반환
+- 같은 키로 여러 번 기록된 경우 재생 시 기록 순서대로 돌아가며 반환합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.serialization import dumps
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# 응답에 영향을 주지 않아 기록하지 않는 호출 인자
+_VOLATILE_KWARGS = ("timeout",)
+
+
+class CassetteMiss(LookupError):
+    """재생 모드에서 기록되지 않은 요청을 받음"""
+
+    def __init__(self, key: str):
+        super().__init__(f"녹화된 LLM 응답이 없습니다: {key}")
+        self.key = key
+
+
+def cassette_key(model: str, messages: list[dict[str, Any]]) -> str:
+    """모델 + messages(role/content) 해시"""
+    canonical = json.dumps(
+        [{"role": m["role"], "content": m["content"]} for m in messages],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"{model}-{digest[:24]}"
+
+
+class CassetteStore:
+    """키별 JSON 파일(기록 목록)로 저장하는 로컬 카세트 저장소"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        # 재생 위치 (키 → 다음에 돌려줄 기록 번호)
+        self._cursors: dict[str, int] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load(self, key: str) -> list[dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return []
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def append(self, key: str, interaction: dict[str, Any]) -> None:
+        with self._lock:
+            interactions = self._load(key)
+            interactions.append(interaction)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._path(key).write_text(dumps(interactions, indent=2), encoding="utf-8")
+
+    def next(self, key: str) -> dict[str, Any]:
+        with self._lock:
+            interactions = self._load(key)
+            if not interactions:
+                raise CassetteMiss(key)
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return interactions[cursor % len(interactions)]
+
+
+def _usage_dict(response: Any) -> dict[str, Any] | None:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+def _response_dict(response: Any) -> dict[str, Any]:
+    if hasattr(response, "model_dump"):
+        return response.model_dump(mode="json", exclude_none=True)
+    # 테스트 더블 등 pydantic 모델이 아닌 응답은 본문만 기록
+    return {
+        "choices": [
+            {
+                "index": i,
+                "finish_reason": getattr(choice, "finish_reason", None) or "stop",
+                "message": {"role": "assistant", "content": choice.message.content},
+            }
+            for i, choice in enumerate(response.choices)
+        ],
+        "usage": _usage_dict(response),
+    }
+
+
+def _build_response(data: dict[str, Any]) -> Any:
+    from openai.types.chat import ChatCompletion
+
+    return ChatCompletion.model_validate({
+        "id": "cassette",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "cassette",
+        **{k: v for k, v in data.items() if v is not None},
+    })
+
+
+class _CassetteCompletions:
+    def __init__(self, inner: Any, store: CassetteStore, mode: str):
+        self._inner = inner
+        self._store = store
+        self._mode = mode
+
+    async def create(self, **kwargs: Any) -> Any:
+        key = cassette_key(kwargs["model"], kwargs["messages"])
+
+        if self._mode == "replay":
+            interaction = await asyncio.to_thread(self._store.next, key)
+            metrics.incr("cassette.replayed")
+            if settings.LLM_CASSETTE_REPLAY_LATENCY:
+                await asyncio.sleep(interaction["latency_ms"] / 1000)
+            return _build_response(interaction["response"])
+
+        started = time.perf_counter()
+        response = await self._inner.create(**kwargs)
+        latency_ms = (time.perf_counter() - started) * 1000
+        interaction = {
+            "key": key,
+            "recorded_at": time.time(),
+            "latency_ms": round(latency_ms, 1),
+            "request": {k: v for k, v in kwargs.items() if k not in _VOLATILE_KWARGS},
+            "response": _response_dict(response),
+            "usage": _usage_dict(response),
+        }
+        await asyncio.to_thread(self._store.append, key, interaction)
+        metrics.incr("cassette.recorded")
+        return response
+
+
+class CassetteClient:
+    """`AsyncOpenAI` 대신 라우트에 넘겨주는 기록/재생 래퍼 (chat.completions 만 지원)"""
+
+    def __init__(self, inner: Any, store: CassetteStore, mode: str):
+        self.inner = inner
+        self.mode = mode
+        completions = _CassetteCompletions(
+            inner.chat.completions if inner is not None else None, store, mode
+        )
+        self.chat = type("Chat", (), {"completions": completions})()
+
+    async def close(self) -> None:
+        if self.inner is not None:
+            await self.inner.close()
+
+
+_store: CassetteStore | None = None
+_wrapped: CassetteClient | None = None
+_wrapped_lock = threading.Lock()
+
+
+def wrap_client(inner: Any) -> CassetteClient:
+    """현재 설정의 카세트 모드로 클라이언트를 감쌉니다. (같은 클라이언트면 재사용)"""
+    global _store, _wrapped
+    mode = settings.LLM_CASSETTE_MODE
+    if mode not in CASSETTE_MODES or mode == "off":
+        raise ValueError(f"unsupported LLM_CASSETTE_MODE: {mode}")
+    if mode == "record" and inner is None:
+        raise RuntimeError("OPEN_AI_KEY가 서버에 설정되어 있지 않습니다.")
+
+    with _wrapped_lock:
+        if _store is None or _store.directory != Path(settings.LLM_CASSETTE_DIR):
+            _store = CassetteStore(settings.LLM_CASSETTE_DIR)
+            _wrapped = None
+        if _wrapped is None or _wrapped.inner is not inner or _wrapped.mode != mode:
+            _wrapped = CassetteClient(inner, _store, mode)
+        return _wrapped
@@ -0,0 +1,208 @@
+"""
+메모리 사용량 제한과 요청별 최대 RSS 기록
+
+이미지가 많은 대용량 PDF 여러 개를 동시에 파싱하면 워커가 OOM 에 가까워집니다.
+
+- 동시 추출 제한: 개수가 아니라 예상 메모리 비용(원본 크기 × 배수)의 합이
+  `PDF_EXTRACT_MEMORY_BUDGET_MB` 를 넘지 않도록 대기시킵니다.
+- RSS 기록: 요청 처리 중 프로세스 RSS 를 주기적으로 샘플링해 라우트별 최대값/증가량 분포를
+  `GET /metrics` 로 노출합니다. (프로세스 전체 값이므로 동시 요청의 사용량이 함께 잡힙니다)
+"""
+import asyncio
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.deadline import RequestBudget
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes() -> int | None:
+    """현재 프로세스 RSS (바이트). /proc 가 없는 환경이면 None."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def estimate_extraction_cost(raw_size: int) -> int:
+    """PDF 추출의 예상 메모리 비용 (바이트): 기본 비용 + 원본 크기 × 배수"""
+    return int(
+        settings.PDF_EXTRACT_BASE_COST_MB * _MB
+        + raw_size * settings.PDF_EXTRACT_MEMORY_FACTOR
+    )
+
+
+class MemoryLimiter:
+    """예상 메모리 비용 합이 예산을 넘지 않도록 작업 시작을 대기시키는 가중치 세마포어"""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.in_use = 0
+        self._condition: asyncio.Condition | None = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # 이벤트 루프 안에서 처음 사용할 때 만듭니다.
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self, cost: int) -> int:
+        # 예산보다 큰 작업 하나는 단독으로 실행되도록 비용을 예산으로 자릅니다.
+        cost = min(cost, self.budget_bytes)
+        condition = self._get_condition()
+        async with condition:
+            if self.in_use + cost > self.budget_bytes:
+                metrics.incr("memory.extract_waits")
+                await condition.wait_for(lambda: self.in_use + cost <= self.budget_bytes)
+            self.in_use += cost
+        return cost
+
+    async def release(self, cost: int) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_use -= cost
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def reserve(
+        self, cost: int, budget: RequestBudget | None = None
+    ) -> AsyncIterator[None]:
+        """
+        비용만큼 예산을 확보한 동안 블록을 실행합니다.
+
+        `budget` 을 주면 대기 중에도 연결 끊김/시간 초과로 취소됩니다.
+        """
+        if budget is not None:
+            reserved = await budget.run(self.acquire(cost), stage="extract_queue")
+        else:
+            reserved = await self.acquire(cost)
+        try:
+            yield
+        finally:
+            await self.release(reserved)
+
+
+extraction_limiter = MemoryLimiter(settings.PDF_EXTRACT_MEMORY_BUDGET_MB * _MB)
+
+
+class _RssSampler:
+    """추적 중인 요청이 있는 동안만 RSS 를 샘플링하는 백그라운드 스레드"""
+
+    def __init__(self) -> None:
+        self._trackers: set["RssTracker"] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, tracker: "RssTracker") -> None:
+        with self._lock:
+            self._trackers.add(tracker)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="rss-sampler", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def remove(self, tracker: "RssTracker") -> None:
+        with self._lock:
+            self._trackers.discard(tracker)
+
+    def _run(self) -> None:
+        interval = settings.MEMORY_SAMPLE_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                trackers = list(self._trackers)
+            if not trackers:
+                # 추적 대상이 없으면 다음 요청까지 대기
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            rss = current_rss_bytes()
+            if rss is not None:
+                for tracker in trackers:
+                    tracker.update(rss)
+            self._wake.wait(interval)
+            self._wake.clear()
+
+
+_sampler = _RssSampler()
+
+
+class RssTracker:
+    """요청 하나의 시작 RSS 와 처리 중 최대 RSS"""
+
+    def __init__(self) -> None:
+        self.start_rss = current_rss_bytes()
+        self.peak_rss = self.start_rss
+
+    @property
+    def enabled(self) -> bool:
+        return self.start_rss is not None
+
+    def update(self, rss: int) -> None:
+        if self.peak_rss is None or rss > self.peak_rss:
+            self.peak_rss = rss
+
+    def __enter__(self) -> "RssTracker":
+        if self.enabled:
+            _sampler.add(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self.enabled:
+            return
+        _sampler.remove(self)
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.update(rss)
+
+    @property
+    def peak_mb(self) -> float:
+        return (self.peak_rss or 0) / _MB
+
+    @property
+    def growth_mb(self) -> float:
+        return ((self.peak_rss or 0) - (self.start_rss or 0)) / _MB
+
+
+class MemoryTrackingMiddleware:
+    """요청별 최대 RSS 와 시작 대비 증가량을 라우트별로 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.MEMORY_TRACKING:
+            await self.app(scope, receive, send)
+            return
+
+        with RssTracker() as tracker:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if tracker.enabled:
+                    # 경로 파라미터로 이름이 늘어나지 않도록 라우트 템플릿 사용
+                    route = scope.get("route")
+                    name = getattr(route, "path", None) or "unmatched"
+                    metrics.observe(f"memory.peak_rss_mb.{name}", round(tracker.peak_mb, 1))
+                    metrics.observe(f"memory.rss_growth_mb.{name}", round(tracker.growth_mb, 1))
+                    if tracker.growth_mb >= settings.MEMORY_LOG_GROWTH_MB:
+                        logger.info(
+                            "request %s peak RSS %.1fMB (+%.1fMB)",
+                            scope["path"], tracker.peak_mb, tracker.growth_mb,
+                        )
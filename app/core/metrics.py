@@ -0,0 +1,65 @@
+"""
+프로세스 내 운영 지표 카운터
+
+요청 취소, 캐시 적중 등 가벼운 카운터와, 요청별 최대 메모리 같은 관측값 분포를 모아
+`/metrics` 로 노출합니다.
+"""
+import threading
+from collections import Counter, deque
+
+# 관측값은 이름별로 최근 N개만 보관해 분위수를 계산
+_MAX_OBSERVATIONS = 1000
+
+
+class Metrics:
+    """스레드 안전한 이름별 카운터 / 관측값"""
+
+    def __init__(self) -> None:
+        self._counts: Counter[str] = Counter()
+        self._observations: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += value
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._counts[name]
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            values = self._observations.get(name)
+            if values is None:
+                values = self._observations[name] = deque(maxlen=_MAX_OBSERVATIONS)
+            values.append(value)
+
+    def snapshot(self, prefix: str = "") -> dict[str, int]:
+        with self._lock:
+            return {
+                name: count
+                for name, count in sorted(self._counts.items())
+                if name.startswith(prefix)
+            }
+
+    def summaries(self, prefix: str = "") -> dict[str, dict[str, float]]:
+        """관측값 이름별 최근 표본의 개수/p50/p95/p99/최대값"""
+        with self._lock:
+            observations = {
+                name: sorted(values)
+                for name, values in sorted(self._observations.items())
+                if name.startswith(prefix) and values
+            }
+        return {
+            name: {
+                "count": len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+                "max": values[-1],
+            }
+            for name, values in observations.items()
+        }
+
+
+metrics = Metrics()
@@ -0,0 +1,174 @@
+"""
+점진적 페이지 추출 (progressive extraction)
+
+공고문의 마감일, 금액, 주관 기관은 대부분 앞쪽 몇 페이지에 있고, 뒤쪽의 평면도/법령 별첨은
+파싱 시간과 토큰만 늘립니다. 분석 시에는 앞 페이지부터 토큰 예산까지만 추출해 LLM에 보내고,
+나머지 페이지는 원본과 함께 보관했다가 채팅 검색이나 `uncertainty` 항목 보완에 필요할 때만 추출합니다.
+"""
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from app.core.deadline import RequestBudget
+from app.core.memory import estimate_extraction_cost, extraction_limiter
+from app.core.pdf_extract import extract_pdf_page_range
+from app.core.text_normalize import estimate_tokens
+
+_SPACES_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+
+# 검색 키워드에서 떼어낼 조사/어미 (긴 것부터 확인)
+_SUFFIXES = sorted(
+    ["에서는", "에서", "에게", "까지", "부터", "으로", "하나요", "인가요", "나요", "해야",
+     "은", "는", "이", "가", "을", "를", "에", "의", "도", "만", "요"],
+    key=len,
+    reverse=True,
+)
+
+# 분석 필드별 검색 키워드 (uncertainty 항목 보완용)
+FIELD_KEYWORDS: dict[str, str] = {
+    "deadline": "마감 기한 일정 접수 신청기간 납부기한",
+    "amount": "금액 원 납부 보증금 임대료 공급가격",
+    "authority": "기관 문의 공사 시청 구청 센터",
+    "applicantType": "대상 자격 요건 신청자격 무주택",
+    "title": "공고 제목",
+    "docType": "공고 고지",
+}
+
+
+def text_nbytes(texts: Iterable[str]) -> int:
+    """문자열들의 대략적인 메모리 크기 (한글이 섞인 str 은 글자당 2바이트)"""
+    return 2 * sum(len(text) for text in texts)
+
+
+def pages_within_budget(pages: list[str], token_budget: int) -> int:
+    """앞 페이지부터 누적 추정 토큰이 예산에 도달할 때까지의 페이지 수 (최소 1)"""
+    used = 0
+    for count, text in enumerate(pages):
+        if count and used >= token_budget:
+            return count
+        used += estimate_tokens(text)
+    return len(pages)
+
+
+def keywords(text: str) -> set[str]:
+    """검색용 키워드 (2글자 이상 단어에서 조사/어미 제거)"""
+    result = set()
+    for word in _WORD_RE.findall(text.lower()):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                word = word[: -len(suffix)]
+                break
+        if len(word) >= 2:
+            result.add(word)
+    return result
+
+
+def select_pages(
+    pages: list[tuple[int, str]],
+    query: str,
+    token_budget: int,
+) -> list[tuple[int, str]]:
+    """
+    질의 키워드가 많이 등장하는 페이지를 토큰 예산 안에서 고릅니다. (페이지 순으로 반환)
+    """
+    terms = keywords(query)
+    if not terms:
+        return []
+    scored = []
+    for page_no, text in pages:
+        compact = text.lower()
+        score = sum(compact.count(term) for term in terms)
+        if score:
+            scored.append((score, page_no, text))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    selected, used = [], 0
+    for _, page_no, text in scored:
+        tokens = estimate_tokens(text)
+        if selected and used + tokens > token_budget:
+            break
+        selected.append((page_no, text))
+        used += tokens
+    return sorted(selected)
+
+
+def locate_in_pages(snippet: str, pages: list[tuple[int, str]]) -> int | None:
+    """근거 문장이 등장하는 페이지 번호 (공백 차이는 무시)"""
+    needle = _SPACES_RE.sub("", snippet)[:30]
+    if not needle:
+        return None
+    for page_no, text in pages:
+        if needle in _SPACES_RE.sub("", text):
+            return page_no
+    return None
+
+
+@dataclass
+class PageSource:
+    """
+    분석에 보낸 앞 페이지와, 아직 보내지 않은(또는 추출하지 않은) 나머지 페이지의 원본
+
+    PDF 는 나머지 페이지를 처음 필요할 때 추출하고, 모두 추출하면 원본 바이트를 버립니다.
+    """
+
+    pages: list[str]
+    total_pages: int
+    analyzed_pages: int
+    raw_bytes: bytes | None = None
+    tables: bool = True
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def complete(self) -> bool:
+        return self.analyzed_pages >= self.total_pages
+
+    def mentions(self, terms: set[str]) -> bool:
+        """분석한 페이지에 키워드가 하나라도 등장하는지"""
+        analyzed = "\n".join(self.pages[: self.analyzed_pages]).lower()
+        return any(term in analyzed for term in terms)
+
+    @property
+    def pending_bytes(self) -> int:
+        """아직 추출하지 않은 PDF 원본 크기 (없으면 0)"""
+        return len(self.raw_bytes) if self.raw_bytes is not None else 0
+
+    @property
+    def nbytes(self) -> int:
+        """보관 중인 원본 바이트와 추출 텍스트의 대략적인 메모리 크기"""
+        return self.pending_bytes + text_nbytes(self.pages)
+
+    async def load_remaining(self, budget: RequestBudget) -> list[tuple[int, str]]:
+        """메모리 예산을 확보한 뒤 스레드에서 `remaining_pages` 를 실행합니다."""
+        if not self.pending_bytes:
+            return await budget.run_in_thread(self.remaining_pages, stage="extract")
+        async with extraction_limiter.reserve(
+            estimate_extraction_cost(self.pending_bytes), budget
+        ):
+            return await budget.run_in_thread(self.remaining_pages, stage="extract")
+
+    def remaining_pages(
+        self, check: Callable[[], None] | None = None
+    ) -> list[tuple[int, str]]:
+        """
+        분석에 보내지 않은 페이지를 (페이지 번호, 텍스트) 로 반환합니다.
+
+        아직 추출하지 않은 PDF 페이지는 이때 추출합니다. (스레드에서 호출)
+        """
+        with self._lock:
+            if self.raw_bytes is not None and len(self.pages) < self.total_pages:
+                batch = extract_pdf_page_range(
+                    self.raw_bytes,
+                    start=len(self.pages),
+                    tables=self.tables,
+                    check=check,
+                )
+                self.pages.extend(batch.pages)
+            if len(self.pages) >= self.total_pages:
+                self.raw_bytes = None
+            return [
+                (index + 1, text)
+                for index, text in enumerate(self.pages)
+                if index >= self.analyzed_pages
+            ]
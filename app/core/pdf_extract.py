@@ -0,0 +1,209 @@
+"""
+PDF 텍스트 추출
+
+주택 공고문의 핵심 정보(주택형별 공급 세대수, 가구원수별 소득 기준, 일정표)는 표에 있습니다.
+`page.extract_text()` 는 표를 긴 토큰 나열로 평탄화하므로, 표 영역은 pdfplumber의
+table finder로 찾아 한 줄에 한 행씩 `셀 | 셀 | 셀` 형태로 만들고, 나머지 본문은 따로 추출합니다.
+"""
+import hashlib
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from app.core.startup import startup_profiler
+from app.core.text_normalize import estimate_tokens
+
+_CELL_SPACES_RE = re.compile(r"\s+")
+
+
+def load_pdfplumber():
+    """
+    pdfplumber(pdfminer)를 처음 필요할 때 import 합니다.
+
+    import 비용이 커서 앱 시작 시점이 아니라 워밍업 또는 첫 PDF 요청에서 불러옵니다.
+    """
+    return startup_profiler.import_module("pdfplumber")
+
+
+def _render_table(rows: list[list[str | None]]) -> str:
+    """표 행 목록을 compact 한 구분자 행으로 변환합니다. (빈 행은 제거)"""
+    lines = []
+    for row in rows:
+        cells = [_CELL_SPACES_RE.sub(" ", cell or "").strip() for cell in row]
+        if not any(cells):
+            continue
+        lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+
+def _extract_page_flat(page) -> str:
+    return page.extract_text() or ""
+
+
+def _extract_page_with_tables(page) -> str:
+    """
+    표는 구분자 행으로, 표 밖의 본문은 일반 텍스트로 추출해 위에서 아래 순서로 합칩니다.
+    """
+    tables = sorted(page.find_tables(), key=lambda t: t.bbox[1])
+    if not tables:
+        return page.extract_text() or ""
+
+    bboxes = [table.bbox for table in tables]
+
+    def outside_tables(obj) -> bool:
+        cx = (obj["x0"] + obj["x1"]) / 2
+        cy = (obj["top"] + obj["bottom"]) / 2
+        return not any(x0 <= cx <= x1 and top <= cy <= bottom for x0, top, x1, bottom in bboxes)
+
+    prose_page = page.filter(outside_tables)
+    x0, page_top, x1, page_bottom = page.bbox
+
+    blocks: list[str] = []
+    cursor = page_top
+    for table in tables:
+        top, bottom = table.bbox[1], table.bbox[3]
+        if top > cursor:
+            prose = prose_page.crop((x0, cursor, x1, top)).extract_text() or ""
+            if prose.strip():
+                blocks.append(prose.strip())
+        rendered = _render_table(table.extract())
+        if rendered:
+            blocks.append(rendered)
+        cursor = max(cursor, bottom)
+
+    if cursor < page_bottom:
+        prose = prose_page.crop((x0, cursor, x1, page_bottom)).extract_text() or ""
+        if prose.strip():
+            blocks.append(prose.strip())
+
+    return "\n\n".join(blocks)
+
+
+def page_content_hash(page) -> str:
+    """
+    페이지의 그리기 명령(content stream)과 크기로 만든 해시
+
+    레이아웃 분석 없이 계산하므로 추출보다 훨씬 싸고, 정정공고에서 바뀌지 않은 페이지를 찾는 데 씁니다.
+    (같은 명령으로 참조하는 글꼴/이미지만 바뀐 경우는 구분하지 못함)
+    """
+    from pdfminer.pdftypes import resolve1
+
+    digest = hashlib.sha256(repr(page.bbox).encode())
+    for stream in page.page_obj.contents or []:
+        stream = resolve1(stream)
+        if hasattr(stream, "get_data"):
+            digest.update(stream.get_data())
+    return digest.hexdigest()[:32]
+
+
+def text_page_hash(text: str) -> str:
+    """텍스트 파일 페이지의 해시 (PDF 의 `page_content_hash` 에 대응)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class PageBatch:
+    """연속된 페이지 구간의 추출 결과"""
+
+    pages: list[str]
+    # 첫 페이지의 0-based 인덱스
+    start: int
+    total_pages: int
+    # 추출한 페이지별 `page_content_hash`
+    hashes: list[str] = field(default_factory=list)
+
+    @property
+    def end(self) -> int:
+        """다음에 추출할 페이지의 0-based 인덱스"""
+        return self.start + len(self.pages)
+
+    @property
+    def complete(self) -> bool:
+        return self.end >= self.total_pages
+
+
+def extract_pdf_page_range(
+    raw_bytes: bytes,
+    start: int = 0,
+    token_budget: int | None = None,
+    tables: bool = True,
+    check: Callable[[], None] | None = None,
+) -> PageBatch:
+    """
+    `start` 페이지부터 순서대로 추출하고, 추출한 텍스트의 추정 토큰 수가
+    `token_budget` 에 도달하면 멈춥니다. (최소 1페이지는 추출, None 이면 끝까지)
+    """
+    pdfplumber = load_pdfplumber()
+    extract = _extract_page_with_tables if tables else _extract_page_flat
+    pages_text: list[str] = []
+    hashes: list[str] = []
+    used_tokens = 0
+    with pdfplumber.open(io.BytesIO(raw_bytes)) as pdf:
+        total_pages = len(pdf.pages)
+        for page in pdf.pages[start:]:
+            if token_budget is not None and pages_text and used_tokens >= token_budget:
+                break
+            if check is not None:
+                check()
+            text = extract(page)
+            hashes.append(page_content_hash(page))
+            # 텍스트를 얻은 페이지의 레이아웃 객체 캐시는 바로 해제
+            page.close()
+            pages_text.append(text)
+            used_tokens += estimate_tokens(text)
+    return PageBatch(pages=pages_text, start=start, total_pages=total_pages, hashes=hashes)
+
+
+def pdf_page_hashes(
+    raw_bytes: bytes, check: Callable[[], None] | None = None
+) -> list[str]:
+    """모든 페이지의 `page_content_hash` (텍스트 추출 없이)"""
+    pdfplumber = load_pdfplumber()
+    hashes = []
+    with pdfplumber.open(io.BytesIO(raw_bytes)) as pdf:
+        for page in pdf.pages:
+            if check is not None:
+                check()
+            hashes.append(page_content_hash(page))
+            page.close()
+    return hashes
+
+
+def extract_pdf_pages_at(
+    raw_bytes: bytes,
+    indices: Iterable[int],
+    tables: bool = True,
+    check: Callable[[], None] | None = None,
+) -> dict[int, str]:
+    """지정한 0-based 페이지만 추출해 인덱스 → 텍스트로 반환합니다."""
+    pdfplumber = load_pdfplumber()
+    extract = _extract_page_with_tables if tables else _extract_page_flat
+    texts: dict[int, str] = {}
+    with pdfplumber.open(io.BytesIO(raw_bytes)) as pdf:
+        for index in sorted(set(indices)):
+            if check is not None:
+                check()
+            page = pdf.pages[index]
+            texts[index] = extract(page)
+            page.close()
+    return texts
+
+
+def extract_pdf_pages(
+    raw_bytes: bytes,
+    tables: bool = True,
+    check: Callable[[], None] | None = None,
+) -> list[str]:
+    """
+    PDF 바이트에서 페이지별 텍스트를 추출합니다.
+
+    Args:
+        raw_bytes: 업로드된 PDF 원본
+        tables: True 면 표를 구분자 행으로 따로 추출, False 면 기존처럼 평탄화된 텍스트
+        check: 페이지마다 호출하는 중단 확인 함수 (요청 취소 시 예외를 발생)
+
+    Returns:
+        페이지별 텍스트 목록 (1페이지부터)
+    """
+    return extract_pdf_page_range(raw_bytes, tables=tables, check=check).pages
@@ -0,0 +1,194 @@
+"""
+요청 단위 샘플링 프로파일러 (선택)
+
+운영 환경에서 특정 업로드만 느릴 때, 시간이 pdfplumber 레이아웃 분석, 프롬프트 조립,
+Pydantic 검증, 네트워크 대기 중 어디에 쓰였는지 확인하기 위한 도구입니다.
+
+- 켜는 방법: `X-Profile` 헤더에 `PROFILING_TOKEN` 값을 보내거나, `PROFILING_SAMPLE_RATE` 비율로 샘플링
+- 동작: 요청 처리 동안 별도 스레드가 `PROFILING_INTERVAL_MS` 간격으로 모든 스레드의 스택을 수집
+  (이벤트 루프 스레드 + PDF 파싱 워커 스레드)
+- 결과: `PROFILING_DIR` 에 collapsed-stack(`.folded`, flamegraph.pl / speedscope 호환) 또는
+  speedscope JSON 파일로 저장. 파일 이름에 라우트와 문서 ID 를 포함
+
+꺼져 있으면 요청마다 헤더 확인과 난수 비교만 하므로 오버헤드가 거의 없습니다.
+동시에 하나의 요청만 프로파일링합니다. (샘플러가 프로세스 전체 스레드를 보기 때문)
+"""
+import asyncio
+import contextvars
+import hmac
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.serialization import to_json_bytes
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+# 프로파일링 중인 요청의 태그 (라우트에서 tag_profile 로 문서 ID 등을 추가)
+_current_tags: contextvars.ContextVar[dict[str, str] | None] = contextvars.ContextVar(
+    "profile_tags", default=None
+)
+
+# 한 번에 하나의 프로파일만 수집
+_active = threading.Lock()
+
+_UNSAFE_CHARS_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def tag_profile(**tags: str) -> None:
+    """현재 요청을 프로파일링 중이면 결과 파일에 붙일 태그를 추가합니다. (아니면 아무 일도 하지 않음)"""
+    current = _current_tags.get()
+    if current is not None:
+        current.update({key: str(value) for key, value in tags.items()})
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", Path(code.co_filename).stem)
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+class SamplingProfiler:
+    """주기적으로 모든 스레드의 스택을 모아 (스택 → 샘플 수) 로 집계합니다."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(f"thread:{names.get(thread_id, thread_id)}")
+                stack.reverse()
+                self.samples[tuple(stack)] += 1
+
+    def collapsed(self) -> str:
+        """flamegraph.pl 의 collapsed-stack 형식 ("a;b;c 샘플수")"""
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in self.samples.most_common()
+        )
+
+    def speedscope(self, name: str) -> bytes:
+        """speedscope 의 sampled 프로파일 JSON"""
+        frame_index: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.samples.items():
+            samples.append([frame_index.setdefault(label, len(frame_index)) for label in stack])
+            weights.append(count * self.interval * 1000)
+        return to_json_bytes({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "docguide-ai-api",
+            "shared": {"frames": [{"name": label} for label in frame_index]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        })
+
+
+def _should_profile(scope) -> bool:
+    if settings.PROFILING_TOKEN:
+        for key, value in scope.get("headers", ()):
+            if key == PROFILE_HEADER:
+                # str 비교는 비 ASCII 문자에서 TypeError 를 내므로 바이트로 비교
+                return hmac.compare_digest(
+                    value, settings.PROFILING_TOKEN.encode("utf-8")
+                )
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def _write_profile(profiler: SamplingProfiler, route: str, tags: dict[str, str]) -> Path:
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    parts = [time.strftime("%Y%m%d-%H%M%S"), route.strip("/") or "root"]
+    parts += [value for _, value in sorted(tags.items())]
+    stem = _UNSAFE_CHARS_RE.sub("_", "_".join(parts))
+
+    if settings.PROFILING_FORMAT == "speedscope":
+        path = directory / f"{stem}.speedscope.json"
+        path.write_bytes(profiler.speedscope(stem))
+    else:
+        path = directory / f"{stem}.folded"
+        path.write_text(profiler.collapsed(), encoding="utf-8")
+    return path
+
+
+class ProfilingMiddleware:
+    """선택된 요청만 샘플링 프로파일링하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if not _active.acquire(blocking=False):
+            metrics.incr("profiling.skipped_busy")
+            await self.app(scope, receive, send)
+            return
+
+        tags: dict[str, str] = {}
+        token = _current_tags.set(tags)
+        profiler = SamplingProfiler(settings.PROFILING_INTERVAL_MS / 1000)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            _current_tags.reset(token)
+            _active.release()
+            try:
+                path = await asyncio.to_thread(
+                    _write_profile, profiler, scope["path"], tags
+                )
+                metrics.incr("profiling.written")
+                logger.info(
+                    "request profile written: %s (%.0fms, %d samples)",
+                    path, profiler.duration * 1000, sum(profiler.samples.values()),
+                )
+            except OSError as e:
+                logger.warning("request profile write failed: %s", e)
@@ -1,9 +1,10 @@
 """
 채팅 및 문서 분석용 프롬프트 관리
 """
-import json
 from typing import Dict, List
 
+from app.core.serialization import dumps
+
 
 # 채팅용 시스템 프롬프트
 CHAT_SYSTEM_PROMPT = """
@@ -35,6 +36,28 @@ A: "홈택스(www.hometax.go.kr)에서 납부하실 수 있습니다. 로그인
 """
 
 
+# 워크스페이스(여러 문서) 채팅용 시스템 프롬프트
+WORKSPACE_CHAT_SYSTEM_PROMPT = """
+당신은 한국 공공문서 해석을 돕는 친절한 AI 비서입니다.
+사용자는 여러 공공문서(공고문, 고지서 등)를 함께 비교하고 있습니다.
+
+답변 규칙:
+1. 친절하고 쉬운 말투 사용 (존댓말 필수)
+2. 문서를 언급할 때는 반드시 문서 번호와 제목으로 구분 (예: "[문서 2] 2025년 행복주택 공고")
+3. 여러 문서를 비교하는 질문이면 문서별로 한 줄씩 정리
+4. 아래 문서 정보와 발췌에 없는 내용은 추측하지 말고 "문서에서 확인할 수 없습니다"라고 답변
+5. 신청 가능 여부는 사용자가 알려준 조건과 문서의 자격 요건을 비교해 판단하고, 조건이 부족하면 무엇이 더 필요한지 안내
+
+문서 목록:
+{documents}
+
+질문과 관련된 문서 발췌:
+{passages}
+
+위 정보를 참고하여 사용자의 질문에 답변하세요.
+"""
+
+
 # 문서 유형별 추천 질문
 SUGGESTED_QUESTIONS: Dict[str, List[Dict[str, str]]] = {
     # 주택청약 공고 (옛 이름: housing_application_notice)
@@ -86,12 +109,15 @@ SUGGESTED_QUESTIONS: Dict[str, List[Dict[str, str]]] = {
 }
 
 
-def get_chat_prompt(doc_context: dict) -> str:
+def get_chat_prompt(
+    doc_context: dict, excerpts: list[tuple[int, str]] | None = None
+) -> str:
     """
     문서 컨텍스트를 포함한 채팅 시스템 프롬프트 생성
     
     Args:
         doc_context: 문서 분석 결과 딕셔너리
+        excerpts: 분석에 쓰지 않은 페이지 중 질문과 관련된 원문 발췌 (페이지 번호, 텍스트)
         
     Returns:
         문서 정보가 포함된 시스템 프롬프트
@@ -101,13 +127,48 @@ def get_chat_prompt(doc_context: dict) -> str:
 문서 유형: {doc_context.get('extracted', {}).get('docType', 'unknown')}
 문서 제목: {doc_context.get('extracted', {}).get('title', '제목 없음')}
 핵심 요약: {doc_context.get('summary', '')}
-추출 정보: {json.dumps(doc_context.get('extracted', {}), ensure_ascii=False, indent=2)}
-행동 안내: {json.dumps(doc_context.get('actions', []), ensure_ascii=False, indent=2)}
+추출 정보: {dumps(doc_context.get('extracted', {}), indent=2)}
+행동 안내: {dumps(doc_context.get('actions', []), indent=2)}
 """
+    if excerpts:
+        context_summary += "원문 발췌 (분석 이후 추가로 확인한 페이지):\n" + "\n\n".join(
+            f"[{page_no}쪽]\n{text}" for page_no, text in excerpts
+        )
     
     return CHAT_SYSTEM_PROMPT.format(doc_context=context_summary)
 
 
+def get_workspace_chat_prompt(
+    documents: list[dict], passages: list[tuple[int, int, str]]
+) -> str:
+    """
+    워크스페이스 채팅 시스템 프롬프트 생성
+
+    Args:
+        documents: 문서별 분석 결과 딕셔너리 (워크스페이스 순서)
+        passages: 관련 발췌 (문서 번호, 페이지 번호, 텍스트)
+
+    Returns:
+        문서 목록과 관련 발췌가 포함된 시스템 프롬프트
+    """
+    lines = []
+    for number, doc in enumerate(documents, 1):
+        extracted = doc.get("extracted", {})
+        lines.append(
+            f"[문서 {number}] {extracted.get('title') or '제목 없음'} "
+            f"(유형: {extracted.get('docType', 'unknown')}, "
+            f"마감: {extracted.get('deadline') or '미상'}, "
+            f"대상: {extracted.get('applicantType') or '미상'})\n"
+            f"요약: {doc.get('summary', '')}"
+        )
+    excerpt_text = "\n\n".join(
+        f"[문서 {number} / {page}쪽]\n{text}" for number, page, text in passages
+    ) or "(관련 발췌 없음)"
+    return WORKSPACE_CHAT_SYSTEM_PROMPT.format(
+        documents="\n\n".join(lines), passages=excerpt_text
+    )
+
+
 def get_suggested_questions(doc_type: str, limit: int = 5) -> List[Dict[str, str]]:
     """
     문서 유형에 맞는 추천 질문 반환
@@ -170,3 +231,29 @@ JobSupportUserProfile 필드 설명:
 - 소득/재산 정보가 null이면 "정확한 판정을 위해 소득 정보가 필요합니다"라고 안내
 """
 
+
+
+# LLM 응답 중 스키마 검증에 실패한 필드만 다시 물어보는 프롬프트
+FIELD_REPAIR_PROMPT = """
+당신은 JSON 데이터의 잘못된 필드 값만 고쳐 주는 도우미입니다.
+
+입력으로 검증에 실패한 필드 목록이 주어집니다. 각 항목은 다음 정보를 가집니다.
+- path: 점(.)으로 구분된 필드 경로 (예: "evidence.0.confidence")
+- message: 검증 오류 메시지
+- value: 현재 값
+- context: 해당 필드를 포함한 상위 객체
+
+각 path에 들어갈 올바른 값을 오류 메시지와 context를 참고해 추론하세요.
+
+반드시 아래 형식의 **JSON만** 출력하세요.
+
+{
+  "fixes": {
+    "<path>": <수정된 값>
+  }
+}
+
+주의:
+- 입력으로 주어진 path 이외의 필드는 절대 포함하지 마세요.
+- 값을 추론할 수 없으면 null 을 넣으세요.
+"""
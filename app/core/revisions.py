@@ -0,0 +1,107 @@
+"""
+정정공고 증분 재분석 도우미
+
+기관은 긴 주택 공고의 몇 페이지만 바꾼 정정공고를 자주 다시 올립니다. 새 업로드의 페이지 내용 해시가
+이전에 분석한 문서와 대부분 같으면, 바뀐 페이지만 추출해 이전 분석 결과와 함께 LLM 에 보내고
+결과를 병합합니다. 이 모듈은 LLM 호출을 제외한 병합/비교를 담당합니다.
+"""
+from app.core.text_normalize import NormalizedText
+from app.models.schemas import (
+    DeadlineChange,
+    DocAnalysisResult,
+    EvidenceItem,
+    FieldChange,
+)
+
+# 비교하는 추출 필드
+_COMPARED_FIELDS = ("docType", "title", "amount", "deadline", "authority", "applicantType")
+
+
+def _as_text(value: object) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def diff_fields(before: DocAnalysisResult, after: DocAnalysisResult) -> list[FieldChange]:
+    """`extracted` 필드 중 값이 바뀐 것 (새 판의 값만 담음)"""
+    changes = []
+    for name in _COMPARED_FIELDS:
+        old = _as_text(getattr(before.extracted, name))
+        new = _as_text(getattr(after.extracted, name))
+        if old != new:
+            changes.append(FieldChange(field=f"extracted.{name}", after=new))
+    return changes
+
+
+def diff_deadlines(
+    before: DocAnalysisResult, after: DocAnalysisResult
+) -> list[DeadlineChange]:
+    """
+    행동 항목 마감일 변경. 항목은 (유형, 라벨)로 짝짓고, 라벨이 바뀌었어도
+    양쪽에 같은 유형이 하나씩만 있으면 같은 항목으로 봅니다.
+    """
+    old_actions = {(a.type, a.label): a for a in before.actions}
+    new_actions = {(a.type, a.label): a for a in after.actions}
+    unmatched_old = [key for key in old_actions if key not in new_actions]
+    unmatched_new = [key for key in new_actions if key not in old_actions]
+
+    pairs = [(key, key) for key in old_actions if key in new_actions]
+    for action_type in {key[0] for key in unmatched_old}:
+        olds = [key for key in unmatched_old if key[0] == action_type]
+        news = [key for key in unmatched_new if key[0] == action_type]
+        if len(olds) == 1 and len(news) == 1:
+            pairs.append((olds[0], news[0]))
+            unmatched_old.remove(olds[0])
+            unmatched_new.remove(news[0])
+
+    changes = []
+    for old_key, new_key in pairs:
+        old, new = old_actions[old_key], new_actions[new_key]
+        if old.deadline != new.deadline:
+            changes.append(
+                DeadlineChange(change="changed", type=new.type, label=new.label, after=new.deadline)
+            )
+    for key in unmatched_old:
+        if old_actions[key].deadline is not None:
+            changes.append(DeadlineChange(change="removed", type=key[0]))
+    for key in unmatched_new:
+        if new_actions[key].deadline is not None:
+            changes.append(
+                DeadlineChange(
+                    change="added", type=key[0], label=key[1], after=new_actions[key].deadline
+                )
+            )
+    return changes
+
+
+def merge_evidence(
+    previous: DocAnalysisResult,
+    revised: DocAnalysisResult,
+    normalized: NormalizedText,
+    changed_pages: set[int],
+) -> list[EvidenceItem]:
+    """
+    LLM 이 새로 낸 근거에, 이전 판의 근거 중 바뀌지 않은 페이지에 그대로 남아 있는 문장을 더합니다.
+
+    페이지 번호는 새 판의 정규화 텍스트에서 다시 찾습니다. (페이지가 추가/삭제되어 밀린 경우 포함)
+    """
+    merged: list[EvidenceItem] = []
+    seen: set[tuple[str, str]] = set()
+    for item in revised.evidence:
+        page = normalized.locate_page(item.text)
+        if page is not None:
+            item.page = page
+        merged.append(item)
+        seen.add((item.field, item.text))
+    for item in previous.evidence:
+        if (item.field, item.text) in seen:
+            continue
+        page = normalized.locate_page(item.text)
+        if page is None or page in changed_pages:
+            continue
+        merged.append(item.model_copy(update={"page": page}))
+        seen.add((item.field, item.text))
+    return merged
@@ -0,0 +1,129 @@
+"""
+분할 병렬 문서 분석 (fan-out)
+
+한 번의 호출로 `summary` → `actions` → `extracted` → `evidence` → `uncertainty` 를 차례로 생성하면
+출력 토큰 생성 시간이 그대로 응답 시간이 됩니다. 서로 독립적인 섹션을 작은 호출 여러 개로 나눠
+동시에 보내고, 결과를 합쳐 하나의 `DocAnalysisResult` 로 검증합니다.
+
+- 모든 호출은 시스템 프롬프트 + 문서 본문 메시지를 그대로 공유하고 마지막 메시지로 섹션만 지정하므로,
+  OpenAI 프롬프트 캐시(1024 토큰 이상의 동일 접두사)를 같이 씁니다. 캐시 적중 토큰은
+  `usage.cached_prompt_tokens` 지표로 확인할 수 있습니다.
+- 입력 토큰은 섹션 수만큼 다시 청구되므로(캐시 적중분은 할인) 총 토큰은 늘고 응답 시간은 줄어듭니다.
+  단일 호출과의 비교는 `benchmarks/bench_endpoints.py --fanout both`.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Final
+
+from app.core.deadline import RequestBudget
+from app.core.json_repair import ReaskFn, loads_lenient, validate_llm_json
+from app.core.llm import get_client
+from app.core.metrics import metrics
+from app.core.serialization import dumps
+from app.models.schemas import DocAnalysisResult
+
+
+@dataclass(frozen=True)
+class AnalysisSection:
+    """한 번의 호출로 생성하는 `DocAnalysisResult` 키 묶음"""
+
+    name: str
+    keys: tuple[str, ...]
+    instruction: str
+    max_tokens: int
+
+
+ANALYSIS_SECTIONS: Final[tuple[AnalysisSection, ...]] = (
+    AnalysisSection(
+        name="summary",
+        keys=("summary", "actions"),
+        instruction="summary 작성 규칙을 지키고, actions 에는 문서가 요구하는 행동을 마감일과 함께 모두 적으세요.",
+        max_tokens=700,
+    ),
+    AnalysisSection(
+        name="fields",
+        keys=("extracted", "uncertainty"),
+        instruction="확실하지 않은 extracted 값은 null 또는 합리적인 추정으로 두고 uncertainty 에 이유를 적으세요.",
+        max_tokens=600,
+    ),
+    AnalysisSection(
+        name="evidence",
+        keys=("evidence",),
+        instruction="문서 유형, 금액, 마감일, 주관 기관, 신청 대상의 근거가 되는 문장을 문서에서 그대로 인용하세요.",
+        max_tokens=900,
+    ),
+)
+
+_SECTION_USER_PROMPT: Final[str] = """이번 응답에는 위 스키마 중 {keys} 키만 담은 JSON 객체를 출력하세요.
+나머지 키는 다른 요청에서 따로 만듭니다.
+{instruction}"""
+
+
+async def _complete_section(
+    section: AnalysisSection,
+    messages: list[dict[str, str]],
+    model: str,
+    budget: RequestBudget,
+    completion_kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    response = await get_client().chat.completions.create(
+        model=model,
+        max_tokens=section.max_tokens,
+        timeout=budget.remaining(),
+        messages=[
+            *messages,
+            {
+                "role": "user",
+                "content": _SECTION_USER_PROMPT.format(
+                    keys=", ".join(section.keys), instruction=section.instruction
+                ),
+            },
+        ],
+        **completion_kwargs,
+    )
+    content = response.choices[0].message.content
+    if not content:
+        raise ValueError(f"LLM 응답이 비어 있습니다. ({section.name})")
+    data = loads_lenient(content)
+    if not isinstance(data, dict):
+        raise ValueError(f"LLM 응답이 JSON 객체가 아닙니다. ({section.name})")
+    return {key: data[key] for key in section.keys if key in data}
+
+
+async def analyze_in_sections(
+    messages: list[dict[str, str]],
+    model: str,
+    budget: RequestBudget,
+    reask: ReaskFn | None = None,
+    cache_key: str | None = None,
+    sections: tuple[AnalysisSection, ...] = ANALYSIS_SECTIONS,
+    **completion_kwargs: Any,
+) -> DocAnalysisResult:
+    """
+    섹션별 호출을 동시에 보내고 결과를 합쳐 검증합니다.
+
+    `messages` 는 단일 호출과 같은 시스템 + 문서 메시지이며, 모든 섹션이 이를 공유 접두사로 씁니다.
+    `cache_key` 를 주면 같은 문서의 호출이 같은 캐시로 가도록 `prompt_cache_key` 로 보냅니다.
+    섹션 하나라도 실패하면 나머지 호출을 취소하고 예외를 그대로 올립니다.
+    """
+    if cache_key is not None:
+        completion_kwargs.setdefault("extra_body", {"prompt_cache_key": cache_key})
+    tasks = [
+        asyncio.ensure_future(
+            _complete_section(section, messages, model, budget, completion_kwargs)
+        )
+        for section in sections
+    ]
+    try:
+        parts = await budget.run(asyncio.gather(*tasks), stage="llm_sections")
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    metrics.incr("analyze.fanout.calls", len(sections))
+
+    merged: dict[str, Any] = {"id": ""}
+    for part in parts:
+        merged.update(part)
+    # 누락/잘못된 필드는 단일 호출과 같은 로컬 보정 → 필드 재질의 경로로 처리
+    return await validate_llm_json(DocAnalysisResult, dumps(merged), reask=reask)
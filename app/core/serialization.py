@@ -0,0 +1,58 @@
+"""
+공용 직렬화 계층
+
+- LLM 응답 문자열을 `json.loads` 없이 캐시된 `TypeAdapter` 로 바로 검증
+- 이미 검증된 모델은 FastAPI의 response_model 재검증을 건너뛰고 바로 응답
+- 앱 전체에서 pydantic-core(Rust) 기반 JSON 인코더 사용
+"""
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def get_adapter(tp: Any) -> TypeAdapter:
+    """타입별 `TypeAdapter` 를 한 번만 만들어 재사용합니다."""
+    return TypeAdapter(tp)
+
+
+def validate_json(tp: type[T], content: str | bytes) -> T:
+    """원본 JSON 문자열을 파이썬 dict 를 거치지 않고 바로 검증합니다."""
+    return get_adapter(tp).validate_json(content)
+
+
+def dumps(obj: Any, *, indent: int | None = None) -> str:
+    """
+    프롬프트 삽입용 JSON 문자열을 만듭니다.
+
+    `json.dumps(model.model_dump(), ensure_ascii=False)` 와 같은 결과를
+    중간 dict 생성 없이 pydantic-core 인코더로 만듭니다. (한글은 이스케이프하지 않음)
+    """
+    return to_json(obj, indent=indent, fallback=str).decode("utf-8")
+
+
+def to_json_bytes(obj: Any) -> bytes:
+    """응답 본문용 JSON 바이트 (FastJSONResponse 와 같은 인코더)"""
+    return to_json(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """pydantic-core 인코더로 렌더링하는 JSON 응답 (앱 기본 응답 클래스)"""
+
+    def render(self, content: Any) -> bytes:
+        return to_json_bytes(content)
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> FastJSONResponse:
+    """
+    이미 검증된 모델을 그대로 응답으로 감쌉니다.
+
+    엔드포인트가 `Response` 를 반환하면 FastAPI는 response_model 재검증과
+    `jsonable_encoder` 변환을 건너뜁니다. response_model 은 문서화 용도로만 남습니다.
+    """
+    return FastJSONResponse(model, status_code=status_code)
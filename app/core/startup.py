@@ -0,0 +1,99 @@
+"""
+콜드 스타트 프로파일링
+
+오토스케일 컨테이너에서 첫 요청까지 걸리는 시간을 줄이기 위해,
+모듈 import 와 초기화 단계별 소요 시간을 기록하고 리포트로 제공합니다.
+"""
+import importlib
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# app 패키지가 처음 import 된 시점 (프로세스 시작에 가장 가까운 측정 기준점)
+_T0 = time.perf_counter()
+
+
+@dataclass
+class StartupPhase:
+    name: str
+    started_ms: float
+    duration_ms: float
+
+
+@dataclass
+class StartupProfiler:
+    """import/초기화 단계별 소요 시간 기록기"""
+
+    phases: list[StartupPhase] = field(default_factory=list)
+    ready_ms: float | None = None
+    warmed_up_ms: float | None = None
+    first_healthy_ms: float | None = None
+
+    @staticmethod
+    def now_ms() -> float:
+        return (time.perf_counter() - _T0) * 1000
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self.now_ms()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                StartupPhase(name, started, self.now_ms() - started)
+            )
+
+    def import_module(self, module_name: str) -> ModuleType:
+        """모듈을 import 하면서 (처음 import 인 경우) 소요 시간을 기록합니다."""
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        with self.phase(f"import {module_name}"):
+            return importlib.import_module(module_name)
+
+    def mark_ready(self) -> None:
+        self.ready_ms = self.now_ms()
+
+    def mark_warmed_up(self) -> None:
+        self.warmed_up_ms = self.now_ms()
+        logger.info("startup report\n%s", self.format())
+
+    def mark_healthy(self) -> None:
+        if self.first_healthy_ms is None:
+            self.first_healthy_ms = self.now_ms()
+
+    def report(self) -> dict:
+        return {
+            "ready_ms": self.ready_ms,
+            "warmed_up_ms": self.warmed_up_ms,
+            "first_healthy_ms": self.first_healthy_ms,
+            "phases": [
+                {
+                    "name": p.name,
+                    "started_ms": round(p.started_ms, 1),
+                    "duration_ms": round(p.duration_ms, 1),
+                }
+                for p in self.phases
+            ],
+        }
+
+    def format(self) -> str:
+        lines = [f"{'phase':40} {'start':>9} {'ms':>9}"]
+        for p in sorted(self.phases, key=lambda p: p.started_ms):
+            lines.append(f"{p.name:40} {p.started_ms:9.1f} {p.duration_ms:9.1f}")
+        for label, value in (
+            ("ready", self.ready_ms),
+            ("warmed up", self.warmed_up_ms),
+            ("first healthy response", self.first_healthy_ms),
+        ):
+            if value is not None:
+                lines.append(f"{label:40} {value:9.1f}")
+        return "\n".join(lines)
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,225 @@
+"""
+추출 텍스트 정규화
+
+공공 공고문은 매 페이지마다 기관 머리글, 쪽번호("- 3 -"), 워터마크, 법적 고지문이 반복됩니다.
+LLM에 보내기 전에 이런 반복 요소를 제거해 입력 토큰과 지연 시간을 줄이고,
+evidence 의 페이지 번호를 복원할 수 있도록 페이지별 오프셋 맵을 유지합니다.
+"""
+import math
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+# 반복 줄로 판단하기 위한 최소 페이지 수 / 등장 비율
+_MIN_PAGES_FOR_REPEAT = 3
+_REPEAT_RATIO = 0.6
+
+# 머리글/꼬리글 영역으로 보는 페이지 앞뒤 줄 수
+_EDGE_LINES = 2
+
+# 숫자를 가리고 비교하는 머리글/꼬리글 줄 최대 길이
+_MAX_MASKED_LINE_LEN = 60
+
+# 중복 제거 대상이 되는 문단 최소 길이 (짧은 항목명 등은 유지)
+_MIN_DEDUP_PARAGRAPH_LEN = 20
+
+# 근거 문장 위치를 찾을 때 사용하는 앞부분 길이
+_LOCATE_PREFIX_LEN = 30
+
+# 머리글/꼬리글 영역에서 쪽번호만 있는 줄: "- 3 -", "3", "3 / 10", "3쪽", "Page 3 of 10"
+# (연도 "2025" 같은 네 자리 이상 숫자는 쪽번호로 보지 않음)
+_PAGE_NUMBER_RE = re.compile(
+    r"^(?:[-–—·\s]*\d{1,3}\s*(?:/\s*\d{1,3})?[-–—·\s]*|\d{1,3}\s*쪽|page\s*\d{1,3}(?:\s*of\s*\d{1,3})?)$",
+    re.IGNORECASE,
+)
+_SPACES_RE = re.compile(r"[ \t 　]+")
+_DIGITS_RE = re.compile(r"\d+")
+# 머리글/꼬리글 안의 쪽번호 표기: "3 / 10", "- 3 -", "3쪽", "3페이지", "Page 3", "p. 3"
+_PAGE_COUNTER_RE = re.compile(
+    r"\d+\s*(?:/|of)\s*\d+|[-–—]\s*\d+\s*[-–—]|\d+\s*(?:쪽|페이지)|(?:page|p\.)\s*\d+",
+    re.IGNORECASE,
+)
+# 금액/비율: "5,000,000", "500만원", "3천원", "1억", "30%"
+_AMOUNT_RE = re.compile(r"\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?\s*(?:원|만|천|억|%)")
+
+
+@dataclass
+class NormalizedText:
+    """정규화된 문서 텍스트와 페이지 오프셋 맵"""
+
+    text: str
+    # page_starts[i] = (i+1)페이지가 text 에서 시작하는 문자 위치
+    page_starts: list[int] = field(default_factory=list)
+    original_tokens: int = 0
+    normalized_tokens: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.normalized_tokens
+
+    @property
+    def reduction_ratio(self) -> float:
+        if not self.original_tokens:
+            return 0.0
+        return self.saved_tokens / self.original_tokens
+
+    def page_at(self, offset: int) -> int | None:
+        """텍스트 내 문자 위치가 속한 페이지 번호 (1부터 시작)"""
+        if not self.page_starts or offset < 0:
+            return None
+        return bisect_right(self.page_starts, offset)
+
+    def page_texts(self) -> list[str]:
+        """정규화 텍스트를 페이지별로 나눕니다. (내용이 모두 제거된 페이지는 빈 문자열)"""
+        ends = self.page_starts[1:] + [len(self.text)]
+        return [
+            self.text[start:end].strip()
+            for start, end in zip(self.page_starts, ends)
+        ]
+
+    def locate_page(self, snippet: str) -> int | None:
+        """근거 문장이 등장하는 페이지 번호를 찾습니다. 못 찾으면 None."""
+        needle = _SPACES_RE.sub(" ", snippet).strip()
+        if not needle:
+            return None
+        offset = self.text.find(needle)
+        if offset < 0 and len(needle) > _LOCATE_PREFIX_LEN:
+            # LLM이 근거 문장 뒷부분을 바꿔 쓰는 경우가 많아 앞부분으로 한 번 더 찾습니다.
+            offset = self.text.find(needle[:_LOCATE_PREFIX_LEN])
+        if offset < 0:
+            return None
+        return self.page_at(offset)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 입력 토큰 수를 근사합니다.
+
+    UTF-8 바이트 4개당 1토큰 정도로 계산합니다. (한글 1글자 ≈ 0.75토큰)
+    정규화 전후 비교용이므로 절대값보다 비율이 중요합니다.
+    """
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+
+def _is_protected(text: str) -> bool:
+    """표 행(`|` 셀)이나 금액이 있는 줄/문단은 반복되어도 지우지 않습니다."""
+    return "|" in text or _AMOUNT_RE.search(text) is not None
+
+
+def _line_keys(lines: list[str]) -> list[str]:
+    """
+    반복 여부 비교용 키를 만듭니다. (`keep:` 키는 반복 줄로 보지 않음)
+
+    머리글/꼬리글 영역(페이지 앞뒤 몇 줄)의 짧은 줄 중 "3 / 10 페이지"처럼 쪽번호 표기가 있는 줄만
+    숫자를 가리고 비교하고, 나머지는 완전히 같은 줄(기관 머리글, 워터마크 등)만 같은 줄로 봅니다.
+    여러 페이지에 걸친 표의 행이나 금액이 있는 줄은 비교하지 않습니다.
+    """
+    edge = _edge_indices(lines)
+    keys = []
+    for i, line in enumerate(lines):
+        if _is_protected(line):
+            keys.append(f"keep:{i}")
+        elif (
+            i in edge
+            and len(line) <= _MAX_MASKED_LINE_LEN
+            and _PAGE_COUNTER_RE.search(line)
+        ):
+            keys.append("edge:" + _DIGITS_RE.sub("#", line))
+        else:
+            keys.append("line:" + line)
+    return keys
+
+
+def _edge_indices(lines: list[str]) -> set[int]:
+    """페이지 앞뒤 `_EDGE_LINES` 개의 내용 있는 줄 위치 (머리글/꼬리글 영역)"""
+    content = [i for i, line in enumerate(lines) if line]
+    return set(content[:_EDGE_LINES]) | set(content[-_EDGE_LINES:])
+
+
+def _clean_lines(page: str) -> list[str]:
+    """
+    줄 안의 공백을 정리하고, 머리글/꼬리글 영역의 쪽번호만 있는 줄을 지웁니다.
+
+    본문 중간의 숫자만 있는 줄(표 셀 값, "3 / 10" 같은 비율 등)은 그대로 둡니다.
+    """
+    lines = [_SPACES_RE.sub(" ", raw).strip() for raw in page.splitlines()]
+    edge = _edge_indices(lines)
+    return [
+        line
+        for i, line in enumerate(lines)
+        if not (i in edge and _PAGE_NUMBER_RE.match(line))
+    ]
+
+
+def _repeated_line_keys(pages: list[list[str]]) -> set[str]:
+    if len(pages) < _MIN_PAGES_FOR_REPEAT:
+        return set()
+    counts: dict[str, int] = {}
+    for lines in pages:
+        keys = _line_keys(lines)
+        for key in {key for key, line in zip(keys, lines) if line}:
+            if not key.startswith("keep:"):
+                counts[key] = counts.get(key, 0) + 1
+    threshold = max(2, math.ceil(len(pages) * _REPEAT_RATIO))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def normalize_pages(pages: list[str]) -> NormalizedText:
+    """
+    페이지별 추출 텍스트를 정규화해 하나의 텍스트로 합칩니다.
+
+    - 머리글/꼬리글 영역의 쪽번호만 있는 줄 제거
+    - 여러 페이지에 반복되는 줄(머리글/꼬리글/워터마크)은 처음 한 번만 유지
+      (표 행과 금액이 있는 줄은 반복되어도 유지)
+    - 줄 안의 공백 연속은 하나로 축소, 빈 문단 제거
+    - 이미 나온 긴 문단(법적 고지문 등)은 다시 넣지 않음
+    """
+    original = "\n\n".join(pages).strip()
+    page_lines = [_clean_lines(page) for page in pages]
+    repeated = _repeated_line_keys(page_lines)
+
+    seen_repeated: set[str] = set()
+    seen_paragraphs: set[str] = set()
+    chunks: list[str] = []
+    page_starts: list[int] = []
+    offset = 0
+
+    for lines in page_lines:
+        kept: list[str] = []
+        for key, line in zip(_line_keys(lines), lines):
+            if line and key in repeated:
+                if key in seen_repeated:
+                    continue
+                seen_repeated.add(key)
+            kept.append(line)
+
+        paragraphs = []
+        for paragraph in re.split(r"\n\s*\n", "\n".join(kept)):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if len(paragraph) >= _MIN_DEDUP_PARAGRAPH_LEN and not _is_protected(paragraph):
+                if paragraph in seen_paragraphs:
+                    continue
+                seen_paragraphs.add(paragraph)
+            paragraphs.append(paragraph)
+
+        page_text = "\n\n".join(paragraphs)
+        if page_text:
+            if chunks:
+                offset += 2  # 페이지 구분자 "\n\n"
+            page_starts.append(offset)
+            chunks.append(page_text)
+            offset += len(page_text)
+        else:
+            # 내용이 모두 제거된 페이지는 구분자 없이 위치만 기록
+            page_starts.append(offset)
+
+    text = "\n\n".join(chunks)
+
+    return NormalizedText(
+        text=text,
+        page_starts=page_starts,
+        original_tokens=estimate_tokens(original),
+        normalized_tokens=estimate_tokens(text),
+    )
@@ -0,0 +1,479 @@
+"""
+클라이언트별 LLM 토큰 사용량 기록(ledger)과 분당 토큰 할당량
+
+한 클라이언트가 큰 PDF 를 연속으로 분석하면 OpenAI 계정의 분당 토큰 한도를 혼자 써 버려
+다른 사용자의 요청까지 업스트림 429 로 실패합니다. 요청 수가 아니라 실제 소비한 토큰을 기준으로
+클라이언트마다 분당 할당량을 두고, 넘긴 클라이언트는 업스트림을 호출하기 전에 429 로 거절합니다.
+
+- 클라이언트 식별: 서버가 발급한 `X-Client-Key`(`USAGE_CLIENT_KEYS`)로 인증된 클라이언트 이름, 없으면 접속 IP.
+  클라이언트가 스스로 정하는 `X-Client-Id` 헤더는 사용량 보고서의 라벨로만 쓰고 할당량에는 쓰지 않습니다.
+- 기록: `chat.completions.create` 응답의 `usage` 토큰과 지연 시간을 (클라이언트, 라우트, 모델, 분)
+  단위로 메모리에서 합산하고, `USAGE_FLUSH_INTERVAL_SECONDS` 마다 SQLite 에 누적 저장합니다.
+- 할당량: 최근 60초 동안 소비한 토큰이 `USAGE_CLIENT_TPM`(클라이언트별) 또는
+  `USAGE_DEFAULT_TPM` 이상이면 거절 (0 이면 제한 없음)
+- 요청을 시작한 뒤의 LLM 호출(재질의, 사전 생성 등)은 거절하지 않고 기록만 합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hmac
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.text_normalize import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+CLIENT_ID_HEADER = "x-client-id"
+CLIENT_KEY_HEADER = "x-client-key"
+
+# 라벨로 받을 `X-Client-Id` 헤더 값 최대 길이
+_CLIENT_LABEL_MAX_LENGTH = 64
+
+# 할당량 계산 구간 (초)
+_WINDOW_SECONDS = 60.0
+
+# 요청 문맥 밖(스크립트, 워밍업 등)의 호출을 기록할 클라이언트 ID
+SYSTEM_CLIENT = "system"
+
+# 현재 요청의 (클라이언트 ID, 라벨)과 라우트 템플릿. 백그라운드 태스크는 만들 때의 값을 물려받습니다.
+_usage_context: contextvars.ContextVar[tuple[str, str] | None] = contextvars.ContextVar(
+    "usage_context", default=None
+)
+_route_context: contextvars.ContextVar[str] = contextvars.ContextVar("route_context", default="-")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_usage (
+    client_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    route TEXT NOT NULL,
+    model TEXT NOT NULL,
+    minute INTEGER NOT NULL,
+    calls INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    latency_ms REAL NOT NULL,
+    PRIMARY KEY (client_id, label, route, model, minute)
+)
+"""
+
+_UPSERT = """
+INSERT INTO llm_usage
+    (client_id, label, route, model, minute, calls, prompt_tokens, completion_tokens, latency_ms)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (client_id, label, route, model, minute) DO UPDATE SET
+    calls = calls + excluded.calls,
+    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+    completion_tokens = completion_tokens + excluded.completion_tokens,
+    latency_ms = latency_ms + excluded.latency_ms
+"""
+
+_SELECT_SINCE = """
+SELECT client_id, label, route, model, SUM(calls), SUM(prompt_tokens),
+       SUM(completion_tokens), SUM(latency_ms)
+FROM llm_usage
+WHERE minute >= ? {client_filter}
+GROUP BY client_id, label, route, model
+"""
+
+
+def client_identity(request: Request) -> str:
+    """
+    할당량/사용량 기록에 쓰는 클라이언트 ID
+
+    `X-Client-Key` 가 `USAGE_CLIENT_KEYS` 에 등록된 키면 그 클라이언트 이름, 아니면 `ip:<접속 IP>`.
+    (리버스 프록시 뒤에서는 uvicorn `--proxy-headers` 로 실제 접속 IP 를 받아야 합니다.)
+    """
+    key = request.headers.get(CLIENT_KEY_HEADER, "").encode()
+    if key:
+        for client_key, client_id in settings.USAGE_CLIENT_KEYS.items():
+            if hmac.compare_digest(key, client_key.encode()):
+                return client_id
+    host = request.client.host if request.client is not None else "unknown"
+    return f"ip:{host}"
+
+
+def client_label(request: Request) -> str:
+    """클라이언트가 보낸 `X-Client-Id` 라벨 (보고서 구분용, 할당량과 무관)"""
+    return request.headers.get(CLIENT_ID_HEADER, "").strip()[:_CLIENT_LABEL_MAX_LENGTH]
+
+
+def current_client() -> tuple[str, str]:
+    """현재 문맥의 (클라이언트 ID, 라우트). 요청 밖이면 (`system`, `-`)."""
+    client_id, _ = _usage_context.get() or (SYSTEM_CLIENT, "")
+    return client_id, _route_context.get()
+
+
+async def bind_route(request: Request) -> None:
+    """
+    현재 요청의 라우트 템플릿(예: `/api/analyze/{doc_id}`)을 문맥에 저장하는 앱 전역 의존성
+
+    사용량 기록을 끈 상태에서도 헤징의 라우트별 지연 분포와 `llm.latency_ms.<라우트>` 지표가 라우트를 구분합니다.
+    """
+    route = getattr(request.scope.get("route"), "path", None)
+    if route is not None:
+        _route_context.set(route)
+
+
+class QuotaExceeded(Exception):
+    """클라이언트가 분당 토큰 할당량을 모두 사용함"""
+
+    def __init__(self, client_id: str, limit: int, retry_after: float):
+        super().__init__(f"token quota exceeded for {client_id}")
+        self.client_id = client_id
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+@dataclass
+class UsageTotals:
+    """(클라이언트, 라우트, 모델) 단위 합계"""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+
+    def add(self, other: "UsageTotals") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.latency_ms += other.latency_ms
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+# (클라이언트 ID, 라벨, 라우트, 모델, 분 단위 epoch)
+_BucketKey = tuple[str, str, str, str, int]
+
+
+class UsageLedger:
+    """
+    클라이언트별 토큰 사용량 집계기
+
+    기록은 락 안에서 딕셔너리 합산만 하므로 LLM 호출마다 비용이 거의 없고,
+    SQLite 쓰기는 `flush()` 에서 모아서 한 번에 합니다. (스레드에서 호출)
+    """
+
+    def __init__(self, db_path: str | None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # 아직 SQLite 에 쓰지 않은 분 단위 합계
+        self._pending: dict[_BucketKey, UsageTotals] = {}
+        # 할당량 계산용 최근 60초 (기록 시각, 토큰 수)
+        self._windows: dict[str, deque[tuple[float, int]]] = {}
+        self._last_eviction = time.time()
+        self._db_lock = threading.Lock()
+        self._schema_ready = False
+
+    # --- 기록 / 할당량 -------------------------------------------------
+
+    def record(
+        self,
+        client_id: str,
+        route: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        label: str = "",
+    ) -> None:
+        now = time.time()
+        key = (client_id, label, route, model, int(now // 60))
+        tokens = prompt_tokens + completion_tokens
+        with self._lock:
+            totals = self._pending.setdefault(key, UsageTotals())
+            totals.add(UsageTotals(1, prompt_tokens, completion_tokens, latency_ms))
+            window = self._windows.setdefault(client_id, deque())
+            window.append((now, tokens))
+            self._prune(window, now)
+            if now - self._last_eviction >= _WINDOW_SECONDS:
+                self._evict_idle_windows(now)
+        metrics.incr("usage.calls")
+        metrics.incr("usage.tokens", tokens)
+
+    @staticmethod
+    def _prune(window: deque[tuple[float, int]], now: float) -> None:
+        while window and window[0][0] <= now - _WINDOW_SECONDS:
+            window.popleft()
+
+    def _evict_idle_windows(self, now: float) -> None:
+        """최근 60초 기록이 없는 클라이언트의 구간을 버립니다. (락 안에서 호출)"""
+        for client_id in list(self._windows):
+            window = self._windows[client_id]
+            self._prune(window, now)
+            if not window:
+                del self._windows[client_id]
+        self._last_eviction = now
+
+    def tokens_last_minute(self, client_id: str) -> int:
+        now = time.time()
+        with self._lock:
+            window = self._windows.get(client_id)
+            if not window:
+                return 0
+            self._prune(window, now)
+            if not window:
+                del self._windows[client_id]
+                return 0
+            return sum(tokens for _, tokens in window)
+
+    @staticmethod
+    def limit_for(client_id: str) -> int:
+        """클라이언트의 분당 토큰 할당량 (0 이면 제한 없음)"""
+        return settings.USAGE_CLIENT_TPM.get(client_id, settings.USAGE_DEFAULT_TPM)
+
+    def check_quota(self, client_id: str) -> None:
+        """최근 60초 사용량이 할당량 이상이면 `QuotaExceeded` 를 발생시킵니다."""
+        limit = self.limit_for(client_id)
+        if limit <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            window = self._windows.get(client_id)
+            if not window:
+                return
+            self._prune(window, now)
+            used = sum(tokens for _, tokens in window)
+            if used < limit:
+                return
+            # 오래된 기록부터 빠져나가 할당량 아래로 내려가는 시점
+            retry_after = _WINDOW_SECONDS
+            for recorded_at, tokens in window:
+                used -= tokens
+                if used < limit:
+                    retry_after = recorded_at + _WINDOW_SECONDS - now
+                    break
+        metrics.incr("usage.quota_rejected")
+        raise QuotaExceeded(client_id, limit, max(retry_after, 0.0))
+
+    # --- SQLite 저장 ---------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        if not self._schema_ready:
+            conn.execute(_SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def flush(self) -> int:
+        """메모리의 합계를 SQLite 에 누적 저장하고 저장한 행 수를 반환합니다. (스레드에서 호출)"""
+        with self._lock:
+            self._evict_idle_windows(time.time())
+            if not self.db_path:
+                return 0
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = [
+            (*key, t.calls, t.prompt_tokens, t.completion_tokens, t.latency_ms)
+            for key, t in pending.items()
+        ]
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany(_UPSERT, rows)
+                finally:
+                    conn.close()
+        except sqlite3.Error:
+            # 저장에 실패한 합계는 다음 주기에 다시 시도
+            with self._lock:
+                for key, totals in pending.items():
+                    self._pending.setdefault(key, UsageTotals()).add(totals)
+            raise
+        return len(rows)
+
+    def totals_since(
+        self, since: float, client_id: str | None = None
+    ) -> dict[tuple[str, str, str, str], UsageTotals]:
+        """
+        `since`(epoch 초) 이후의 (클라이언트, 라벨, 라우트, 모델)별 합계.
+
+        SQLite 에 저장된 값과 아직 저장하지 않은 메모리 값을 합칩니다. (분 단위 정밀도, 스레드에서 호출)
+        """
+        since_minute = int(since // 60)
+        result: dict[tuple[str, str, str, str], UsageTotals] = {}
+
+        if self.db_path:
+            query = _SELECT_SINCE.format(
+                client_filter="AND client_id = ?" if client_id is not None else ""
+            )
+            params: tuple[Any, ...] = (since_minute,)
+            if client_id is not None:
+                params += (client_id,)
+            with self._db_lock:
+                conn = self._connect()
+                try:
+                    db_rows = conn.execute(query, params).fetchall()
+                finally:
+                    conn.close()
+            for cid, label, route, model, calls, prompt, completion, latency in db_rows:
+                result[(cid, label, route, model)] = UsageTotals(
+                    calls, prompt, completion, latency
+                )
+
+        with self._lock:
+            pending = list(self._pending.items())
+        for (cid, label, route, model, minute), totals in pending:
+            if minute < since_minute or (client_id is not None and cid != client_id):
+                continue
+            result.setdefault((cid, label, route, model), UsageTotals()).add(totals)
+        return result
+
+    async def run_flush_loop(self) -> None:
+        """`USAGE_FLUSH_INTERVAL_SECONDS` 마다 합계를 SQLite 에 저장합니다."""
+        while True:
+            await asyncio.sleep(settings.USAGE_FLUSH_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                metrics.incr("usage.flush_failed")
+                logger.warning("usage ledger flush failed: %s", e)
+
+
+usage_ledger = UsageLedger(settings.USAGE_DB_PATH or None)
+
+_flush_task: asyncio.Task | None = None
+
+
+def start_usage_flush() -> None:
+    """앱 시작 시 주기적 저장 태스크를 시작합니다."""
+    global _flush_task
+    if settings.USAGE_TRACKING and usage_ledger.db_path and _flush_task is None:
+        _flush_task = asyncio.create_task(usage_ledger.run_flush_loop())
+
+
+async def stop_usage_flush() -> None:
+    """앱 종료 시 저장 태스크를 멈추고 남은 합계를 저장합니다."""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        await asyncio.gather(_flush_task, return_exceptions=True)
+        _flush_task = None
+    try:
+        await asyncio.to_thread(usage_ledger.flush)
+    except Exception as e:
+        logger.warning("usage ledger flush failed: %s", e)
+
+
+async def usage_quota(request: Request) -> str:
+    """
+    클라이언트 식별 + 분당 토큰 할당량 확인 의존성 (LLM 을 호출하는 라우트용)
+
+    현재 요청의 클라이언트/라우트를 이후 LLM 호출 기록에 쓰도록 문맥에 저장하고,
+    할당량을 넘긴 클라이언트는 파일 파싱이나 업스트림 호출 전에 429 로 거절합니다.
+    """
+    client_id = client_identity(request)
+    if not settings.USAGE_TRACKING:
+        return client_id
+    _usage_context.set((client_id, client_label(request)))
+    try:
+        usage_ledger.check_quota(client_id)
+    except QuotaExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"분당 토큰 사용량 한도({e.limit:,} 토큰)를 초과했습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        ) from e
+    return client_id
+
+
+def _usage_tokens(response: Any, messages: list[dict[str, Any]]) -> tuple[int, int]:
+    """응답의 `usage` 토큰. 없으면(테스트 더블 등) 글자 수로 추정합니다."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        return usage.prompt_tokens or 0, usage.completion_tokens or 0
+    prompt = sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+    completion = sum(
+        estimate_tokens(choice.message.content or "")
+        for choice in getattr(response, "choices", [])
+    )
+    return prompt, completion
+
+
+class _UsageCompletions:
+    def __init__(self, inner: Any):
+        self._inner = inner
+
+    async def create(self, **kwargs: Any) -> Any:
+        client_id, label = _usage_context.get() or (SYSTEM_CLIENT, "")
+        route = _route_context.get()
+        started = time.perf_counter()
+        try:
+            response = await self._inner.create(**kwargs)
+        except asyncio.CancelledError:
+            # 헤징에서 진 요청/취소된 요청도 업스트림은 이미 처리 중이므로 보수적으로 추정해 기록
+            # (입력 토큰 추정 + max_tokens)
+            prompt_tokens = sum(
+                estimate_tokens(str(m.get("content") or "")) for m in kwargs["messages"]
+            )
+            usage_ledger.record(
+                client_id,
+                route,
+                kwargs["model"],
+                prompt_tokens,
+                kwargs.get("max_tokens") or 0,
+                (time.perf_counter() - started) * 1000,
+                label=label,
+            )
+            metrics.incr("usage.estimated_calls")
+            raise
+        latency_ms = (time.perf_counter() - started) * 1000
+        prompt_tokens, completion_tokens = _usage_tokens(response, kwargs["messages"])
+        usage_ledger.record(
+            client_id,
+            route,
+            kwargs["model"],
+            prompt_tokens,
+            completion_tokens,
+            latency_ms,
+            label=label,
+        )
+        # 프롬프트 캐시 적중 토큰 (공유 접두사를 쓰는 호출의 캐시 효과 확인용)
+        details = getattr(getattr(response, "usage", None), "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        if cached_tokens:
+            metrics.incr("usage.cached_prompt_tokens", cached_tokens)
+        return response
+
+
+class UsageTrackingClient:
+    """`chat.completions.create` 의 토큰 사용량을 현재 클라이언트 앞으로 기록하는 래퍼"""
+
+    def __init__(self, inner: Any):
+        self.inner = inner
+        self.chat = type("Chat", (), {"completions": _UsageCompletions(inner.chat.completions)})()
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+_wrapped: UsageTrackingClient | None = None
+_wrapped_lock = threading.Lock()
+
+
+def track_usage(inner: Any) -> UsageTrackingClient:
+    """클라이언트를 사용량 기록 래퍼로 감쌉니다. (같은 클라이언트면 재사용)"""
+    global _wrapped
+    with _wrapped_lock:
+        if _wrapped is None or _wrapped.inner is not inner:
+            _wrapped = UsageTrackingClient(inner)
+        return _wrapped
@@ -0,0 +1,331 @@
+"""
+여러 문서를 함께 보는 워크스페이스와 문서 간 공유 검색 색인
+
+같은 시기의 주택 공고 여러 개처럼 문서를 비교하는 질문("이 중 어디에 신청할 수 있나요?")은
+한 문서의 `doc_context` 만으로 답할 수 없습니다. 워크스페이스는 분석된 문서 ID 묶음과,
+그 문서들의 페이지 텍스트를 문단 단위로 나눈 역색인을 가집니다.
+
+- 문서를 추가/제거할 때 해당 문서의 문단만 색인에 더하거나 빼는 증분 색인
+- 질문마다 BM25 점수로 문서별 상위 문단만 골라 토큰 예산 안에서 프롬프트에 넣으므로,
+  문서가 늘어도 프롬프트 크기는 일정하게 유지됩니다.
+- 워크스페이스마다 문서 수와 색인 크기를, 저장소 전체로는 색인 크기 합계를 제한합니다.
+"""
+import math
+import re
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.page_source import keywords, text_nbytes
+from app.core.text_normalize import estimate_tokens
+from app.models.schemas import DocAnalysisResult
+
+# 문단을 합쳐 만드는 검색 단위 최대 길이 (문자)
+_PASSAGE_MAX_CHARS = 600
+
+# BM25 파라미터
+_K1 = 1.2
+_B = 0.75
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+
+
+def _terms(text: str) -> list[str]:
+    """색인/질의 공통 용어: 조사를 뗀 단어 + 3글자 이상 단어의 글자 bigram (복합어 부분 일치용)"""
+    terms = []
+    for word in keywords(text):
+        terms.append(word)
+        if len(word) >= 3:
+            terms.extend(f"#{word[i:i + 2]}" for i in range(len(word) - 1))
+    return terms
+
+
+def split_passages(text: str) -> list[str]:
+    """페이지 텍스트를 문단 경계 기준으로 최대 길이 이하의 검색 단위로 나눕니다."""
+    passages: list[str] = []
+    current = ""
+    for paragraph in _PARAGRAPH_SPLIT_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > _PASSAGE_MAX_CHARS:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+        while len(current) > _PASSAGE_MAX_CHARS:
+            passages.append(current[:_PASSAGE_MAX_CHARS])
+            current = current[_PASSAGE_MAX_CHARS:]
+    if current:
+        passages.append(current)
+    return passages
+
+
+class WorkspaceFull(Exception):
+    """워크스페이스의 문서 수 또는 색인 크기 제한을 넘음"""
+
+
+@dataclass
+class Passage:
+    doc_id: str
+    page: int
+    text: str
+    term_counts: Counter[str]
+    length: int
+
+    @property
+    def nbytes(self) -> int:
+        return text_nbytes((self.text,))
+
+
+def build_passages(doc_id: str, pages: list[tuple[int, str]]) -> list[Passage]:
+    """문서의 (페이지 번호, 텍스트) 목록을 색인할 문단으로 나눕니다. (잠금 밖에서 호출)"""
+    passages = []
+    for page_no, text in pages:
+        for chunk in split_passages(text):
+            counts = Counter(_terms(chunk))
+            if counts:
+                passages.append(Passage(doc_id, page_no, chunk, counts, sum(counts.values())))
+    return passages
+
+
+@dataclass
+class ScoredPassage:
+    passage: Passage
+    score: float
+
+
+class PassageIndex:
+    """문서 단위로 증분 추가/제거할 수 있는 문단 역색인 (BM25)"""
+
+    def __init__(self) -> None:
+        self._passages: dict[int, Passage] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._by_doc: dict[str, list[int]] = {}
+        self._next_id = 0
+        self._total_length = 0
+        self._doc_bytes: dict[str, int] = {}
+        self.nbytes = 0  # 색인한 문단 텍스트의 대략적인 메모리 크기
+
+    def __len__(self) -> int:
+        return len(self._passages)
+
+    def add_document(self, doc_id: str, pages: list[tuple[int, str]]) -> int:
+        """문서의 (페이지 번호, 텍스트) 목록을 색인합니다. 같은 문서가 있으면 교체."""
+        return self.add_passages(doc_id, build_passages(doc_id, pages))
+
+    def add_passages(self, doc_id: str, passages: list[Passage]) -> int:
+        """`build_passages` 로 나눈 문단을 색인합니다. 같은 문서가 있으면 교체."""
+        self.remove_document(doc_id)
+        ids = []
+        for passage in passages:
+            passage_id = self._next_id
+            self._next_id += 1
+            self._passages[passage_id] = passage
+            self._total_length += passage.length
+            for term in passage.term_counts:
+                self._postings.setdefault(term, set()).add(passage_id)
+            ids.append(passage_id)
+        self._by_doc[doc_id] = ids
+        self._doc_bytes[doc_id] = sum(passage.nbytes for passage in passages)
+        self.nbytes += self._doc_bytes[doc_id]
+        return len(ids)
+
+    def passage_count(self, doc_id: str) -> int:
+        return len(self._by_doc.get(doc_id, ()))
+
+    def document_nbytes(self, doc_id: str) -> int:
+        return self._doc_bytes.get(doc_id, 0)
+
+    def remove_document(self, doc_id: str) -> None:
+        self.nbytes -= self._doc_bytes.pop(doc_id, 0)
+        for passage_id in self._by_doc.pop(doc_id, []):
+            passage = self._passages.pop(passage_id)
+            self._total_length -= passage.length
+            for term in passage.term_counts:
+                ids = self._postings.get(term)
+                if ids is not None:
+                    ids.discard(passage_id)
+                    if not ids:
+                        del self._postings[term]
+
+    def search(self, query: str) -> list[ScoredPassage]:
+        """질의와 관련 있는 문단을 점수 높은 순으로 반환합니다."""
+        terms = set(_terms(query))
+        if not terms or not self._passages:
+            return []
+        total = len(self._passages)
+        avg_length = self._total_length / total
+        scores: dict[int, float] = {}
+        for term in terms:
+            ids = self._postings.get(term)
+            if not ids:
+                continue
+            idf = math.log(1 + (total - len(ids) + 0.5) / (len(ids) + 0.5))
+            for passage_id in ids:
+                passage = self._passages[passage_id]
+                tf = passage.term_counts[term]
+                norm = tf * (_K1 + 1) / (
+                    tf + _K1 * (1 - _B + _B * passage.length / avg_length)
+                )
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * norm
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        return [ScoredPassage(self._passages[pid], score) for pid, score in ranked]
+
+
+@dataclass
+class Workspace:
+    """분석된 문서 묶음 + 공유 검색 색인"""
+
+    id: str
+    # 문서 ID → 추가 시점의 분석 결과 (문서 저장소에서 밀려나도 워크스페이스는 유지)
+    documents: OrderedDict[str, DocAnalysisResult] = field(default_factory=OrderedDict)
+    index: PassageIndex = field(default_factory=PassageIndex)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # 문서 수 / 색인 크기(바이트) 제한 (None 이면 제한 없음)
+    max_documents: int | None = None
+    max_bytes: int | None = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.index.nbytes
+
+    def add(self, result: DocAnalysisResult, pages: list[tuple[int, str]]) -> int:
+        """
+        문서를 색인에 추가합니다. (같은 문서면 교체)
+
+        제한 확인과 추가를 한 잠금 안에서 하므로 동시에 추가해도 제한을 넘지 않으며,
+        넘으면 `WorkspaceFull` 을 발생시킵니다.
+        """
+        passages = build_passages(result.id, pages)
+        size = sum(passage.nbytes for passage in passages)
+        with self.lock:
+            replacing = result.id in self.documents
+            if (
+                not replacing
+                and self.max_documents is not None
+                and len(self.documents) >= self.max_documents
+            ):
+                raise WorkspaceFull(
+                    f"워크스페이스에는 문서를 최대 {self.max_documents}개까지 추가할 수 있습니다."
+                )
+            if self.max_bytes is not None and (
+                self.index.nbytes - self.index.document_nbytes(result.id) + size
+                > self.max_bytes
+            ):
+                raise WorkspaceFull(
+                    f"워크스페이스 색인 크기 한도({self.max_bytes // (1024 * 1024)}MB)를 넘어 문서를 추가할 수 없습니다."
+                )
+            self.documents[result.id] = result
+            return self.index.add_passages(result.id, passages)
+
+    def remove(self, doc_id: str) -> bool:
+        with self.lock:
+            if self.documents.pop(doc_id, None) is None:
+                return False
+            self.index.remove_document(doc_id)
+            return True
+
+    def retrieve(
+        self,
+        query: str,
+        token_budget: int,
+        per_document: int,
+    ) -> list[Passage]:
+        """
+        문서마다 상위 `per_document` 개 문단까지, 전체 `token_budget` 안에서 관련 문단을 고릅니다.
+
+        점수가 높은 문단부터 채우되 한 문서가 예산을 독차지하지 않도록 문서별 개수를 제한합니다.
+        """
+        with self.lock:
+            ranked = self.index.search(query)
+        selected: list[Passage] = []
+        per_doc: Counter[str] = Counter()
+        used = 0
+        for item in ranked:
+            passage = item.passage
+            if per_doc[passage.doc_id] >= per_document:
+                continue
+            tokens = estimate_tokens(passage.text)
+            if used + tokens > token_budget:
+                continue
+            selected.append(passage)
+            per_doc[passage.doc_id] += 1
+            used += tokens
+        # 프롬프트에서는 문서 순서 → 페이지 순서로 배치
+        order = {doc_id: i for i, doc_id in enumerate(self.documents)}
+        return sorted(selected, key=lambda p: (order.get(p.doc_id, 0), p.page))
+
+
+class WorkspaceStore:
+    """워크스페이스 ID → 워크스페이스 LRU 저장소 (스레드 안전)"""
+
+    def __init__(
+        self,
+        max_items: int,
+        max_documents: int | None = None,
+        max_bytes_per_workspace: int | None = None,
+        max_total_bytes: int | None = None,
+    ):
+        self._max_items = max_items
+        self._max_documents = max_documents
+        self._max_bytes_per_workspace = max_bytes_per_workspace
+        self._max_total_bytes = max_total_bytes
+        self._items: OrderedDict[str, Workspace] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self) -> Workspace:
+        workspace = Workspace(
+            id="ws-" + uuid.uuid4().hex[:16],
+            max_documents=self._max_documents,
+            max_bytes=self._max_bytes_per_workspace,
+        )
+        with self._lock:
+            self._items[workspace.id] = workspace
+            while len(self._items) > self._max_items:
+                self._items.popitem(last=False)
+        return workspace
+
+    def trim(self, keep: str | None = None) -> None:
+        """
+        색인 크기 합계가 제한을 넘는 동안 오래 쓰이지 않은 워크스페이스부터 버립니다.
+
+        문서를 추가한 뒤 호출하며, 방금 쓴 워크스페이스(`keep`)는 버리지 않습니다.
+        """
+        if self._max_total_bytes is None:
+            return
+        with self._lock:
+            total = sum(workspace.nbytes for workspace in self._items.values())
+            for workspace_id in list(self._items):
+                if total <= self._max_total_bytes:
+                    break
+                if workspace_id == keep:
+                    continue
+                total -= self._items.pop(workspace_id).nbytes
+                metrics.incr("workspace.evicted")
+
+    def nbytes(self) -> int:
+        """저장된 워크스페이스 색인 크기 합계"""
+        with self._lock:
+            return sum(workspace.nbytes for workspace in self._items.values())
+
+    def get(self, workspace_id: str) -> Workspace | None:
+        with self._lock:
+            workspace = self._items.get(workspace_id)
+            if workspace is not None:
+                self._items.move_to_end(workspace_id)
+            return workspace
+
+    def delete(self, workspace_id: str) -> bool:
+        with self._lock:
+            return self._items.pop(workspace_id, None) is not None
+
+
+workspace_store = WorkspaceStore(
+    settings.WORKSPACE_MAX_ITEMS,
+    max_documents=settings.WORKSPACE_MAX_DOCUMENTS,
+    max_bytes_per_workspace=settings.WORKSPACE_MAX_MB * 1024 * 1024,
+    max_total_bytes=settings.WORKSPACE_STORE_MAX_MB * 1024 * 1024,
+)
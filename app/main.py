@@ -1,12 +1,72 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.core.startup import startup_profiler
+
+with startup_profiler.phase("import fastapi"):
+    from fastapi import Depends, FastAPI, Request, Response, status
+    from fastapi.middleware.cors import CORSMiddleware
+
+with startup_profiler.phase("import app.api.routes"):
+    from app.api.routes import analyze, chat, usage, workspace
+
+from app.core import llm
+from app.core.answer_cache import answer_cache
+from app.core.answers import cancel_precompute
+from app.core.config import settings
+from app.core.deadline import RequestCancelled
+from app.core.doc_store import doc_store
+from app.core.memory import MemoryTrackingMiddleware
+from app.core.metrics import metrics
+from app.core.pdf_extract import load_pdfplumber
+from app.core.profiling import ProfilingMiddleware
+from app.core.serialization import FastJSONResponse
+from app.core.usage import bind_route, start_usage_flush, stop_usage_flush
+from app.core.workspace import workspace_store
+
+
+def _import_heavy_modules() -> None:
+    llm.init_client()
+    load_pdfplumber()
+
+
+async def _warm_up() -> None:
+    """무거운 의존성 import 와 업스트림 연결을 첫 요청 전에 미리 처리합니다."""
+    await asyncio.to_thread(_import_heavy_modules)
+    await llm.warm_up_connection()
+    startup_profiler.mark_warmed_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # OpenAI 클라이언트는 앱 전체에서 한 번만 생성합니다.
+    # 워밍업을 켜면 openai import 와 함께 백그라운드에서 만들어 헬스 체크가 바로 응답하고,
+    # 끄면 첫 LLM 호출(`llm.get_client`)에서 만듭니다.
+    warm_up_task = None
+    if settings.WARMUP_ON_STARTUP:
+        warm_up_task = asyncio.create_task(_warm_up())
+    # 클라이언트별 토큰 사용량을 주기적으로 SQLite 에 저장
+    start_usage_flush()
+
+    startup_profiler.mark_ready()
+    yield
+
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    await cancel_precompute()
+    await analyze.cancel_uncertainty_followups()
+    await stop_usage_flush()
+    await llm.close_client()
 
-from app.api.routes import analyze, chat
 
 app = FastAPI(
     title="DocGuide AI API",
     description="공공문서 분석을 위한 AI API 서버",
     version="0.1.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+    # LLM 호출 지표/헤징/사용량 기록에 쓰는 라우트 템플릿을 요청 문맥에 저장
+    dependencies=[Depends(bind_route)],
 )
 
 # CORS 설정 - 개발 환경: Next.js 프론트엔드 허용
@@ -19,11 +79,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# 요청별 최대 RSS 를 라우트별로 기록
+app.add_middleware(MemoryTrackingMiddleware)
+
+# 선택된 요청만 샘플링 프로파일링 (X-Profile 헤더 또는 샘플링 비율, 기본 비활성)
+app.add_middleware(ProfilingMiddleware)
+
+# 클라이언트가 떠난 요청은 응답을 받을 대상이 없으므로 본문 없이 499,
+# 처리 시간 예산을 넘긴 요청은 504 로 응답합니다.
+@app.exception_handler(RequestCancelled)
+async def request_cancelled_handler(request: Request, exc: RequestCancelled):
+    if exc.reason == "disconnect":
+        return Response(status_code=499)
+    return FastJSONResponse(
+        {"detail": "요청 처리 시간이 초과되었습니다."},
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+    )
+
+
 # 라우터 등록
 app.include_router(analyze.router, prefix="/api", tags=["analyze"])
 app.include_router(chat.router, prefix="/api", tags=["chat"])
+app.include_router(workspace.router, prefix="/api", tags=["workspace"])
+app.include_router(usage.router, prefix="/api", tags=["usage"])
 
 
 @app.get("/")
@@ -33,5 +114,24 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    startup_profiler.mark_healthy()
     return {"status": "ok"}
 
+
+@app.get("/health/startup")
+async def startup_report():
+    """import/초기화 단계별 소요 시간과 첫 헬스 체크 응답 시점 (ms, 프로세스 기준)"""
+    return startup_profiler.report()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """요청 취소 수, 캐시 적중률, 라우트별 최대 RSS 분포 등 프로세스 내 운영 지표"""
+    return {
+        **metrics.snapshot(),
+        "answer_cache.hit_rate": round(answer_cache.hit_rate(), 4),
+        "doc_store.items": len(doc_store),
+        "doc_store.bytes": doc_store.nbytes(),
+        "workspace.bytes": workspace_store.nbytes(),
+        **metrics.summaries(),
+    }
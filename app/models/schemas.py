@@ -44,6 +44,56 @@ class UncertaintyItem(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="신뢰도 (0.0 ~ 1.0)")
 
 
+class PageCoverage(BaseModel):
+    """분석에 사용한 페이지 범위"""
+
+    analyzed_pages: int = Field(..., description="분석에 사용한 앞쪽 페이지 수 (1페이지부터)")
+    total_pages: int = Field(..., description="문서 전체 페이지 수")
+    extra_pages: list[int] = Field(
+        default_factory=list, description="불확실 항목 보완에 추가로 사용한 페이지 번호"
+    )
+    complete: bool = Field(..., description="전체 페이지를 분석에 사용했는지 여부")
+
+
+class FieldChange(BaseModel):
+    """
+    이전 판 대비 바뀐 추출 필드
+
+    이전 판의 값은 담지 않습니다. (필요하면 `previous_id` 로 이전 분석 결과를 조회)
+    """
+
+    field: str = Field(..., description="필드 경로 (예: extracted.deadline)")
+    after: Optional[str] = Field(None, description="새 판의 값")
+
+
+class DeadlineChange(BaseModel):
+    """이전 판 대비 바뀐 행동 항목 마감일 (추가/삭제된 항목 포함, 이전 판의 값은 담지 않음)"""
+
+    change: Literal["changed", "added", "removed"] = Field(..., description="변경 종류")
+    type: ActionType = Field(..., description="행동 유형")
+    label: Optional[str] = Field(None, description="새 판의 행동 라벨 (삭제된 항목은 null)")
+    after: Optional[str] = Field(None, description="새 판의 마감일")
+
+
+class RevisionInfo(BaseModel):
+    """정정공고 증분 재분석 정보"""
+
+    previous_id: str = Field(..., description="비교 기준이 된 이전 판의 분석 결과 ID")
+    changed_pages: list[int] = Field(
+        default_factory=list, description="새로 추출/분석한 페이지 번호 (새 판 기준)"
+    )
+    removed_pages: list[int] = Field(
+        default_factory=list, description="새 판에 없는 이전 판 페이지 번호"
+    )
+    reused_pages: int = Field(..., description="이전 판에서 재사용한 페이지 수")
+    field_changes: list[FieldChange] = Field(
+        default_factory=list, description="바뀐 추출 필드"
+    )
+    deadline_changes: list[DeadlineChange] = Field(
+        default_factory=list, description="바뀐 행동 항목 마감일"
+    )
+
+
 class DocAnalysisResult(BaseModel):
     """문서 분석 결과"""
     
@@ -53,6 +103,10 @@ class DocAnalysisResult(BaseModel):
     extracted: ExtractedFields = Field(..., description="추출된 필드")
     evidence: list[EvidenceItem] = Field(default_factory=list, description="근거 항목 목록")
     uncertainty: list[UncertaintyItem] = Field(default_factory=list, description="불확실한 항목 목록")
+    coverage: Optional[PageCoverage] = Field(None, description="분석에 사용한 페이지 범위")
+    revision: Optional[RevisionInfo] = Field(
+        None, description="이전 판과 페이지를 공유하는 정정공고로 증분 재분석한 경우의 변경 내역"
+    )
 
 
 # 기존 스키마 (하위 호환성 유지)
@@ -171,6 +225,21 @@ class EligibilityResult(BaseModel):
     )
 
 
+class EligibilityBatchRequest(BaseModel):
+    """신청 가능성 배치 평가 요청 (공고 × 신청자 조건)"""
+
+    documents: list[DocAnalysisResult] = Field(
+        ..., min_length=1, description="공고 분석 결과 목록"
+    )
+    profiles: list[EligibilityUserProfile] = Field(
+        ..., min_length=1, description="신청자 조건 목록"
+    )
+    pairs: Optional[list[tuple[int, int]]] = Field(
+        None,
+        description="평가할 (documents 인덱스, profiles 인덱스) 목록. 없으면 모든 조합",
+    )
+
+
 # ============================================================
 # 대화형 질의응답 (Chat) 스키마
 # ============================================================
@@ -255,11 +324,89 @@ class AnswerSource(BaseModel):
     field: Optional[str] = Field(
         None, description="연관된 필드명 (예: deadline, amount 등, 선택)"
     )
+    doc_id: Optional[str] = Field(
+        None, description="근거가 나온 문서 ID (워크스페이스 질의응답에서 사용)"
+    )
 
 
 ChatResponse.model_rebuild()
 
 
+# ============================================================
+# 워크스페이스 (여러 문서 비교) 스키마
+# ============================================================
+
+class WorkspaceCreateRequest(BaseModel):
+    """워크스페이스 생성 요청"""
+
+    doc_ids: list[str] = Field(
+        default_factory=list, description="처음에 추가할 분석 결과 문서 ID 목록"
+    )
+
+
+class WorkspaceAddDocumentRequest(BaseModel):
+    """워크스페이스 문서 추가 요청"""
+
+    doc_id: str = Field(..., description="추가할 분석 결과 문서 ID")
+
+
+class WorkspaceDocument(BaseModel):
+    """워크스페이스에 포함된 문서"""
+
+    doc_id: str = Field(..., description="문서 ID")
+    title: Optional[str] = Field(None, description="문서 제목")
+    docType: str = Field(..., description="문서 유형")
+    passages: int = Field(..., description="검색 색인에 들어간 문단 수")
+
+
+class WorkspaceInfo(BaseModel):
+    """워크스페이스 정보"""
+
+    id: str = Field(..., description="워크스페이스 ID")
+    documents: list[WorkspaceDocument] = Field(
+        default_factory=list, description="포함된 문서 목록"
+    )
+
+
+class WorkspaceChatRequest(BaseModel):
+    """워크스페이스 질의응답 요청 (문서 컨텍스트는 서버의 워크스페이스에서 가져옴)"""
+
+    messages: list[ChatMessage] = Field(..., description="대화 히스토리")
+
+
+# ============================================================
+# 사용량 조회 스키마
+# ============================================================
+
+class UsageBreakdown(BaseModel):
+    """라벨/라우트/모델별 LLM 사용량"""
+
+    label: Optional[str] = Field(None, description="요청의 X-Client-Id 라벨 (할당량과 무관)")
+    route: str = Field(..., description="호출한 API 라우트 (백그라운드 작업은 시작한 라우트)")
+    model: str = Field(..., description="모델 이름")
+    calls: int = Field(..., description="LLM 호출 수")
+    prompt_tokens: int = Field(..., description="입력 토큰 수")
+    completion_tokens: int = Field(..., description="출력 토큰 수")
+    total_tokens: int = Field(..., description="전체 토큰 수")
+    avg_latency_ms: float = Field(..., description="평균 응답 시간 (ms)")
+
+
+class UsageReport(BaseModel):
+    """클라이언트 하나의 사용량 보고서"""
+
+    client_id: str = Field(..., description="클라이언트 ID (X-Client-Key 로 인증된 클라이언트 이름 또는 ip:<접속 IP>)")
+    since: datetime = Field(..., description="집계 시작 시각 (분 단위)")
+    calls: int = Field(..., description="LLM 호출 수")
+    total_tokens: int = Field(..., description="전체 토큰 수")
+    tokens_last_minute: int = Field(..., description="최근 60초 동안 사용한 토큰 수")
+    tokens_per_minute_limit: Optional[int] = Field(
+        None, description="분당 토큰 할당량 (없으면 제한 없음)"
+    )
+    breakdown: list[UsageBreakdown] = Field(
+        default_factory=list, description="라우트/모델별 사용량 (토큰 많은 순)"
+    )
+
+
 # ============================================================
 # 취업지원금 자격 확인 스키마
 # ============================================================
@@ -331,3 +478,17 @@ class JobSupportEligibilityResult(BaseModel):
         default_factory=list, description="주의사항"
     )
 
+
+class JobSupportEligibilityBatchRequest(BaseModel):
+    """취업지원금 자격 배치 평가 요청 (공고 × 신청자 조건)"""
+
+    documents: list[DocAnalysisResult] = Field(
+        ..., min_length=1, description="지원금 공고 분석 결과 목록"
+    )
+    profiles: list[JobSupportUserProfile] = Field(
+        ..., min_length=1, description="신청자 조건 목록"
+    )
+    pairs: Optional[list[tuple[int, int]]] = Field(
+        None,
+        description="평가할 (documents 인덱스, profiles 인덱스) 목록. 없으면 모든 조합",
+    )
@@ -0,0 +1,156 @@
+"""
+`/api/analyze` + `/api/chat` 엔드투엔드 벤치마크 (LLM 기록/재생)
+
+실제 공고문으로 분석 → 추천 질문 채팅 흐름을 실행하고, 엔드포인트별 요청당 소요 시간과
+프로세스 CPU 시간을 출력합니다. 처음 한 번 `--record` 로 실제 OpenAI 응답을 기록해 두면,
+이후에는 기록된 응답을 재생하므로 OpenAI 비용/네트워크 없이 같은 결과로 반복 측정할 수 있습니다.
+
+실행:
+    # 1) 기록 (OPEN_AI_KEY 필요)
+    python -m benchmarks.bench_endpoints --record path/to/notice1.pdf path/to/notice2.pdf
+    # 2) 재생 (오프라인, 빌드 간 로컬 CPU 비용 비교)
+    python -m benchmarks.bench_endpoints path/to/notice1.pdf path/to/notice2.pdf
+    # 기록된 지연 시간까지 재현
+    python -m benchmarks.bench_endpoints --latency path/to/notice1.pdf
+
+옵션:
+    --record          실제 호출 후 기록 (기본은 재생)
+    --latency         재생 시 기록된 지연 시간만큼 대기
+    --repeat N        재생 반복 횟수 (기본 5, 기록 모드는 1)
+    --questions N     문서당 채팅 질문 수 (기본 3)
+    --cassettes DIR   카세트 디렉터리 (기본 설정값 LLM_CASSETTE_DIR)
+    --hedge           LLM 호출 헤징 사용 (--latency 와 함께 켜고 끈 결과의 p99 비교)
+    --fanout MODE     문서 분석 방식: off(단일 호출, 기본) / on(분할 병렬) / both(둘 다 실행해
+                      `analyze` 와 `analyze-fanout` 의 응답 시간/요청당 토큰 비교, --latency 와 함께 사용)
+"""
+import argparse
+import os
+import statistics
+import time
+
+from app.core.config import settings
+
+
+def _configure(args: argparse.Namespace) -> None:
+    settings.LLM_CASSETTE_MODE = "record" if args.record else "replay"
+    settings.LLM_CASSETTE_REPLAY_LATENCY = args.latency
+    settings.HEDGE_ENABLED = args.hedge
+    settings.ANALYZE_FANOUT = args.fanout == "on"
+    if args.cassettes:
+        settings.LLM_CASSETTE_DIR = args.cassettes
+    # 매 반복이 같은 경로(LLM 응답 처리 포함)를 타도록 캐시/백그라운드 작업은 끔
+    settings.ANSWER_CACHE_ENABLED = False
+    settings.PRECOMPUTE_SUGGESTED_ANSWERS = False
+    settings.WARMUP_ON_STARTUP = False
+    settings.INCREMENTAL_REANALYSIS = False
+
+
+def _timed(timings: dict[str, list[tuple[float, float, int]]], name: str, call):
+    from app.core.metrics import metrics
+
+    tokens = metrics.get("usage.tokens")
+    wall, cpu = time.perf_counter(), time.process_time()
+    response = call()
+    timings.setdefault(name, []).append(
+        (
+            (time.perf_counter() - wall) * 1000,
+            (time.process_time() - cpu) * 1000,
+            metrics.get("usage.tokens") - tokens,
+        )
+    )
+    if response.status_code != 200:
+        raise SystemExit(f"{name} failed ({response.status_code}): {response.text}")
+    return response.json()
+
+
+def _run_document(client, path: str, questions: int, timings, fanout: str) -> None:
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    def analyze():
+        return client.post("/api/analyze", files={"file": (os.path.basename(path), raw)})
+
+    analysis = _timed(timings, "analyze", analyze) if fanout != "on" else None
+    if fanout != "off":
+        settings.ANALYZE_FANOUT = True
+        try:
+            fanned = _timed(timings, "analyze-fanout", analyze)
+        finally:
+            settings.ANALYZE_FANOUT = fanout == "on"
+        analysis = analysis or fanned
+    doc_type = analysis["extracted"]["docType"]
+    suggestions = client.get(f"/api/chat/suggestions/{doc_type}?limit={questions}").json()
+    for suggestion in suggestions:
+        _timed(
+            timings,
+            "chat",
+            lambda: client.post(
+                "/api/chat",
+                json={
+                    "doc_id": analysis["id"],
+                    "doc_context": analysis,
+                    "messages": [{"role": "user", "content": suggestion["text"]}],
+                },
+            ),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--latency", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--cassettes")
+    parser.add_argument("--hedge", action="store_true")
+    parser.add_argument("--fanout", choices=("off", "on", "both"), default="off")
+    args = parser.parse_args()
+    if not args.paths:
+        print(__doc__)
+        return
+
+    _configure(args)
+
+    from fastapi.testclient import TestClient
+
+    from app.core.metrics import metrics
+    from app.main import app
+
+    repeat = 1 if args.record else args.repeat
+    timings: dict[str, list[tuple[float, float]]] = {}
+    with TestClient(app) as client:
+        if not args.record:
+            # 첫 요청의 지연 import(pdfplumber/openai) 비용은 측정에서 제외
+            for path in args.paths[:1]:
+                _run_document(client, path, 1, {}, args.fanout)
+        for _ in range(repeat):
+            for path in args.paths:
+                _run_document(client, path, args.questions, timings, args.fanout)
+
+    print(
+        f"mode={settings.LLM_CASSETTE_MODE} repeat={repeat} "
+        f"cassettes={settings.LLM_CASSETTE_DIR} "
+        f"recorded={metrics.get('cassette.recorded')} replayed={metrics.get('cassette.replayed')} "
+        f"hedged={metrics.get('hedge.fired')} hedge_won={metrics.get('hedge.won')} "
+        f"cached_prompt_tokens={metrics.get('usage.cached_prompt_tokens')}"
+    )
+    print(
+        f"{'endpoint':14} {'n':>4} {'wall p50':>9} {'wall p95':>9} {'wall p99':>9} "
+        f"{'cpu p50':>8} {'cpu mean':>9} {'tokens':>7}"
+    )
+    for name, values in timings.items():
+        walls = sorted(v[0] for v in values)
+        cpus = [v[1] for v in values]
+        tokens = statistics.mean(v[2] for v in values)
+        p95 = walls[min(len(walls) - 1, int(len(walls) * 0.95))]
+        p99 = walls[min(len(walls) - 1, int(len(walls) * 0.99))]
+        print(
+            f"{name:14} {len(values):4d} {statistics.median(walls):8.1f}ms "
+            f"{p95:8.1f}ms {p99:8.1f}ms "
+            f"{statistics.median(cpus):7.1f}ms {statistics.mean(cpus):8.1f}ms {tokens:7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+직렬화 경로 벤치마크
+
+기존 경로(json.loads → Model(**data) → response_model 재검증 → 표준 json 인코더)와
+공용 직렬화 계층(원본 문자열 직접 검증 → 재검증 생략 → pydantic-core 인코더)의
+요청당 CPU 시간을 비교합니다.
+
+실행:
+    python -m benchmarks.bench_serialization
+"""
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.serialization import dumps, model_response, validate_json
+from app.models.schemas import DocAnalysisResult, EligibilityUserProfile
+
+SAMPLE_RESULT = {
+    "id": "analysis-2025-0001",
+    "summary": "6월 7일까지 LH 청약센터 홈페이지에서 온라인으로 신청하세요. "
+    "무주택세대구성원 중 청약저축가입자가 대상입니다.",
+    "actions": [
+        {
+            "type": "apply",
+            "label": "청약 신청하러 가기",
+            "deadline": "2025-06-07",
+            "link": "https://apply.lh.or.kr",
+        },
+        {"type": "check", "label": "소득 기준 확인하기", "deadline": None, "link": None},
+    ],
+    "extracted": {
+        "docType": "housing_application",
+        "title": "2025년 서울지역 공공분양 주택 입주자 모집공고",
+        "amount": None,
+        "deadline": "2025-06-07",
+        "authority": "한국토지주택공사(LH)",
+        "applicantType": "무주택세대구성원 중 청약저축가입자",
+    },
+    "evidence": [
+        {
+            "field": f"field_{i}",
+            "text": "신청기간: 2025년 5월 20일(월) 09:00 ~ 2025년 6월 7일(금) 18:00",
+            "page": i + 1,
+            "confidence": 0.95,
+        }
+        for i in range(12)
+    ],
+    "uncertainty": [
+        {
+            "field": "amount",
+            "reason": "문서에서 정확한 분양가격 정보를 찾을 수 없음",
+            "confidence": 0.3,
+        }
+    ],
+}
+
+SAMPLE_PROFILE = {
+    "is_seoul_resident": True,
+    "household_type": "two",
+    "income_level": "between_30m_50m",
+    "special_qualifications": ["none"],
+}
+
+CONTENT = json.dumps(SAMPLE_RESULT, ensure_ascii=False)
+_RESPONSE_ADAPTER = TypeAdapter(DocAnalysisResult)
+
+
+def legacy_path() -> bytes:
+    # 라우트: LLM 응답 파싱 및 검증
+    result = DocAnalysisResult(**json.loads(CONTENT))
+    profile = EligibilityUserProfile(**SAMPLE_PROFILE)
+    # 프롬프트 조립 (eligibility 라우트와 동일)
+    json.dumps(result.model_dump(), ensure_ascii=False)
+    json.dumps(profile.model_dump(), ensure_ascii=False)
+    # FastAPI: response_model 재검증 + jsonable_encoder + 표준 json 인코더
+    value = _RESPONSE_ADAPTER.validate_python(result)
+    encoded = jsonable_encoder(value)
+    return json.dumps(encoded, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path() -> bytes:
+    result = validate_json(DocAnalysisResult, CONTENT)
+    profile = validate_json(EligibilityUserProfile, json.dumps(SAMPLE_PROFILE))
+    result.model_dump_json()
+    dumps(profile)
+    return model_response(result).body
+
+
+def main(number: int = 2000) -> None:
+    assert json.loads(legacy_path()) == json.loads(fast_path())
+
+    legacy = min(timeit.repeat(legacy_path, number=number, repeat=5)) / number
+    fast = min(timeit.repeat(fast_path, number=number, repeat=5)) / number
+    print(f"legacy: {legacy * 1e6:8.1f} µs/request")
+    print(f"fast  : {fast * 1e6:8.1f} µs/request")
+    print(f"speedup: {legacy / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
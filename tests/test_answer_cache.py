@@ -0,0 +1,35 @@
+from app.core.answer_cache import AnswerCache, is_context_free
+from app.models.schemas import ChatMessage
+
+
+def _cache() -> AnswerCache:
+    return AnswerCache(ttl_seconds=60, max_docs=10, max_entries_per_doc=10, similarity=0.8)
+
+
+def test_similar_wording_reuses_answer():
+    cache = _cache()
+    cache.put("doc", "언제까지 내야 돼요?", "5월 31일까지입니다.")
+
+    assert cache.get("doc", "언제까지 내요?") == "5월 31일까지입니다."
+
+
+def test_different_number_or_negation_is_not_reused():
+    cache = _cache()
+    cache.put("doc", "3인 가구 소득 기준이 얼마예요?", "3인 기준 답변")
+    cache.put("doc", "서류를 내야 돼요?", "내야 합니다.")
+
+    assert cache.get("doc", "4인 가구 소득 기준이 얼마예요?") is None
+    assert cache.get("doc", "서류를 안 내도 돼요?") is None
+    assert cache.get("doc", "3인 가구 소득 기준은 얼마예요?") == "3인 기준 답변"
+
+
+def test_only_first_user_turn_is_context_free():
+    first = [ChatMessage(role="user", content="신청 자격이 뭐예요?")]
+    follow_up = [
+        *first,
+        ChatMessage(role="assistant", content="무주택 세대주입니다."),
+        ChatMessage(role="user", content="서류는 뭐가 필요해요?"),
+    ]
+
+    assert is_context_free(first)
+    assert not is_context_free(follow_up)
@@ -0,0 +1,24 @@
+from app.core.answer_cache import context_key
+from app.core.answers import lookup_precomputed
+from app.core.doc_store import doc_store
+from app.models.schemas import DocAnalysisResult
+
+
+def _result(doc_id: str, summary: str) -> DocAnalysisResult:
+    return DocAnalysisResult(
+        id=doc_id,
+        summary=summary,
+        actions=[],
+        extracted={"docType": "income_tax", "title": "종합소득세 신고 안내"},
+    )
+
+
+def test_precomputed_answer_requires_matching_context():
+    result = _result("doc-precompute", "5월 31일까지 신고하세요.")
+    stored = doc_store.put(result)
+    question = "언제까지 신고해야 하나요?"
+    stored.answers[(context_key(result.id, result), question)] = "5월 31일까지입니다."
+
+    assert lookup_precomputed(result.id, result, question) == "5월 31일까지입니다."
+    other = _result("doc-precompute", "6월 30일까지 신고하세요.")
+    assert lookup_precomputed(result.id, other, question) is None
@@ -0,0 +1,32 @@
+import pytest
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.deadline import request_budget
+
+
+def _request(timeout: str | None) -> Request:
+    headers = [] if timeout is None else [(b"x-request-timeout", timeout.encode())]
+    return Request({"type": "http", "method": "POST", "path": "/api/analyze", "headers": headers})
+
+
+@pytest.mark.parametrize("header", ["nan", "inf", "-inf", "0", "-5", "abc"])
+def test_invalid_timeout_header_falls_back_to_default(header):
+    budget = request_budget(_request(header))
+
+    assert budget.timeout == settings.REQUEST_TIMEOUT_SECONDS
+
+
+def test_timeout_header_is_capped():
+    assert request_budget(_request("5")).timeout == 5
+    assert request_budget(_request("100000")).timeout == settings.REQUEST_TIMEOUT_MAX_SECONDS
+
+
+def test_route_uses_template_not_raw_path():
+    request = _request(None)
+    assert request_budget(request).route == "unmatched"
+
+    request.scope["path"] = "/api/analyze/doc-1234"
+    request.scope["route"] = APIRoute("/api/analyze/{doc_id}", lambda doc_id: None)
+    assert request_budget(request).route == "/api/analyze/{doc_id}"
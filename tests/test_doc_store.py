@@ -0,0 +1,52 @@
+from app.core.doc_store import DocumentStore
+from app.core.page_source import PageSource
+from app.models.schemas import DocAnalysisResult
+
+
+def _result(summary: str) -> DocAnalysisResult:
+    return DocAnalysisResult(
+        id="doc-1",
+        summary=summary,
+        actions=[],
+        extracted={"docType": "income_tax", "title": "종합소득세 신고 안내"},
+    )
+
+
+def test_update_result_keeps_per_document_state():
+    store = DocumentStore(max_items=10)
+    stored = store.put(_result("이전 요약"), owner="client-a")
+    stored.answers[("ctx", "언제까지 내요?")] = "5월 31일까지입니다."
+    etag = stored.etag
+
+    assert store.update_result(stored, _result("보완한 요약"))
+
+    current = store.get("doc-1")
+    assert current is stored
+    assert current.result.summary == "보완한 요약"
+    assert current.etag != etag
+    assert current.answers == {("ctx", "언제까지 내요?"): "5월 31일까지입니다."}
+    assert current.owner == "client-a"
+
+
+def test_update_result_skips_replaced_document():
+    store = DocumentStore(max_items=10)
+    stale = store.put(_result("이전 요약"))
+    store.put(_result("다시 분석한 요약"))
+
+    assert not store.update_result(stale, _result("보완한 요약"))
+    assert store.get("doc-1").result.summary == "다시 분석한 요약"
+
+
+def test_store_is_capped_by_bytes_including_pending_pdf():
+    store = DocumentStore(max_items=10, max_bytes=3 * 1024 * 1024)
+    for n in range(3):
+        result = _result("요약").model_copy(update={"id": f"doc-{n}"})
+        source = PageSource(
+            pages=["1쪽"], total_pages=5, analyzed_pages=1, raw_bytes=b"x" * (1024 * 1024 + 1)
+        )
+        store.put(result, source=source)
+
+    assert store.get("doc-0") is None
+    assert store.get("doc-1") is not None
+    assert store.get("doc-2") is not None
+    assert store.nbytes() <= 3 * 1024 * 1024
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from app.core import eligibility_batch
+from app.core.config import settings
+from app.core.deadline import RequestBudget
+from app.core.eligibility_batch import EligibilitySpec, pack_pairs, plan_batch, stream_batch
+from app.core.usage import QuotaExceeded, usage_ledger
+from app.models.schemas import DocAnalysisResult
+
+
+class _Profile(BaseModel):
+    age: int
+
+
+class _Result(BaseModel):
+    status: str
+
+
+_SPEC = EligibilitySpec(
+    model="test-model",
+    system_prompt="자격을 평가하세요.",
+    profile_model=_Profile,
+    result_model=_Result,
+    doc_label="주택 공고",
+    completion_kwargs={"response_format": {"type": "json_object"}},
+)
+
+
+def _doc(title: str) -> DocAnalysisResult:
+    return DocAnalysisResult(
+        id=title,
+        summary=f"{title} 입주자 모집",
+        actions=[],
+        extracted={"docType": "housing_notice", "title": title},
+    )
+
+
+class _FakeCompletions:
+    """묶음 프롬프트의 조합마다 결과를 돌려주는 가짜 LLM (drop 개수만큼 마지막 조합을 뺌)"""
+
+    def __init__(self, drop: int = 0, delay: float = 0.0):
+        self.drop = drop
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        self.calls.append(prompt)
+        await asyncio.sleep(self.delay)
+        ids = re.findall(r"^- (C\d+):", prompt, re.MULTILINE)
+        if ids:
+            kept = ids[: len(ids) - self.drop] if self.drop else ids
+            content = json.dumps({"results": [{"pair": i, "status": "likely"} for i in kept]})
+        else:
+            content = json.dumps({"status": "single"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _install(monkeypatch, completions: _FakeCompletions) -> None:
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(eligibility_batch, "get_client", lambda: client)
+
+
+def _run(plan, timeout: float = 30.0, client_id: str | None = None) -> list[dict]:
+    async def collect():
+        budget = RequestBudget(None, timeout)
+        return [json.loads(line) async for line in stream_batch(_SPEC, plan, budget, client_id=client_id)]
+
+    return asyncio.run(collect())
+
+
+def test_plan_deduplicates_identical_documents_and_profiles():
+    documents = [_doc("A"), _doc("B"), _doc("A")]
+    profiles = [_Profile(age=30), _Profile(age=30), _Profile(age=40)]
+    positions = [(d, p) for d in range(3) for p in range(3)]
+
+    plan = plan_batch(documents, profiles, positions)
+
+    assert plan.requested == 9
+    assert len(plan.pairs) == 4  # {A, B} × {30, 40}
+    first = plan.pairs[0]
+    assert sorted(first.positions) == [(0, 0), (0, 1), (2, 0), (2, 1)]
+
+
+def test_pack_respects_size_and_token_limits():
+    documents = [_doc("A")]
+    profiles = [_Profile(age=age) for age in range(20, 32)]
+    plan = plan_batch(documents, profiles, [(0, p) for p in range(12)])
+
+    packs = pack_pairs(plan, max_pairs=5, token_budget=10_000)
+    assert [len(pack) for pack in packs] == [5, 5, 2]
+
+    shared = plan.pairs[0].doc.tokens
+    varying = plan.pairs[0].profile.tokens
+    tight = pack_pairs(plan, max_pairs=5, token_budget=shared + 2 * varying)
+    assert all(len(pack) <= 2 for pack in tight)
+    assert sum(len(pack) for pack in tight) == 12
+
+
+def test_stream_emits_line_per_position_and_retries_missing_pairs(monkeypatch):
+    completions = _FakeCompletions(drop=1)
+    _install(monkeypatch, completions)
+    documents = [_doc("A"), _doc("A")]
+    profiles = [_Profile(age=30), _Profile(age=40), _Profile(age=50)]
+    plan = plan_batch(documents, profiles, [(d, p) for d in range(2) for p in range(3)])
+
+    lines = _run(plan)
+
+    results, summary = lines[:-1], lines[-1]
+    assert sorted((l["doc_index"], l["profile_index"]) for l in results) == [
+        (d, p) for d in range(2) for p in range(3)
+    ]
+    statuses = [l["result"]["status"] for l in results]
+    # 묶음 응답에서 빠진 마지막 조합은 단건으로 다시 평가 (두 위치에 같은 결과)
+    assert statuses.count("single") == 2
+    assert summary == {"done": True, "pairs": 6, "evaluated": 3, "completions": 2, "failed": 0}
+
+
+def test_stream_reports_timeout_for_unfinished_pairs(monkeypatch):
+    _install(monkeypatch, _FakeCompletions(delay=5.0))
+    plan = plan_batch([_doc("A")], [_Profile(age=30), _Profile(age=40)], [(0, 0), (0, 1)])
+
+    lines = _run(plan, timeout=0.2)
+
+    assert [l["error"] for l in lines[:-1]] == ["요청 처리 시간이 초과되었습니다."] * 2
+    assert lines[-1]["failed"] == 2
+
+
+def test_stream_checks_quota_before_each_pack(monkeypatch):
+    completions = _FakeCompletions()
+    _install(monkeypatch, completions)
+    monkeypatch.setattr(settings, "USAGE_TRACKING", True)
+    monkeypatch.setattr(settings, "ELIGIBILITY_BATCH_PACK_SIZE", 2)
+    monkeypatch.setattr(settings, "ELIGIBILITY_BATCH_CONCURRENCY", 1)
+    checked: list[str] = []
+
+    def check_quota(client_id: str) -> None:
+        checked.append(client_id)
+        if len(checked) > 1:
+            raise QuotaExceeded(client_id, limit=1000, retry_after=30.0)
+
+    monkeypatch.setattr(usage_ledger, "check_quota", check_quota)
+    profiles = [_Profile(age=age) for age in range(30, 36)]
+    plan = plan_batch([_doc("A")], profiles, [(0, p) for p in range(6)])
+
+    lines = _run(plan, client_id="client-a")
+
+    results = lines[:-1]
+    assert len(completions.calls) == 1
+    assert set(checked) == {"client-a"} and len(checked) == 3
+    assert sum("result" in l for l in results) == 2
+    assert [l["error"] for l in results if "error" in l] == [
+        "분당 토큰 사용량 한도(1,000 토큰)를 초과해 평가하지 않았습니다."
+    ] * 4
+    assert lines[-1]["completions"] == 1 and lines[-1]["failed"] == 4
@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import hedging
+from app.core.config import settings
+from app.core.hedging import HedgeBudget, HedgingClient, LatencyTracker
+
+_MODEL = "test-model"
+
+
+class _ScriptedCompletions:
+    """호출 순서대로 (지연 초, 응답 또는 예외)를 돌려주고 취소된 호출을 기록하는 가짜 LLM"""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self.cancelled: list[int] = []
+
+    async def create(self, **kwargs):
+        index = self.calls
+        self.calls += 1
+        delay, outcome = self.script[min(index, len(self.script) - 1)]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def hedge(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_MIN_SAMPLES", 1)
+    # 최소 표본(20ms)을 기준으로 헤지하도록 (호출 뒤 기록되는 느린 표본에 기준이 밀리지 않게)
+    monkeypatch.setattr(settings, "HEDGE_PERCENTILE", 0.0)
+    monkeypatch.setattr(settings, "HEDGE_MIN_DELAY_MS", 20.0)
+    monkeypatch.setattr(settings, "HEDGE_BUDGET_RATIO", 1.0)
+    monkeypatch.setattr(settings, "HEDGE_BUDGET_BURST", 1.0)
+    monkeypatch.setattr(settings, "HEDGE_FALLBACK_MODEL", None)
+    tracker = LatencyTracker()
+    tracker.observe(f"-:{_MODEL}", 20.0)
+    monkeypatch.setattr(hedging, "latency_tracker", tracker)
+    monkeypatch.setattr(hedging, "hedge_budget", HedgeBudget())
+
+    def run(completions: _ScriptedCompletions, calls: int = 1):
+        client = HedgingClient(SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+        async def go():
+            return [await client.chat.completions.create(model=_MODEL) for _ in range(calls)]
+
+        return asyncio.run(go())
+
+    return run
+
+
+def test_hedge_wins_and_slow_primary_is_cancelled(hedge):
+    completions = _ScriptedCompletions((1.0, "primary"), (0.01, "hedge"))
+
+    assert hedge(completions) == ["hedge"]
+    assert completions.calls == 2
+    assert completions.cancelled == [0]
+
+
+def test_failed_primary_falls_through_to_hedge(hedge):
+    completions = _ScriptedCompletions((0.05, RuntimeError("upstream 500")), (0.1, "hedge"))
+
+    assert hedge(completions) == ["hedge"]
+    assert completions.cancelled == []
+
+
+def test_both_failing_raises_primary_error(hedge):
+    completions = _ScriptedCompletions(
+        (0.05, RuntimeError("primary")), (0.06, RuntimeError("hedge"))
+    )
+
+    with pytest.raises(RuntimeError, match="primary"):
+        hedge(completions)
+
+
+def test_hedging_stops_when_budget_is_empty(hedge, monkeypatch):
+    # 호출마다 0.5 적립 → 두 번째 호출에서만 1 이 모여 헤지
+    monkeypatch.setattr(settings, "HEDGE_BUDGET_RATIO", 0.5)
+    completions = _ScriptedCompletions((0.1, "slow"))
+
+    assert hedge(completions, calls=3) == ["slow"] * 3
+    assert completions.calls == 4
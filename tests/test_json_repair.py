@@ -0,0 +1,64 @@
+import asyncio
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+from app.core.json_repair import validate_llm_json
+
+
+class _Amount(BaseModel):
+    amount: Optional[float] = None
+
+
+class _Action(BaseModel):
+    type: Literal["pay", "apply", "check", "none"]
+
+
+def _validate(raw: str, reask=None) -> _Amount:
+    return asyncio.run(validate_llm_json(_Amount, f'{{"amount": "{raw}"}}', reask=reask))
+
+
+def test_compound_korean_amounts_are_parsed():
+    assert _validate("1억 2천만원").amount == 120_000_000
+    assert _validate("3억5천만원").amount == 350_000_000
+    # 억 뒤에 만 없이 끝나는 천 단위는 만이 생략된 것
+    assert _validate("3억5천").amount == 350_000_000
+    assert _validate("1억2천").amount == 120_000_000
+    assert _validate("1,200만원").amount == 12_000_000
+    assert _validate("₩1,200,000").amount == 1_200_000
+    assert _validate("95%").amount == 0.95
+
+
+def test_ambiguous_amount_is_reasked_instead_of_summed():
+    asked: list[list[dict]] = []
+
+    async def reask(errors):
+        asked.append(errors)
+        return {"amount": 5_000_000}
+
+    result = _validate("2025년 5월 31일까지 500만원", reask=reask)
+
+    assert result.amount == 5_000_000
+    assert len(asked) == 1
+
+
+def test_bare_number_after_eok_is_reasked():
+    async def reask(errors):
+        return {"amount": 150_000_000}
+
+    assert _validate("1억 5000", reask=reask).amount == 150_000_000
+
+
+def test_unknown_enum_value_is_reasked_not_defaulted():
+    asked: list[list[dict]] = []
+
+    async def reask(errors):
+        asked.append(errors)
+        return {"type": "apply"}
+
+    typo = asyncio.run(validate_llm_json(_Action, '{"type": "Payment"}'))
+    result = asyncio.run(validate_llm_json(_Action, '{"type": "subscribe"}', reask=reask))
+
+    assert typo.type == "pay"
+    assert result.type == "apply"
+    assert len(asked) == 1
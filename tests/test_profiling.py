@@ -0,0 +1,16 @@
+from app.core.config import settings
+from app.core.profiling import PROFILE_HEADER, _should_profile
+
+
+def _scope(value: bytes) -> dict:
+    return {"type": "http", "headers": [(PROFILE_HEADER, value)]}
+
+
+def test_profile_header_compares_bytes(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+
+    assert _should_profile(_scope(b"secret"))
+    assert not _should_profile(_scope(b"wrong"))
+    # 비 ASCII 헤더 값도 예외 없이 거부
+    assert not _should_profile(_scope("séçret".encode("latin-1")))
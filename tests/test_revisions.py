@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.api.routes import analyze
+from app.core.deadline import RequestBudget
+from app.core.doc_store import DocumentStore
+from app.core.pdf_extract import text_page_hash
+from app.core.revisions import diff_deadlines, diff_fields, merge_evidence
+from app.core.text_normalize import normalize_pages
+from app.models.schemas import DocAction, DocAnalysisResult, EvidenceItem
+
+_PAGES = [
+    "행복주택 입주자 모집공고 신청 마감 6월 7일",
+    "신청 자격 무주택 세대구성원",
+    "임대 보증금 안내",
+    "제출 서류 목록",
+    "문의처 콜센터",
+]
+
+
+def _result(doc_id: str = "doc-v1", deadline: str = "2025-06-07", **extracted) -> DocAnalysisResult:
+    return DocAnalysisResult(
+        id=doc_id,
+        summary="행복주택 입주자 모집",
+        actions=[{"type": "apply", "label": "청약 신청", "deadline": deadline}],
+        extracted={"docType": "housing_notice", "title": "행복주택 입주자 모집공고", **extracted},
+        evidence=[
+            {"field": "deadline", "text": "신청 마감 6월 7일", "page": 1, "confidence": 0.9},
+            {"field": "applicantType", "text": "무주택 세대구성원", "page": 2, "confidence": 0.9},
+        ],
+    )
+
+
+def test_diff_fields_reports_only_new_values():
+    before = _result(amount=1000000.0)
+    after = _result(amount=1200000.0)
+
+    changes = diff_fields(before, after)
+
+    assert [(c.field, c.after) for c in changes] == [("extracted.amount", "1200000")]
+
+
+def test_diff_deadlines_matches_relabelled_actions_and_reports_added_removed():
+    before = _result()
+    before.actions.append(DocAction(type="pay", label="계약금 납부", deadline="2025-07-01"))
+    after = _result(deadline="2025-06-14")
+    after.actions[0].label = "청약 접수"
+    after.actions.append(DocAction(type="check", label="당첨자 발표", deadline="2025-08-01"))
+
+    changes = {c.change: c for c in diff_deadlines(before, after)}
+
+    assert changes["changed"].label == "청약 접수" and changes["changed"].after == "2025-06-14"
+    assert changes["added"].type == "check" and changes["added"].after == "2025-08-01"
+    # 빠진 항목은 이전 판의 라벨/값을 담지 않음
+    assert changes["removed"].type == "pay"
+    assert changes["removed"].label is None and changes["removed"].after is None
+
+
+def test_merge_evidence_keeps_previous_only_on_unchanged_pages():
+    previous = _result()
+    revised = _result()
+    revised.evidence = [
+        EvidenceItem(field="deadline", text="신청 마감 6월 14일", page=9, confidence=0.9)
+    ]
+    pages = ["행복주택 입주자 모집공고 신청 마감 6월 14일", *_PAGES[1:]]
+
+    merged = merge_evidence(previous, revised, normalize_pages(pages), changed_pages={1})
+
+    assert [(e.text, e.page) for e in merged] == [
+        ("신청 마감 6월 14일", 1),
+        ("무주택 세대구성원", 2),
+    ]
+
+
+def _store_previous(store: DocumentStore, owner: str, pages: list[str] = _PAGES) -> None:
+    store.put(
+        _result(),
+        pages=pages,
+        page_hashes=[text_page_hash(page) for page in pages],
+        raw_pages=list(pages),
+        owner=owner,
+    )
+
+
+def test_find_revision_base_is_scoped_to_owner_and_ratio():
+    store = DocumentStore(max_items=10)
+    _store_previous(store, owner="client-a")
+    hashes = [text_page_hash(page) for page in ["정정 첫 페이지", *_PAGES[1:]]]
+
+    base = store.find_revision_base(hashes, 0.8, owner="client-a")
+
+    assert base is not None and base.stored.result.id == "doc-v1"
+    assert base.shared == {hashes[i]: i for i in range(1, 5)}
+    assert store.find_revision_base(hashes, 0.8, owner="client-b") is None
+    assert store.find_revision_base(hashes, 0.8, owner="client-a", exclude="doc-v1") is None
+    assert store.find_revision_base(hashes[:2] + ["x", "y", "z"], 0.8, owner="client-a") is None
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    async def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][-1]["content"])
+        content = _result(deadline="2025-06-14").model_dump_json()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _revise(monkeypatch, store: DocumentStore, pages: list[str], owner: str):
+    completions = _FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(analyze, "doc_store", store)
+    monkeypatch.setattr(analyze, "get_client", lambda: client)
+    monkeypatch.setattr(analyze, "is_configured", lambda: True)
+    raw = "\f".join(pages).encode("utf-8")
+    stored = asyncio.run(
+        analyze._analyze_revision("v2.txt", raw, ".txt", "doc-v2", owner, RequestBudget(None, 30))
+    )
+    return stored, completions.prompts
+
+
+def test_revision_sends_only_changed_pages(monkeypatch):
+    store = DocumentStore(max_items=10)
+    _store_previous(store, owner="client-a")
+    pages = ["행복주택 입주자 모집공고 정정 신청 마감 6월 14일", *_PAGES[1:]]
+
+    stored, prompts = _revise(monkeypatch, store, pages, owner="client-a")
+
+    assert len(prompts) == 1
+    assert "변경 후 1" in prompts[0] and "정정 신청 마감 6월 14일" in prompts[0]
+    assert "삭제/변경 전 1" in prompts[0]
+    assert "제출 서류 목록" not in prompts[0]
+    revision = stored.result.revision
+    assert revision.previous_id == "doc-v1"
+    assert (revision.changed_pages, revision.removed_pages, revision.reused_pages) == ([1], [1], 4)
+    assert [c.after for c in revision.deadline_changes] == ["2025-06-14"]
+    assert stored.owner == "client-a"
+
+
+def test_revision_requires_same_owner_and_same_notice(monkeypatch):
+    store = DocumentStore(max_items=10)
+    _store_previous(store, owner="client-a")
+    pages = ["행복주택 입주자 모집공고 정정 신청 마감 6월 14일", *_PAGES[1:]]
+
+    assert _revise(monkeypatch, store, pages, owner="client-b") == (None, [])
+
+    # 나머지 페이지가 같아도 첫 페이지가 다르고 제목도 없으면 다른 문서
+    other = ["국민임대 예비입주자 모집", *_PAGES[1:]]
+    assert _revise(monkeypatch, store, other, owner="client-a") == (None, [])
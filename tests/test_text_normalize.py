@@ -0,0 +1,60 @@
+from app.core.text_normalize import normalize_pages
+
+
+def _page(number: int, total: int, body: list[str]) -> str:
+    return "\n".join(["한국토지주택공사 입주자 모집공고", *body, f"- {number} / {total} -"])
+
+
+def test_repeated_header_and_page_counter_are_removed():
+    pages = [_page(n, 4, [f"본문 내용 {n} 설명"]) for n in range(1, 5)]
+
+    normalized = normalize_pages(pages)
+
+    assert normalized.text.count("한국토지주택공사 입주자 모집공고") == 1
+    assert "/ 4" not in normalized.text
+    for n in range(1, 5):
+        assert f"본문 내용 {n} 설명" in normalized.text
+
+
+def test_table_spanning_pages_keeps_every_row():
+    # 짧은 페이지는 모든 줄이 머리글/꼬리글 영역에 들어가므로 표 행이 반복 줄로 오인되기 쉬움
+    pages = [
+        "\n".join([f"소득기준 표 ({n})", f"{n + 1}인 | 5,000,000원 | 6,000,000원", f"본문 내용 {n} 설명"])
+        for n in range(1, 6)
+    ]
+
+    normalized = normalize_pages(pages)
+
+    for n in range(1, 6):
+        assert f"소득기준 표 ({n})" in normalized.text
+        assert f"{n + 1}인 | 5,000,000원 | 6,000,000원" in normalized.text
+        assert f"본문 내용 {n} 설명" in normalized.text
+        assert normalized.locate_page(f"{n + 1}인 | 5,000,000원") == n
+
+
+def test_identical_table_rows_are_not_deduplicated():
+    row = "3인 | 5,000,000 | 6,000,000"
+    pages = [f"가구원수 | 소득 | 자산\n{row}\n공고 {n}쪽" for n in range(1, 4)]
+
+    normalized = normalize_pages(pages)
+
+    assert normalized.text.count(row) == 3
+    assert normalized.text.count("가구원수 | 소득 | 자산") == 3
+
+
+def test_numeric_lines_in_body_are_kept():
+    # 본문 중간의 숫자만 있는 줄(세대수, 비율, 연도)은 쪽번호가 아님
+    pages = [
+        "\n".join([f"{n}단지 공급 안내", "공급 세대수", f"{n}20", "경쟁률", f"{n} / 10", "공고 연도", f"202{n}", f"{n}단지 문의처", f"{n}"])
+        for n in range(1, 4)
+    ]
+
+    normalized = normalize_pages(pages)
+
+    for n, page in enumerate(normalized.page_texts(), start=1):
+        lines = page.splitlines()
+        assert f"{n}20" in lines
+        assert f"{n} / 10" in lines
+        assert f"202{n}" in lines
+        # 페이지 끝의 쪽번호는 제거
+        assert lines[-1] == f"{n}단지 문의처"
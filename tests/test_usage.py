@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core import usage
+from app.core.config import settings
+from app.core.usage import QuotaExceeded, UsageLedger, client_identity, client_label, usage_quota
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(usage, "time", SimpleNamespace(time=clock.time, perf_counter=clock.time))
+    monkeypatch.setattr(settings, "USAGE_DEFAULT_TPM", 100)
+    monkeypatch.setattr(settings, "USAGE_CLIENT_TPM", {"partner": 1000})
+    return clock
+
+
+def _record(ledger: UsageLedger, client_id: str, tokens: int) -> None:
+    ledger.record(client_id, "/api/chat", "gpt-4o-mini", tokens, 0, 10.0)
+
+
+def test_quota_limits_tokens_per_minute_and_reports_retry_after(clock):
+    ledger = UsageLedger(None)
+    _record(ledger, "ip:1.2.3.4", 60)
+    ledger.check_quota("ip:1.2.3.4")
+
+    clock.now += 30
+    _record(ledger, "ip:1.2.3.4", 50)
+    clock.now += 10
+    with pytest.raises(QuotaExceeded) as exc_info:
+        ledger.check_quota("ip:1.2.3.4")
+    assert exc_info.value.limit == 100
+    # 첫 기록(60 토큰)이 빠져나가는 20초 뒤에 한도 아래로 내려감
+    assert exc_info.value.retry_after == pytest.approx(20.0)
+
+    clock.now += 21
+    ledger.check_quota("ip:1.2.3.4")
+    assert ledger.tokens_last_minute("ip:1.2.3.4") == 50
+
+
+def test_quota_uses_per_client_limit(clock):
+    ledger = UsageLedger(None)
+    _record(ledger, "partner", 500)
+    _record(ledger, "ip:1.2.3.4", 500)
+
+    ledger.check_quota("partner")
+    with pytest.raises(QuotaExceeded):
+        ledger.check_quota("ip:1.2.3.4")
+
+
+def test_idle_windows_are_evicted(clock):
+    ledger = UsageLedger(None)
+    _record(ledger, "ip:1.2.3.4", 10)
+
+    clock.now += 121
+    _record(ledger, "ip:5.6.7.8", 10)
+
+    assert set(ledger._windows) == {"ip:5.6.7.8"}
+
+
+def _request(headers: dict[str, str], host: str = "10.0.0.1") -> Request:
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/chat",
+        "headers": [(k.lower().encode(), v.encode("latin-1")) for k, v in headers.items()],
+        "client": (host, 5000),
+    })
+
+
+def test_identity_comes_from_registered_key_not_client_id(monkeypatch):
+    monkeypatch.setattr(settings, "USAGE_CLIENT_KEYS", {"secret-key": "partner"})
+
+    assert client_identity(_request({"X-Client-Key": "secret-key"})) == "partner"
+    assert client_identity(_request({"X-Client-Key": "wrong-key"})) == "ip:10.0.0.1"
+    assert client_identity(_request({"X-Client-Key": "clé"})) == "ip:10.0.0.1"
+    # X-Client-Id 는 라벨일 뿐 식별에 쓰지 않음
+    spoofed = _request({"X-Client-Id": "partner"}, host="10.0.0.2")
+    assert client_identity(spoofed) == "ip:10.0.0.2"
+    assert client_label(spoofed) == "partner"
+
+
+def test_quota_dependency_returns_429_with_retry_after(monkeypatch, clock):
+    ledger = UsageLedger(None)
+    monkeypatch.setattr(usage, "usage_ledger", ledger)
+    monkeypatch.setattr(settings, "USAGE_TRACKING", True)
+    app = FastAPI()
+
+    @app.post("/limited")
+    async def limited(client_id: str = Depends(usage_quota)):
+        return {"client_id": client_id}
+
+    with TestClient(app) as client:
+        first = client.post("/limited", headers={"X-Client-Id": "team-a"})
+        assert first.status_code == 200
+        assert first.json() == {"client_id": "ip:testclient"}
+
+        _record(ledger, "ip:testclient", 100)
+        clock.now += 15
+        rejected = client.post("/limited", headers={"X-Client-Id": "team-b"})
+
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "45"
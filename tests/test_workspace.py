@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from app.core.workspace import Workspace, WorkspaceFull, WorkspaceStore
+from app.models.schemas import DocAnalysisResult
+
+
+def _result(doc_id: str) -> DocAnalysisResult:
+    return DocAnalysisResult(
+        id=doc_id,
+        summary="행복주택 입주자 모집",
+        actions=[],
+        extracted={"docType": "housing_notice", "title": f"{doc_id} 모집공고"},
+    )
+
+
+def _pages(doc_id: str, chars: int = 200) -> list[tuple[int, str]]:
+    return [(1, f"{doc_id} 신청자격 무주택 세대구성원 " + "가" * chars)]
+
+
+def test_concurrent_adds_do_not_exceed_document_limit():
+    workspace = Workspace(id="ws-test", max_documents=3)
+    barrier = threading.Barrier(8)
+    rejected = []
+
+    def add(n: int) -> None:
+        barrier.wait()
+        try:
+            workspace.add(_result(f"doc-{n}"), _pages(f"doc-{n}"))
+        except WorkspaceFull:
+            rejected.append(n)
+
+    threads = [threading.Thread(target=add, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(workspace.documents) == 3
+    assert len(rejected) == 5
+
+
+def test_index_is_capped_by_bytes_and_replacement_is_allowed():
+    workspace = Workspace(id="ws-test", max_bytes=2000)
+    workspace.add(_result("doc-1"), _pages("doc-1", 700))
+
+    with pytest.raises(WorkspaceFull):
+        workspace.add(_result("doc-2"), _pages("doc-2", 700))
+    # 같은 문서를 다시 추가하면 기존 색인 크기를 빼고 계산
+    workspace.add(_result("doc-1"), _pages("doc-1", 800))
+
+    assert list(workspace.documents) == ["doc-1"]
+    assert workspace.nbytes <= 2000
+
+
+def test_store_trims_least_recently_used_workspaces_by_bytes():
+    store = WorkspaceStore(max_items=10, max_total_bytes=3000)
+    first, second = store.create(), store.create()
+    first.add(_result("doc-1"), _pages("doc-1", 1000))
+    second.add(_result("doc-2"), _pages("doc-2", 1000))
+
+    store.trim(keep=second.id)
+
+    assert store.get(first.id) is None
+    assert store.get(second.id) is second